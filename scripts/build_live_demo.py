@@ -7,6 +7,7 @@ from _bootstrap import bootstrap_src_path
 
 repo_root = bootstrap_src_path()
 
+from isr_trade_study.analytics.warehouse import DEFAULT_WAREHOUSE
 from isr_trade_study.dashboard.live_demo import build_live_demo_site
 
 
@@ -18,10 +19,16 @@ def main() -> None:
         default="docs/live_demo/index.html",
         help="Path to the generated live-demo HTML file",
     )
+    parser.add_argument(
+        "--warehouse",
+        type=str,
+        default=str(DEFAULT_WAREHOUSE),
+        help="Results warehouse whose catalog lists the runs to show",
+    )
     args = parser.parse_args()
 
     site_path = (repo_root / args.site).resolve()
-    build_live_demo_site(repo_root=repo_root, site_path=site_path)
+    build_live_demo_site(repo_root=repo_root, site_path=site_path, warehouse_root=(repo_root / args.warehouse).resolve())
     print(f"Saved live demo to: {site_path}")
 
 
@@ -10,9 +10,15 @@ from _bootstrap import bootstrap_src_path
 
 bootstrap_src_path()
 
-from isr_trade_study.io.config import build_objects_from_cfg, load_yaml, override_factors
-from isr_trade_study.sim.monte_carlo import run_simulation
-from isr_trade_study.utils.seed import make_rng
+from isr_trade_study.analytics.storage import persist_tables_to_duckdb
+from isr_trade_study.analytics.summary import DEFAULT_BOOTSTRAP_SAMPLES, summarize_frame
+from isr_trade_study.analytics.timeseries import TIMESERIES_TABLE, TimeseriesCollector, load_run_timeseries
+from isr_trade_study.analytics.warehouse import DEFAULT_WAREHOUSE, publish_run
+from isr_trade_study.io.config import build_objects_from_cfg, build_storage_options, load_yaml, override_factors
+from isr_trade_study.sim.cache import open_cache
+from isr_trade_study.sim.monte_carlo import is_seed_independent, run_simulation_batch
+from isr_trade_study.sim.parallel import BatchTask, chunk_seeds, run_tasks, seed_chunk_size
+from isr_trade_study.utils.seed import job_seed
 from isr_trade_study.viz.plots import (
     plot_coverage_heatmap,
     plot_priority_vs_global_coverage,
@@ -37,32 +43,19 @@ def compute_mission_fit_score(agg: pd.DataFrame, weights: dict[str, float]) -> p
     return scored
 
 
-def rerun_timeseries(
-    base_cfg: dict,
-    strategy_type: str,
-    fleet_size: int,
-    sensor_radius: int,
-    seed: int,
-) -> pd.DataFrame:
-    cfg_point = override_factors(
-        base_cfg,
-        fleet_size=fleet_size,
-        sensor_radius=sensor_radius,
-        strategy_type=strategy_type,
-    )
-    cfg_point["run"]["seed"] = int(seed)
-
-    scenario, strategy, seed_used, _ = build_objects_from_cfg(cfg_point)
-    metrics = run_simulation(scenario, strategy, make_rng(seed_used))
-
-    return pd.DataFrame(
-        {
-            "t": list(range(scenario.time.steps)),
-            "coverage": metrics.coverage_over_time,
-            "weighted_coverage": metrics.weighted_coverage_over_time,
-            "task_service": metrics.task_service_over_time,
-        }
-    )
+def best_run_id(raw: pd.DataFrame, best: pd.Series) -> int:
+    """`run_id` of the first replicate (`run_index == 0`) of an aggregated row's point.
+
+    Seeds are hashes of the job identity, so the smallest one is an
+    arbitrary replicate; the first replicate is stable across seed schemes.
+    """
+    match = raw[
+        (raw["strategy"] == best["strategy"])
+        & (raw["num_drones"] == best["num_drones"])
+        & (raw["sensor_radius"] == best["sensor_radius"])
+        & (raw["run_index"] == 0)
+    ]
+    return int(match["run_id"].iloc[0])
 
 
 def format_top_configs(df: pd.DataFrame) -> str:
@@ -142,6 +135,36 @@ def main() -> None:
         default="docs/figures",
         help="Output directory for stable demo figures",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes; output is identical for any value",
+    )
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default=None,
+        help="SQLite result cache; replicates already stored there are not re-simulated",
+    )
+    parser.add_argument(
+        "--cache_max_mb",
+        type=float,
+        default=512.0,
+        help="Size limit for --cache before least-recently-used results are evicted",
+    )
+    parser.add_argument(
+        "--warehouse",
+        type=str,
+        default=str(DEFAULT_WAREHOUSE),
+        help="Cross-run Parquet warehouse to publish this run into; pass '' to skip",
+    )
+    parser.add_argument(
+        "--bootstrap_samples",
+        type=int,
+        default=DEFAULT_BOOTSTRAP_SAMPLES,
+        help="Bootstrap resamples behind the aggregated 95%% confidence intervals; 0 skips them",
+    )
     args = parser.parse_args()
 
     sweep_cfg = load_yaml(args.config)
@@ -165,91 +188,95 @@ def main() -> None:
     base_cfg["run"] = dict(base_cfg.get("run", {}))
     base_cfg["run"]["seed"] = int(sweep_cfg["run"]["seed"])
     base_cfg["run"]["output_dir"] = str(sweep_cfg["run"]["output_dir"])
+    if "storage" in sweep_cfg["run"]:
+        base_cfg["run"]["storage"] = sweep_cfg["run"]["storage"]
+    storage = build_storage_options(base_cfg)
 
     ts = time.strftime("%Y%m%d_%H%M%S")
     demo_dir = Path(base_cfg["run"]["output_dir"]) / f"{sweep_name}_{ts}"
     demo_dir.mkdir(parents=True, exist_ok=True)
 
-    rows: list[dict] = []
     total_jobs = len(strategy_types) * len(fleet_sizes) * len(sensor_radii) * runs_per_point
-    job_idx = 0
+    chunk_size = seed_chunk_size(total_jobs, args.jobs)
+    cache = open_cache(args.cache, args.cache_max_mb)
 
+    points: list[tuple] = []
+    tasks: list[BatchTask] = []
     for strategy_type in strategy_types:
         for fleet_size in fleet_sizes:
             for sensor_radius in sensor_radii:
-                for run_index in range(runs_per_point):
-                    job_idx += 1
-                    strategy_offset = sum(ord(ch) for ch in strategy_type)
-                    seed = (
-                        int(base_cfg["run"]["seed"])
-                        + strategy_offset
-                        + (fleet_size * 10000)
-                        + (sensor_radius * 100)
-                        + run_index
-                    )
-                    cfg_point = override_factors(
-                        base_cfg,
+                seeds = [
+                    job_seed(
+                        int(base_cfg["run"]["seed"]),
+                        strategy=strategy_type,
                         fleet_size=fleet_size,
                         sensor_radius=sensor_radius,
-                        strategy_type=strategy_type,
-                    )
-                    cfg_point["run"]["seed"] = seed
-
-                    scenario, strategy, seed_used, _ = build_objects_from_cfg(cfg_point)
-                    metrics = run_simulation(scenario, strategy, make_rng(seed_used))
-                    rec = metrics.to_dict()
-                    rec.update(
-                        {
-                            "sweep": sweep_name,
-                            "scenario": scenario.name,
-                            "strategy": strategy.type,
-                            "seed": seed_used,
-                            "steps": scenario.time.steps,
-                            "grid_w": scenario.grid.width,
-                            "grid_h": scenario.grid.height,
-                            "num_drones": scenario.fleet.total_drones,
-                            "sensor_radius": scenario.fleet.sensor_radius,
-                            "run_index": run_index,
-                        }
+                        replicate=run_index,
                     )
-                    rows.append(rec)
+                    for run_index in range(runs_per_point)
+                ]
+                cfg_point = override_factors(
+                    base_cfg,
+                    fleet_size=fleet_size,
+                    sensor_radius=sensor_radius,
+                    strategy_type=strategy_type,
+                )
+                cfg_point["run"]["seed"] = seeds[0]
+
+                scenario, strategy, _, _ = build_objects_from_cfg(cfg_point)
+                points.append((scenario, strategy, seeds))
+                tasks.extend(BatchTask(run_simulation_batch, (scenario, strategy), chunk, cache) for chunk in chunk_seeds(seeds, chunk_size))
+
+    done = 0
+
+    def report(index: int, result: list) -> None:
+        nonlocal done
+        done += len(result)
+        scenario, strategy = tasks[index].args
+        print(
+            f"[{done}/{total_jobs}] strategy={strategy.type}, n={scenario.fleet.total_drones}, "
+            f"r={scenario.fleet.sensor_radius} -> weighted_cov={result[-1].final_weighted_coverage:.3f}"
+        )
+
+    replicate_metrics = iter([metrics for batch in run_tasks(tasks, jobs=args.jobs, on_result=report) for metrics in batch])
 
-                    if job_idx % 10 == 0 or job_idx == total_jobs:
-                        print(
-                            f"[{job_idx}/{total_jobs}] strategy={strategy.type}, "
-                            f"n={fleet_size}, r={sensor_radius} -> weighted_cov={rec['final_weighted_coverage']:.3f}"
-                        )
+    rows: list[dict] = []
+    timeseries = TimeseriesCollector()
+    for scenario, strategy, seeds in points:
+        seed_independent = is_seed_independent(scenario, strategy)
+        for run_index, seed_used in enumerate(seeds):
+            metrics = next(replicate_metrics)
+            run_id = len(rows)
+            timeseries.add(run_id, metrics)
+            rec = metrics.to_dict()
+            rec.update(
+                {
+                    "run_id": run_id,
+                    "sweep": sweep_name,
+                    "scenario": scenario.name,
+                    "strategy": strategy.type,
+                    "seed": seed_used,
+                    "steps": scenario.time.steps,
+                    "grid_w": scenario.grid.width,
+                    "grid_h": scenario.grid.height,
+                    "num_drones": scenario.fleet.total_drones,
+                    "sensor_radius": scenario.fleet.sensor_radius,
+                    "run_index": run_index,
+                    "seed_independent": seed_independent,
+                }
+            )
+            rows.append(rec)
 
     raw = pd.DataFrame(rows)
     raw_path = demo_dir / "demo_results_raw.csv"
     raw.to_csv(raw_path, index=False)
 
-    agg = (
-        raw.groupby(["num_drones", "sensor_radius", "strategy"], as_index=False)
-        .agg(
-            {
-                "seed": "min",
-                "steps": "mean",
-                "grid_w": "mean",
-                "grid_h": "mean",
-                "avg_coverage": "mean",
-                "final_coverage": "mean",
-                "avg_weighted_coverage": "mean",
-                "final_weighted_coverage": "mean",
-                "priority_cell_coverage": "mean",
-                "revisit_gap_mean": "mean",
-                "revisit_gap_p90": "mean",
-                "pct_revisits_within_threshold": "mean",
-                "priority_revisit_gap_mean": "mean",
-                "priority_revisit_gap_p90": "mean",
-                "pct_priority_revisits_within_threshold": "mean",
-                "total_cost": "mean",
-                "utilization": "mean",
-                "redundancy_ratio": "mean",
-                "coverage_efficiency": "mean",
-            }
-        )
-        .sort_values(["strategy", "num_drones", "sensor_radius"])
+    agg = summarize_frame(
+        raw,
+        ["num_drones", "sensor_radius", "strategy"],
+        order_by="strategy, num_drones, sensor_radius",
+        extra_aggregates={"seed": "min", "steps": "avg", "grid_w": "avg", "grid_h": "avg"},
+        bootstrap_samples=args.bootstrap_samples,
     )
     agg = compute_mission_fit_score(agg, score_weights)
     agg_path = demo_dir / "demo_results_agg.csv"
@@ -258,20 +285,20 @@ def main() -> None:
     best_static = agg[agg["strategy"] == "static"].sort_values("mission_fit_score", ascending=False).iloc[0]
     best_patrol = agg[agg["strategy"] == "patrol"].sort_values("mission_fit_score", ascending=False).iloc[0]
 
-    static_timeseries = rerun_timeseries(
-        base_cfg,
-        strategy_type="static",
-        fleet_size=int(best_static["num_drones"]),
-        sensor_radius=int(best_static["sensor_radius"]),
-        seed=int(best_static["seed"]),
-    )
-    patrol_timeseries = rerun_timeseries(
-        base_cfg,
-        strategy_type="patrol",
-        fleet_size=int(best_patrol["num_drones"]),
-        sensor_radius=int(best_patrol["sensor_radius"]),
-        seed=int(best_patrol["seed"]),
+    duckdb_path = demo_dir / "analysis.duckdb"
+    persist_tables_to_duckdb(
+        output_dir=demo_dir,
+        duckdb_path=duckdb_path,
+        tables={
+            "demo_results_raw": raw,
+            "demo_results_agg": agg,
+            TIMESERIES_TABLE: timeseries.to_frame(),
+        },
+        options=storage,
     )
+
+    static_timeseries = load_run_timeseries(duckdb_path, best_run_id(raw, best_static))
+    patrol_timeseries = load_run_timeseries(duckdb_path, best_run_id(raw, best_patrol))
     static_timeseries.to_csv(demo_dir / "best_static_timeseries.csv", index=False)
     patrol_timeseries.to_csv(demo_dir / "best_patrol_timeseries.csv", index=False)
 
@@ -312,6 +339,9 @@ def main() -> None:
     print(f"Saved demo outputs to: {demo_dir.resolve()}")
     print(f"Saved demo figures to: {docs_figures.resolve()}")
     print(f"Saved demo report to: {report_path.resolve()}")
+    if args.warehouse:
+        run = publish_run(Path(args.warehouse), demo_dir, storage)
+        print(f"Published {run} to warehouse: {Path(args.warehouse).resolve()}")
 
 
 if __name__ == "__main__":
@@ -13,10 +13,15 @@ from _bootstrap import bootstrap_src_path
 bootstrap_src_path()
 
 from isr_trade_study.analytics.storage import persist_tables_to_duckdb
+from isr_trade_study.analytics.summary import DEFAULT_BOOTSTRAP_SAMPLES, metric_columns, summarize_frame
+from isr_trade_study.analytics.timeseries import TIMESERIES_TABLE, TimeseriesCollector, load_run_timeseries
+from isr_trade_study.analytics.warehouse import DEFAULT_WAREHOUSE, publish_run
 from isr_trade_study.dashboard.html import build_static_dashboard
-from isr_trade_study.io.config import build_objects_from_cfg, load_yaml
-from isr_trade_study.sim.monte_carlo import run_simulation
-from isr_trade_study.utils.seed import make_rng
+from isr_trade_study.io.config import build_objects_from_cfg, build_storage_options, load_yaml
+from isr_trade_study.sim.cache import open_cache
+from isr_trade_study.sim.monte_carlo import is_seed_independent, run_simulation_batch
+from isr_trade_study.sim.parallel import BatchTask, chunk_seeds, run_tasks, seed_chunk_size
+from isr_trade_study.utils.seed import job_seed
 from isr_trade_study.viz.plots import (
     plot_policy_timeseries,
     plot_redundancy_vs_coverage,
@@ -25,10 +30,6 @@ from isr_trade_study.viz.plots import (
 )
 
 
-def _strategy_seed(base_seed: int, strategy: str, run_index: int) -> int:
-    return int(base_seed) + sum(ord(ch) for ch in strategy) + run_index
-
-
 def add_policy_scores(df: pd.DataFrame, weights: dict[str, float]) -> pd.DataFrame:
     scored = df.copy()
 
@@ -56,25 +57,6 @@ def add_policy_scores(df: pd.DataFrame, weights: dict[str, float]) -> pd.DataFra
     return scored
 
 
-def rerun_timeseries(base_cfg: dict, strategy_type: str, seed: int) -> pd.DataFrame:
-    cfg = dict(base_cfg)
-    cfg["run"] = dict(base_cfg["run"])
-    cfg["strategy"] = dict(base_cfg["strategy"])
-    cfg["run"]["seed"] = int(seed)
-    cfg["strategy"]["type"] = strategy_type
-
-    scenario, strategy, seed_used, _ = build_objects_from_cfg(cfg)
-    metrics = run_simulation(scenario, strategy, make_rng(seed_used))
-    return pd.DataFrame(
-        {
-            "t": list(range(scenario.time.steps)),
-            "coverage": metrics.coverage_over_time,
-            "weighted_coverage": metrics.weighted_coverage_over_time,
-            "task_service": metrics.task_service_over_time,
-        }
-    )
-
-
 def build_dashboard_tables(agg: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
     best = agg.sort_values("mission_fit_score", ascending=False).iloc[0]
     baseline = agg[agg["strategy"] == "static"].iloc[0] if "static" in set(agg["strategy"]) else best
@@ -183,6 +165,36 @@ def main() -> None:
         default="docs/figures",
         help="Directory for stable figure exports",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes; output is identical for any value",
+    )
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default=None,
+        help="SQLite result cache; replicates already stored there are not re-simulated",
+    )
+    parser.add_argument(
+        "--cache_max_mb",
+        type=float,
+        default=512.0,
+        help="Size limit for --cache before least-recently-used results are evicted",
+    )
+    parser.add_argument(
+        "--warehouse",
+        type=str,
+        default=str(DEFAULT_WAREHOUSE),
+        help="Cross-run Parquet warehouse to publish this run into; pass '' to skip",
+    )
+    parser.add_argument(
+        "--bootstrap_samples",
+        type=int,
+        default=DEFAULT_BOOTSTRAP_SAMPLES,
+        help="Bootstrap resamples behind the aggregated 95%% confidence intervals; 0 skips them",
+    )
     args = parser.parse_args()
 
     cfg = load_yaml(args.config)
@@ -190,6 +202,9 @@ def main() -> None:
     base_cfg["run"] = dict(base_cfg["run"])
     base_cfg["run"]["seed"] = int(cfg["run"]["seed"])
     base_cfg["run"]["output_dir"] = str(cfg["run"]["output_dir"])
+    if "storage" in cfg["run"]:
+        base_cfg["run"]["storage"] = cfg["run"]["storage"]
+    storage = build_storage_options(base_cfg)
 
     comparison_cfg = cfg["comparison"]
     report_cfg = cfg.get("report", {})
@@ -205,24 +220,52 @@ def main() -> None:
     out_dir = Path(base_cfg["run"]["output_dir"]) / f"{comparison_name}_{ts}"
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    rows: list[dict] = []
     total_jobs = len(strategies) * runs_per_strategy
-    job_idx = 0
+    chunk_size = seed_chunk_size(total_jobs, args.jobs)
+    cache = open_cache(args.cache, args.cache_max_mb)
 
+    points: list[tuple] = []
+    tasks: list[BatchTask] = []
     for strategy_type in strategies:
-        for run_index in range(runs_per_strategy):
-            job_idx += 1
-            run_cfg = dict(base_cfg)
-            run_cfg["run"] = dict(base_cfg["run"])
-            run_cfg["strategy"] = dict(base_cfg["strategy"])
-            run_cfg["strategy"]["type"] = strategy_type
-            run_cfg["run"]["seed"] = _strategy_seed(base_cfg["run"]["seed"], strategy_type, run_index)
-
-            scenario, strategy, seed_used, _ = build_objects_from_cfg(run_cfg)
-            metrics = run_simulation(scenario, strategy, make_rng(seed_used))
+        run_cfg = dict(base_cfg)
+        run_cfg["run"] = dict(base_cfg["run"])
+        run_cfg["strategy"] = dict(base_cfg["strategy"])
+        run_cfg["strategy"]["type"] = strategy_type
+        seeds = [
+            job_seed(int(base_cfg["run"]["seed"]), strategy=strategy_type, replicate=run_index)
+            for run_index in range(runs_per_strategy)
+        ]
+        run_cfg["run"]["seed"] = seeds[0]
+
+        scenario, strategy, _, _ = build_objects_from_cfg(run_cfg)
+        points.append((scenario, strategy, seeds))
+        tasks.extend(BatchTask(run_simulation_batch, (scenario, strategy), chunk, cache) for chunk in chunk_seeds(seeds, chunk_size))
+
+    done = 0
+
+    def report(index: int, result: list) -> None:
+        nonlocal done
+        done += len(result)
+        last = result[-1]
+        print(
+            f"[{done}/{total_jobs}] strategy={tasks[index].args[1].type} "
+            f"task_service={last.avg_task_service_rate:.3f} response={last.mean_task_response_time:.2f}"
+        )
+
+    replicate_metrics = iter([metrics for batch in run_tasks(tasks, jobs=args.jobs, on_result=report) for metrics in batch])
+
+    rows: list[dict] = []
+    timeseries = TimeseriesCollector()
+    for scenario, strategy, seeds in points:
+        seed_independent = is_seed_independent(scenario, strategy)
+        for run_index, seed_used in enumerate(seeds):
+            metrics = next(replicate_metrics)
+            run_id = len(rows)
+            timeseries.add(run_id, metrics)
             row = metrics.to_dict()
             row.update(
                 {
+                    "run_id": run_id,
                     "comparison": comparison_name,
                     "scenario": scenario.name,
                     "strategy": strategy.type,
@@ -234,46 +277,42 @@ def main() -> None:
                     if scenario.fleet.is_heterogeneous
                     else "homogeneous",
                     "run_index": run_index,
+                    "seed_independent": seed_independent,
                 }
             )
             rows.append(row)
 
-            print(
-                f"[{job_idx}/{total_jobs}] strategy={strategy.type} "
-                f"task_service={row['avg_task_service_rate']:.3f} response={row['mean_task_response_time']:.2f}"
-            )
-
     raw = pd.DataFrame(rows)
     raw = add_policy_scores(raw, weights)
     raw_path = out_dir / "policy_results_raw.csv"
     raw.to_csv(raw_path, index=False)
 
-    agg = (
-        raw.groupby(["strategy", "num_drones", "fleet_mix"], as_index=False)
-        .agg(
-            {
-                "seed": "min",
-                "final_coverage": "mean",
-                "final_weighted_coverage": "mean",
-                "priority_cell_coverage": "mean",
-                "pct_priority_revisits_within_threshold": "mean",
-                "avg_task_service_rate": "mean",
-                "task_completion_rate": "mean",
-                "mean_task_response_time": "mean",
-                "p90_task_response_time": "mean",
-                "pct_tasks_responded_within_threshold": "mean",
-                "total_cost": "mean",
-                "utilization": "mean",
-                "redundancy_ratio": "mean",
-                "coverage_efficiency": "mean",
-                "mission_fit_score": "mean",
-            }
-        )
-        .sort_values("mission_fit_score", ascending=False)
+    agg = summarize_frame(
+        raw,
+        ["strategy", "num_drones", "fleet_mix"],
+        order_by="mission_fit_score DESC, strategy, num_drones, fleet_mix",
+        metric_cols=[*metric_columns(raw.columns), "mission_fit_score"],
+        extra_aggregates={"seed": "min"},
+        bootstrap_samples=args.bootstrap_samples,
     )
     agg_path = out_dir / "policy_results_agg.csv"
     agg.to_csv(agg_path, index=False)
 
+    duckdb_path = out_dir / "analysis.duckdb"
+    dashboard_summary, dashboard_top = build_dashboard_tables(agg)
+    persist_tables_to_duckdb(
+        output_dir=out_dir,
+        duckdb_path=duckdb_path,
+        tables={
+            "policy_results_raw": raw,
+            "policy_results_agg": agg,
+            "dashboard_summary": dashboard_summary,
+            "dashboard_top_policies": dashboard_top,
+            TIMESERIES_TABLE: timeseries.to_frame(),
+        },
+        options=storage,
+    )
+
     docs_figures = Path(args.docs_figures)
     strategy_figure = docs_figures / "policy_dynamic_strategy_bars.png"
     response_figure = docs_figures / "policy_dynamic_task_service_vs_response.png"
@@ -298,26 +337,14 @@ def main() -> None:
     for strategy_type in strategies:
         best_row = raw[raw["strategy"] == strategy_type].sort_values("mission_fit_score", ascending=False).iloc[0]
         label = f"{strategy_type} (seed {int(best_row['seed'])})"
-        series = rerun_timeseries(base_cfg, strategy_type, int(best_row["seed"]))
+        series = load_run_timeseries(duckdb_path, int(best_row["run_id"]))
         timeseries_by_label[label] = series
         series.to_csv(out_dir / f"{strategy_type}_best_timeseries.csv", index=False)
     plot_policy_timeseries(timeseries_by_label, out_path=timeseries_figure)
 
-    dashboard_summary, dashboard_top = build_dashboard_tables(agg)
-    persist_tables_to_duckdb(
-        output_dir=out_dir,
-        duckdb_path=out_dir / "analysis.duckdb",
-        tables={
-            "policy_results_raw": raw,
-            "policy_results_agg": agg,
-            "dashboard_summary": dashboard_summary,
-            "dashboard_top_policies": dashboard_top,
-        },
-    )
-
     dashboard_path = out_dir / "dashboard.html"
     build_static_dashboard(
-        duckdb_path=out_dir / "analysis.duckdb",
+        duckdb_path=duckdb_path,
         html_path=dashboard_path,
         summary_table="SELECT * FROM dashboard_summary",
         top_table="SELECT * FROM dashboard_top_policies",
@@ -333,6 +360,9 @@ def main() -> None:
     print(f"Saved aggregated results to: {agg_path.resolve()}")
     print(f"Saved dashboard to: {dashboard_path.resolve()}")
     print(f"Saved report to: {report_path.resolve()}")
+    if args.warehouse:
+        run = publish_run(Path(args.warehouse), out_dir, storage)
+        print(f"Published {run} to warehouse: {Path(args.warehouse).resolve()}")
 
 
 if __name__ == "__main__":
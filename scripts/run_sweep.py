@@ -2,6 +2,10 @@ from __future__ import annotations
 
 import time
 import argparse
+import copy
+import dataclasses
+import hashlib
+import json
 from pathlib import Path
 from typing import Any, Dict
 
@@ -11,10 +15,262 @@ from _bootstrap import bootstrap_src_path
 
 bootstrap_src_path()
 
-from isr_trade_study.analytics.storage import persist_tables_to_duckdb
-from isr_trade_study.io.config import build_objects_from_cfg, load_yaml, override_factors
-from isr_trade_study.utils.seed import make_rng
-from isr_trade_study.sim.monte_carlo import run_simulation
+from isr_trade_study.analytics.storage import StorageOptions, StreamingTableWriter
+from isr_trade_study.analytics.summary import DEFAULT_BOOTSTRAP_SAMPLES, summarize_runs
+from isr_trade_study.analytics.sweep_store import SweepStore, copy_stored_runs
+from isr_trade_study.analytics.timeseries import TIMESERIES_ORDER_BY, TIMESERIES_TABLE, TimeseriesCollector
+from isr_trade_study.analytics.warehouse import DEFAULT_WAREHOUSE, publish_run
+from isr_trade_study.io.config import build_objects_from_cfg, build_storage_options, load_yaml, override_factors
+from isr_trade_study.sim.cache import open_cache
+from isr_trade_study.sim.monte_carlo import (
+    ENGINE_VERSION,
+    is_seed_independent,
+    run_fleet_nested_batch,
+    run_radius_nested_batch,
+    run_simulation_batch,
+    supports_fleet_nesting,
+    supports_radius_nesting,
+)
+from isr_trade_study.sim.parallel import BatchTask, chunk_seeds, run_tasks, seed_chunk_size
+from isr_trade_study.utils.seed import job_seed
+
+
+def point_seeds(
+    base_seed: int,
+    strategy_override: str | None,
+    fleet_size: int,
+    sensor_radius: int,
+    runs_per_point: int,
+    nest_sensor_radii: bool = False,
+    nest_fleet_sizes: bool = False,
+) -> list[int]:
+    # Nested sweeps share one trajectory per seed across the nested factor,
+    # so that factor drops out of the job identity.
+    return [
+        job_seed(
+            base_seed,
+            strategy=strategy_override or "base",
+            fleet_size=None if nest_fleet_sizes else fleet_size,
+            sensor_radius=None if nest_sensor_radii else sensor_radius,
+            replicate=k,
+        )
+        for k in range(runs_per_point)
+    ]
+
+
+def nested_point_tasks(
+    base_cfg: dict,
+    strategy_override: str | None,
+    fleet_sizes: list[int],
+    sensor_radii: list[int],
+    runs_per_point: int,
+    nest_sensor_radii: bool,
+    nest_fleet_sizes: bool,
+) -> list[tuple[BatchTask, dict[int, tuple[int, int]]]]:
+    """Nested batch tasks, each with a map from its result keys to the (fleet size, radius) point."""
+    base_seed = int(base_cfg["run"]["seed"])
+    planned: list[tuple[BatchTask, dict[int, tuple[int, int]]]] = []
+
+    if nest_sensor_radii and sensor_radii:
+        for n in fleet_sizes:
+            seeds = point_seeds(base_seed, strategy_override, n, 0, runs_per_point, nest_sensor_radii=True)
+            cfg_point = override_factors(base_cfg, fleet_size=n, sensor_radius=sensor_radii[0], strategy_type=strategy_override)
+            scenario, strategy, _, _ = build_objects_from_cfg(cfg_point)
+            if not supports_radius_nesting(scenario, strategy):
+                break
+            targets = {r: (n, r) for r in sensor_radii}
+            planned.append((BatchTask(run_radius_nested_batch, (scenario, strategy, sensor_radii), tuple(seeds)), targets))
+
+    if nest_fleet_sizes and fleet_sizes:
+        for r in sensor_radii:
+            seeds = point_seeds(base_seed, strategy_override, 0, r, runs_per_point, nest_fleet_sizes=True)
+            cfg_point = override_factors(base_cfg, fleet_size=max(fleet_sizes), sensor_radius=r, strategy_type=strategy_override)
+            scenario, strategy, _, _ = build_objects_from_cfg(cfg_point)
+            if not supports_fleet_nesting(scenario, strategy):
+                break
+            targets = {n: (n, r) for n in fleet_sizes}
+            planned.append((BatchTask(run_fleet_nested_batch, (scenario, strategy, fleet_sizes), tuple(seeds)), targets))
+
+    return planned
+
+
+def parse_shard(text: str) -> tuple[int, int]:
+    """Parse a 1-based `i/N` shard spec into `(zero-based index, count)`."""
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, got {text!r}.") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard index must be in 1..N, got {text!r}.")
+    return index - 1, count
+
+
+def shard_tasks(
+    planned: list[tuple[BatchTask, dict[Any, tuple]]],
+    shard_index: int,
+    shard_count: int,
+) -> list[tuple[BatchTask, dict[Any, tuple], tuple[int, ...]]]:
+    """This shard's contiguous slice of the (task, replicate) grid.
+
+    Replicates are laid out across the whole plan weighted by the rows they
+    produce (one per target, so a nested replicate counts once per nested
+    level) and cut into `shard_count` contiguous row blocks. A replicate
+    goes to the block its first row falls in, so shards differ by at most
+    one replicate's rows and a point's replicates stay together wherever
+    possible. Each returned task carries the replicate indices of its seeds.
+    """
+    total = sum(len(task.seeds) * len(targets) for task, targets in planned)
+    lo = total * shard_index // shard_count
+    hi = total * (shard_index + 1) // shard_count
+    selected: list[tuple[BatchTask, dict[Any, tuple], tuple[int, ...]]] = []
+    start = 0
+    for task, targets in planned:
+        rows = len(targets)
+        # Replicate k starts at row start + k * rows; keep those starting in [lo, hi).
+        first = min(max(-(-(lo - start) // rows), 0), len(task.seeds))
+        last = min(max(-(-(hi - start) // rows), 0), len(task.seeds))
+        if first < last:
+            seeds = task.seeds[first:last]
+            selected.append((BatchTask(task.func, task.args, seeds), targets, tuple(range(first, last))))
+        start += len(task.seeds) * rows
+    return selected
+
+
+def config_fingerprint(sweep_cfg: dict, base_cfg: dict) -> str:
+    canonical = json.dumps({"sweep": sweep_cfg, "base": base_cfg}, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def store_fingerprint(sweep_cfg: dict, base_cfg: dict) -> str:
+    """Config hash for sweep-store job keys; factor levels and replicate counts
+    are left out so a sweep can be extended without invalidating its jobs, and
+    so are output settings that do not change results."""
+    sweep = copy.deepcopy(sweep_cfg)
+    for field in ("factors", "num_runs_per_point", "strategy_types", "strategy_type"):
+        sweep["sweep"].pop(field, None)
+    sweep.get("run", {}).pop("output_dir", None)
+    sweep.get("run", {}).pop("storage", None)
+    base = copy.deepcopy(base_cfg)
+    base.get("run", {}).pop("storage", None)
+    return config_fingerprint({"engine": ENGINE_VERSION, **sweep}, base)
+
+
+def job_key(fingerprint: str, point: tuple, replicate: int, seed: int) -> str:
+    strategy_override, n, r = point
+    identity = {
+        "config": fingerprint,
+        "strategy": strategy_override or "base",
+        "fleet_size": n,
+        "sensor_radius": r,
+        "replicate": replicate,
+        "seed": seed,
+    }
+    return hashlib.sha256(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def job_record(sweep_name: str, scenario: Any, strategy: Any, seed: int, k: int, seed_independent: bool, run_id: int, metrics: Any) -> Dict[str, Any]:
+    rec = metrics.to_dict()
+
+    rec.update({
+        "run_id": run_id,
+        "sweep": sweep_name,
+        "scenario": scenario.name,
+        "strategy": strategy.type,
+        "seed": seed,
+        "steps": scenario.time.steps,
+        "grid_w": scenario.grid.width,
+        "grid_h": scenario.grid.height,
+        "num_drones": scenario.fleet.total_drones,
+        "sensor_radius": scenario.fleet.sensor_radius,
+        "endurance_steps": scenario.fleet.endurance_steps,
+        "cost_per_step": scenario.fleet.cost_per_step,
+        "fleet_mix": "mixed" if scenario.fleet.is_heterogeneous else "homogeneous",
+        "run_index": k,
+        "seed_independent": seed_independent,
+    })
+    return rec
+
+
+SWEEP_GROUP_COLS = ["num_drones", "sensor_radius", "strategy"]
+
+
+def write_sweep_outputs(
+    sweep_dir: Path,
+    writer: StreamingTableWriter,
+    write_csv: bool = True,
+    bootstrap_samples: int = DEFAULT_BOOTSTRAP_SAMPLES,
+) -> None:
+    """Sort the streamed raw/timeseries tables, aggregate, and export everything."""
+    writer.finalize({"sweep_results_raw": "run_id", TIMESERIES_TABLE: TIMESERIES_ORDER_BY})
+
+    # Aggregated table (mean, spread and bootstrap CI per (n,r,strategy)),
+    # computed inside DuckDB so the raw rows never come back to pandas.
+    agg = summarize_runs(
+        writer.con,
+        "sweep_results_raw",
+        SWEEP_GROUP_COLS,
+        order_by=", ".join(SWEEP_GROUP_COLS),
+        bootstrap_samples=bootstrap_samples,
+    )
+    writer.write_frame("sweep_results_agg", agg)
+    writer.export_parquet(sweep_dir, ["sweep_results_raw", "sweep_results_agg", TIMESERIES_TABLE])
+
+    outputs = [sweep_dir / "analysis.duckdb"]
+    if write_csv:
+        raw_path = sweep_dir / "sweep_results_raw.csv"
+        writer.export_csv("sweep_results_raw", raw_path)
+        agg_path = sweep_dir / "sweep_results_agg.csv"
+        agg.to_csv(agg_path, index=False)
+        outputs = [raw_path, agg_path]
+
+    print("\nSaved sweep outputs to:\n" + "".join(f"- {path}\n" for path in outputs))
+
+
+def publish_sweep(warehouse: str, sweep_dir: Path, storage: StorageOptions) -> None:
+    if warehouse:
+        run = publish_run(Path(warehouse), sweep_dir, storage)
+        print(f"Published {run} to warehouse: {Path(warehouse).resolve()}")
+
+
+def merge_shards(
+    shards_dir: Path,
+    write_csv: bool = True,
+    warehouse: str = "",
+    bootstrap_samples: int = DEFAULT_BOOTSTRAP_SAMPLES,
+) -> None:
+    """Combine every shard under `shards_dir` into one complete sweep directory."""
+    manifests = [json.loads(path.read_text(encoding="utf-8")) for path in sorted(shards_dir.glob("shard_*/shard.json"))]
+    if not manifests:
+        raise ValueError(f"No shards found under {shards_dir}.")
+    first = manifests[0]
+    for manifest in manifests:
+        for field in ("sweep", "config_fingerprint", "shard_count", "total_rows"):
+            if manifest[field] != first[field]:
+                raise ValueError(f"Shards under {shards_dir} disagree on {field}.")
+    found = sorted(manifest["shard_index"] for manifest in manifests)
+    missing = sorted(set(range(first["shard_count"])) - set(found))
+    if missing or len(found) != first["shard_count"]:
+        raise ValueError(
+            f"Expected shards 1..{first['shard_count']} under {shards_dir}; "
+            f"missing {[index + 1 for index in missing]}, found {[index + 1 for index in found]}."
+        )
+
+    ts = time.strftime("%Y%m%d_%H%M%S")
+    sweep_dir = Path(first["output_dir"]) / f"{first['sweep']}_{ts}"
+    total = first["total_rows"]
+    storage = StorageOptions(**first["storage"])
+    with StreamingTableWriter(sweep_dir / "analysis.duckdb", options=storage) as writer:
+        for manifest in sorted(manifests, key=lambda m: m["shard_index"]):
+            shard_dir = shards_dir / manifest["directory"]
+            writer.append_parquet("sweep_results_raw", shard_dir / "sweep_results_raw.parquet")
+            writer.append_parquet(TIMESERIES_TABLE, shard_dir / f"{TIMESERIES_TABLE}.parquet")
+        count, distinct, lo, hi = writer.con.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT run_id), MIN(run_id), MAX(run_id) FROM sweep_results_raw__staging"
+        ).fetchone()
+        if (count, distinct, lo, hi) != (total, total, 0, total - 1):
+            raise ValueError(f"Shards under {shards_dir} do not cover run_id 0..{total - 1} exactly once.")
+        write_sweep_outputs(sweep_dir, writer, write_csv, bootstrap_samples)
+    publish_sweep(warehouse, sweep_dir, storage)
 
 
 def main() -> None:
@@ -25,17 +281,82 @@ def main() -> None:
         default="configs/sweeps/sweep_01.yaml",
         help="Path to sweep YAML config",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes; output is identical for any value",
+    )
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default=None,
+        help="SQLite result cache; replicates already stored there are not re-simulated",
+    )
+    parser.add_argument(
+        "--cache_max_mb",
+        type=float,
+        default=512.0,
+        help="Size limit for --cache before least-recently-used results are evicted",
+    )
+    parser.add_argument(
+        "--warehouse",
+        type=str,
+        default=str(DEFAULT_WAREHOUSE),
+        help="Cross-run Parquet warehouse to publish this run into; pass '' to skip",
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=None,
+        help="DuckDB sweep store; finished jobs are saved as they complete and skipped on rerun",
+    )
+    parser.add_argument(
+        "--shard",
+        type=str,
+        default=None,
+        help="Run only shard i of N (e.g. 2/8) and write partial Parquet for `merge`",
+    )
+    parser.add_argument(
+        "--skip_csv",
+        action="store_true",
+        help="Skip the raw/agg CSV exports; Parquet and analysis.duckdb are always written",
+    )
+    parser.add_argument(
+        "--bootstrap_samples",
+        type=int,
+        default=DEFAULT_BOOTSTRAP_SAMPLES,
+        help="Bootstrap resamples behind the aggregated 95%% confidence intervals; 0 skips them",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    merge_parser = subparsers.add_parser("merge", help="Combine shard outputs into one sweep directory")
+    merge_parser.add_argument("shards_dir", type=str, help="Directory holding shard_*/ outputs")
     args = parser.parse_args()
 
+    if args.command == "merge":
+        merge_shards(
+            Path(args.shards_dir),
+            write_csv=not args.skip_csv,
+            warehouse=args.warehouse,
+            bootstrap_samples=args.bootstrap_samples,
+        )
+        return
+
     sweep_cfg = load_yaml(args.config)
     base_cfg_path = sweep_cfg["base_config"]
     base_cfg = load_yaml(base_cfg_path)
+    fingerprint = config_fingerprint(sweep_cfg, base_cfg)
+    store_key = store_fingerprint(sweep_cfg, base_cfg)
 
     sweep_name = str(sweep_cfg["sweep"]["name"])
     runs_per_point = int(sweep_cfg["sweep"]["num_runs_per_point"])
 
     fleet_sizes = list(sweep_cfg["sweep"]["factors"]["fleet_sizes"])
     sensor_radii = list(sweep_cfg["sweep"]["factors"]["sensor_radii"])
+    nest_sensor_radii = bool(sweep_cfg["sweep"].get("nest_sensor_radii", False))
+    nest_fleet_sizes = bool(sweep_cfg["sweep"].get("nest_fleet_sizes", False))
+    if nest_sensor_radii and nest_fleet_sizes:
+        raise ValueError("Choose at most one of sweep.nest_sensor_radii and sweep.nest_fleet_sizes.")
 
     strategy_types = sweep_cfg["sweep"].get("strategy_types")
     if strategy_types is None:
@@ -48,103 +369,178 @@ def main() -> None:
     base_cfg["run"] = dict(base_cfg.get("run", {}))
     base_cfg["run"]["seed"] = int(sweep_cfg["run"]["seed"])
     base_cfg["run"]["output_dir"] = str(sweep_cfg["run"]["output_dir"])
+    if "storage" in sweep_cfg["run"]:
+        base_cfg["run"]["storage"] = sweep_cfg["run"]["storage"]
+    storage = build_storage_options(base_cfg)
 
-    ts = time.strftime("%Y%m%d_%H%M%S")
     out_root = Path(base_cfg["run"]["output_dir"])
-    sweep_dir = out_root / f"{sweep_name}_{ts}"
-    sweep_dir.mkdir(parents=True, exist_ok=True)
+    shard_index, shard_count = parse_shard(args.shard) if args.shard is not None else (0, 1)
 
-    rows: list[Dict[str, Any]] = []
-
-    total_jobs = len(strategy_types) * len(fleet_sizes) * len(sensor_radii) * runs_per_point
-    job_idx = 0
+    base_seed = int(base_cfg["run"]["seed"])
 
+    # Plan every point first, then run the batches (possibly in parallel) and
+    # order rows by run_id so the output never depends on scheduling.
+    points: list[tuple[tuple, Any, Any, list[int]]] = []
+    planned: list[tuple[BatchTask, dict[Any, tuple]]] = []
     for strategy_override in strategy_types:
+        nested_points: set[tuple[int, int]] = set()
+        for task, targets in nested_point_tasks(
+            base_cfg,
+            strategy_override,
+            fleet_sizes,
+            sensor_radii,
+            runs_per_point,
+            nest_sensor_radii,
+            nest_fleet_sizes,
+        ):
+            planned.append((task, {level: (strategy_override, n, r) for level, (n, r) in targets.items()}))
+            nested_points.update(targets.values())
+
         for n in fleet_sizes:
             for r in sensor_radii:
-                for k in range(runs_per_point):
-                    job_idx += 1
-                    strategy_offset = sum(ord(ch) for ch in (strategy_override or "base"))
-                    seed = int(base_cfg["run"]["seed"]) + strategy_offset + (n * 10000) + (r * 100) + k
-                    cfg_point = override_factors(base_cfg, fleet_size=n, sensor_radius=r, strategy_type=strategy_override)
-                    cfg_point["run"]["seed"] = seed
-
-                    scenario, strategy, seed_used, _ = build_objects_from_cfg(cfg_point)
-                    rng = make_rng(seed_used)
-
-                    metrics = run_simulation(scenario, strategy, rng)
-                    rec = metrics.to_dict()
-
-                    rec.update({
-                        "sweep": sweep_name,
-                        "scenario": scenario.name,
-                        "strategy": strategy.type,
-                        "seed": seed_used,
-                        "steps": scenario.time.steps,
-                        "grid_w": scenario.grid.width,
-                        "grid_h": scenario.grid.height,
-                        "num_drones": scenario.fleet.total_drones,
-                        "sensor_radius": scenario.fleet.sensor_radius,
-                        "endurance_steps": scenario.fleet.endurance_steps,
-                        "cost_per_step": scenario.fleet.cost_per_step,
-                        "fleet_mix": "mixed" if scenario.fleet.is_heterogeneous else "homogeneous",
-                        "run_index": k,
-                    })
-
-                    rows.append(rec)
-
-                    if job_idx % 10 == 0 or job_idx == total_jobs:
-                        print(
-                            f"[{job_idx}/{total_jobs}] strategy={strategy.type}, "
-                            f"n={n}, r={r}, run={k} -> final_cov={rec['final_coverage']:.3f}"
-                        )
-
-    df = pd.DataFrame(rows)
-
-    # Save raw sweep results
-    raw_path = sweep_dir / "sweep_results_raw.csv"
-    df.to_csv(raw_path, index=False)
-
-    # Save aggregated table (mean across runs per (n,r,strategy))
-    group_cols = ["num_drones", "sensor_radius", "strategy"]
-    agg = (
-        df.groupby(group_cols, as_index=False)
-          .agg({
-                "avg_coverage": "mean",
-                "final_coverage": "mean",
-                "avg_weighted_coverage": "mean",
-                "final_weighted_coverage": "mean",
-                "priority_cell_coverage": "mean",
-                "revisit_gap_mean": "mean",
-                "revisit_gap_p90": "mean",
-                "pct_revisits_within_threshold": "mean",
-                "priority_revisit_gap_mean": "mean",
-                "priority_revisit_gap_p90": "mean",
-                "pct_priority_revisits_within_threshold": "mean",
-                "avg_task_service_rate": "mean",
-                "task_completion_rate": "mean",
-                "mean_task_response_time": "mean",
-                "p90_task_response_time": "mean",
-                "pct_tasks_responded_within_threshold": "mean",
-                "total_cost": "mean",
-                "utilization": "mean",
-                "redundancy_ratio": "mean",
-                "coverage_efficiency": "mean",
-            })
-          .sort_values(group_cols)
-    )
-    agg_path = sweep_dir / "sweep_results_agg.csv"
-    agg.to_csv(agg_path, index=False)
-    persist_tables_to_duckdb(
-        output_dir=sweep_dir,
-        duckdb_path=sweep_dir / "analysis.duckdb",
-        tables={
-            "sweep_results_raw": df,
-            "sweep_results_agg": agg,
-        },
-    )
+                seeds = point_seeds(
+                    base_seed, strategy_override, n, r, runs_per_point, nest_sensor_radii, nest_fleet_sizes
+                )
+                cfg_point = override_factors(base_cfg, fleet_size=n, sensor_radius=r, strategy_type=strategy_override)
+                cfg_point["run"]["seed"] = seeds[0]
+
+                scenario, strategy, _, _ = build_objects_from_cfg(cfg_point)
+                key = (strategy_override, n, r)
+                points.append((key, scenario, strategy, seeds))
+                if (n, r) not in nested_points:
+                    planned.append((BatchTask(run_simulation_batch, (scenario, strategy), tuple(seeds)), {None: key}))
+
+    cache = open_cache(args.cache, args.cache_max_mb)
+    selected = shard_tasks(planned, shard_index, shard_count)
+    if not selected:
+        raise ValueError(
+            f"Shard {args.shard} has no jobs; this sweep's "
+            f"{sum(len(task.seeds) for task, _ in planned)} replicates are too few for {shard_count} shards."
+        )
+
+    point_info = {key: (point_index, scenario, strategy, seeds) for point_index, (key, scenario, strategy, seeds) in enumerate(points)}
+    seed_independent = {key: is_seed_independent(scenario, strategy) for key, scenario, strategy, _ in points}
+
+    def run_id_of(point: tuple, k: int) -> int:
+        # run_id is the row's position in the full (unsharded) sweep.
+        return point_info[point][0] * runs_per_point + k
+
+    def record_of(point: tuple, k: int, metrics: Any) -> Dict[str, Any]:
+        _, scenario, strategy, seeds = point_info[point]
+        return job_record(sweep_name, scenario, strategy, seeds[k], k, seed_independent[point], run_id_of(point, k), metrics)
+
+    def key_of(point: tuple, k: int) -> str:
+        return job_key(store_key, point, k, point_info[point][3][k])
+
+    store = SweepStore(Path(args.store)) if args.store else None
+    selected_jobs = {(point, k) for _, targets, ks in selected for point in targets.values() for k in ks}
+    completed = store.completed([key_of(*job) for job in selected_jobs]) if store is not None else set()
+
+    # Seeds whose every row is already stored are skipped; nested seeds rerun
+    # whole, but only their missing rows are stored.
+    pending: list[tuple[BatchTask, dict[Any, tuple], tuple[int, ...]]] = []
+    for task, targets, ks in selected:
+        keep = [i for i, k in enumerate(ks) if any(key_of(point, k) not in completed for point in targets.values())]
+        if keep:
+            pending.append((BatchTask(task.func, task.args, tuple(task.seeds[i] for i in keep)), targets, tuple(ks[i] for i in keep)))
+    if completed:
+        print(f"Skipping {len(completed)} jobs already in {args.store}")
+
+    total_jobs = sum(len(task.seeds) * len(targets) for task, targets, _ in pending)
+    chunk_size = seed_chunk_size(sum(len(task.seeds) for task, _, _ in pending), args.jobs)
+    chunks: list[tuple[BatchTask, dict[Any, tuple], tuple[int, ...]]] = []
+    for task, targets, ks in pending:
+        for lo in range(0, len(ks), chunk_size):
+            seeds = task.seeds[lo : lo + chunk_size]
+            chunks.append((BatchTask(task.func, task.args, seeds, cache), targets, ks[lo : lo + chunk_size]))
+
+    if args.shard is None:
+        ts = time.strftime("%Y%m%d_%H%M%S")
+        sweep_dir = out_root / f"{sweep_name}_{ts}"
+        writer = StreamingTableWriter(sweep_dir / "analysis.duckdb", options=storage)
+    else:
+        shards_dir = out_root / f"{sweep_name}_shards"
+        shard_dir_name = f"shard_{shard_index + 1:04d}_of_{shard_count:04d}"
+        shard_dir = shards_dir / shard_dir_name
+        # Shard Parquet is only read back by `merge`, so no views are published.
+        writer = StreamingTableWriter(shard_dir / "staging.duckdb", options=dataclasses.replace(storage, mode="tables"))
+
+    def batch_frames(finished: list[tuple[tuple, int, Any]]) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Results rows and long timeseries for a batch of finished jobs."""
+        collector = TimeseriesCollector()
+        for point, k, run_metrics in finished:
+            collector.add(run_id_of(point, k), run_metrics)
+        runs = pd.DataFrame([record_of(point, k, run_metrics) for point, k, run_metrics in finished])
+        return runs, collector.to_frame()
+
+    done = 0
+
+    def collect(index: int, result: Any) -> None:
+        nonlocal done
+        task, targets, ks = chunks[index]
+        by_level = result if isinstance(result, dict) else {None: result}
+        finished = [
+            (targets[level], k, run_metrics)
+            for level, metrics in by_level.items()
+            for k, run_metrics in zip(ks, metrics)
+        ]
+        if store is None:
+            runs, series = batch_frames(finished)
+            writer.append("sweep_results_raw", runs)
+            writer.append(TIMESERIES_TABLE, series)
+        else:
+            finished = [job for job in finished if key_of(job[0], job[1]) not in completed]
+            if finished:
+                keys = {run_id_of(point, k): key_of(point, k) for point, k, _ in finished}
+                runs, series = batch_frames(finished)
+                runs["job_key"] = runs["run_id"].map(keys)
+                series.insert(0, "job_key", series.pop("run_id").map(keys))
+                store.append(runs, series)
+
+        done += len(task.seeds) * len(targets)
+        _, n, r = next(iter(targets.values()))
+        nested = "" if len(targets) == 1 else f" (+{len(targets) - 1} nested)"
+        print(f"[{done}/{total_jobs}] strategy={task.args[1].type}, n={n}, r={r}{nested}")
+
+    run_tasks([task for task, _, _ in chunks], jobs=args.jobs, on_result=collect, keep_results=False)
+
+    if store is not None:
+        ordered = [(key, k) for key, _, _, seeds in points for k in range(len(seeds)) if (key, k) in selected_jobs]
+        store.close()
+        copy_stored_runs(
+            store.path,
+            writer,
+            [key_of(*job) for job in ordered],
+            [run_id_of(*job) for job in ordered],
+            runs_table="sweep_results_raw",
+            timeseries_table=TIMESERIES_TABLE,
+        )
+
+    if args.shard is None:
+        with writer:
+            write_sweep_outputs(sweep_dir, writer, write_csv=not args.skip_csv, bootstrap_samples=args.bootstrap_samples)
+        publish_sweep(args.warehouse, sweep_dir, storage)
+        return
 
-    print(f"\nSaved sweep outputs to:\n- {raw_path}\n- {agg_path}\n")
+    with writer:
+        writer.finalize({"sweep_results_raw": "run_id", TIMESERIES_TABLE: TIMESERIES_ORDER_BY})
+        writer.export_parquet(shard_dir, ["sweep_results_raw", TIMESERIES_TABLE])
+        rows = writer.con.execute("SELECT COUNT(*) FROM sweep_results_raw").fetchone()[0]
+    (shard_dir / "staging.duckdb").unlink()
+    manifest = {
+        "sweep": sweep_name,
+        "config_fingerprint": fingerprint,
+        "shard_index": shard_index,
+        "shard_count": shard_count,
+        "directory": shard_dir_name,
+        "rows": rows,
+        "total_rows": len(points) * runs_per_point,
+        "output_dir": str(out_root),
+        "storage": dataclasses.asdict(storage),
+    }
+    (shard_dir / "shard.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    print(f"\nSaved shard {shard_index + 1}/{shard_count} ({rows} rows) to: {shard_dir}")
+    print(f"Merge with: python scripts/run_sweep.py merge {shards_dir}")
 
 
 if __name__ == "__main__":
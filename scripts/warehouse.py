@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from _bootstrap import bootstrap_src_path
+
+bootstrap_src_path()
+
+from isr_trade_study.analytics.storage import StorageOptions
+from isr_trade_study.analytics.warehouse import CATALOG_NAME, DEFAULT_WAREHOUSE, compact_warehouse, publish_run, tag_run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the cross-run results warehouse.")
+    parser.add_argument(
+        "--warehouse",
+        type=str,
+        default=str(DEFAULT_WAREHOUSE),
+        help="Warehouse root holding the partitioned Parquet tables and catalog.duckdb",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    publish_parser = subparsers.add_parser("publish", help="Add existing run directories to the warehouse")
+    publish_parser.add_argument("run_dirs", nargs="+", type=str, help="Demo, policy or sweep run directories")
+    tag_parser = subparsers.add_parser("tag", help="Tag a run so retention never removes it")
+    tag_parser.add_argument("run", type=str, help="Run label (its directory name)")
+    tag_parser.add_argument("tag", type=str, help="Tag to add, e.g. 'baseline'")
+    tag_parser.add_argument("--remove", action="store_true", help="Remove the tag instead")
+    compact_parser = subparsers.add_parser(
+        "compact", help="Apply retention and merge the warehouse into one sorted file per partition"
+    )
+    compact_parser.add_argument(
+        "--keep_last",
+        type=int,
+        default=None,
+        help="Keep only the newest N runs of each kind and study (tagged runs are always kept)",
+    )
+    compact_parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Also remove runs whose every raw row reappears in a newer run of the same study",
+    )
+    compact_parser.add_argument(
+        "--remove_run_dirs",
+        action="store_true",
+        help="Also delete the source results/ directories of removed runs",
+    )
+    compact_parser.add_argument("--compression", type=str, default="zstd", help="Parquet codec for compacted files")
+    compact_parser.add_argument(
+        "--row_group_size", type=int, default=122_880, help="Rows per Parquet row group in compacted files"
+    )
+    compact_parser.add_argument("--dry_run", action="store_true", help="Only report what would be removed")
+    args = parser.parse_args()
+
+    warehouse = Path(args.warehouse)
+    if args.command == "publish":
+        for run_dir in args.run_dirs:
+            run = publish_run(warehouse, Path(run_dir))
+            print(f"Published {run}")
+        print(f"Warehouse catalog: {(warehouse / CATALOG_NAME).resolve()}")
+    elif args.command == "tag":
+        tag_run(warehouse, args.run, args.tag, remove=args.remove)
+        print(f"{'Untagged' if args.remove else 'Tagged'} {args.run}: {args.tag}")
+    elif args.command == "compact":
+        report = compact_warehouse(
+            warehouse,
+            keep_last=args.keep_last,
+            dedupe=args.dedupe,
+            remove_run_dirs=args.remove_run_dirs,
+            dry_run=args.dry_run,
+            options=StorageOptions(compression=args.compression.lower(), row_group_size=args.row_group_size),
+        )
+        verb = "Would remove" if args.dry_run else "Removed"
+        for run in report.expired:
+            print(f"{verb} {run} (beyond --keep_last)")
+        for run in report.superseded:
+            print(f"{verb} {run} (rows all present in a newer run)")
+        if not args.dry_run:
+            print(f"Compacted {report.files_before} Parquet files into {report.files_after}")
+
+
+if __name__ == "__main__":
+    main()
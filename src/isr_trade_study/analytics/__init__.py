@@ -1,3 +1,3 @@
 """Persistence and analytics helpers for sweep and policy outputs."""
 
-__all__ = ["storage"]
+__all__ = ["storage", "summary", "sweep_store", "timeseries", "warehouse"]
@@ -1,18 +1,67 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Mapping
+from typing import Mapping, Optional
 
 import duckdb
 import pandas as pd
 
 
+DEFAULT_CHUNK_ROWS = 10_000
+
+STORAGE_MODES = ("tables", "views")
+PARQUET_COMPRESSIONS = ("uncompressed", "snappy", "gzip", "zstd", "lz4", "brotli")
+
+
+@dataclass(frozen=True)
+class StorageOptions:
+    """How result tables land in `analysis.duckdb` and the Parquet files beside it.
+
+    `mode="tables"` copies every table into the DuckDB file as well as to
+    Parquet. `mode="views"` writes each table once, to Parquet, and leaves
+    only views over those files in DuckDB, so the database stays a few
+    kilobytes. Views reference the Parquet files by absolute path; call
+    `create_parquet_views` again if a run directory is moved.
+    `compression` and `row_group_size` are passed to DuckDB's Parquet writer
+    (its defaults are snappy and 122,880 rows).
+    """
+
+    mode: str = "tables"
+    compression: str = "snappy"
+    row_group_size: int = 122_880
+
+    def __post_init__(self) -> None:
+        if self.mode not in STORAGE_MODES:
+            raise ValueError(f"Unknown storage mode: {self.mode} (expected one of {', '.join(STORAGE_MODES)}).")
+        if self.compression not in PARQUET_COMPRESSIONS:
+            raise ValueError(
+                f"Unknown Parquet compression: {self.compression} (expected one of {', '.join(PARQUET_COMPRESSIONS)})."
+            )
+        if self.row_group_size < 1:
+            raise ValueError("row_group_size must be at least 1.")
+
+    def copy_options(self) -> str:
+        return f"FORMAT PARQUET, COMPRESSION {self.compression}, ROW_GROUP_SIZE {self.row_group_size}"
+
+
+def create_parquet_views(con: duckdb.DuckDBPyConnection, parquet_paths: Mapping[str, Path], schema: Optional[str] = None) -> None:
+    """(Re)create one view per table over its Parquet file."""
+    prefix = f"{schema}." if schema else ""
+    for name, parquet_path in parquet_paths.items():
+        con.execute(
+            f"CREATE OR REPLACE VIEW {prefix}{name} AS "
+            f"SELECT * FROM read_parquet('{parquet_path.resolve().as_posix()}')"
+        )
+
+
 def persist_tables_to_duckdb(
     output_dir: Path,
     duckdb_path: Path,
     tables: Mapping[str, pd.DataFrame],
+    options: StorageOptions = StorageOptions(),
 ) -> None:
-    """Persist named DataFrames as both Parquet files and DuckDB tables."""
+    """Persist named DataFrames as Parquet files plus DuckDB tables or views."""
     output_dir.mkdir(parents=True, exist_ok=True)
     duckdb_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -21,6 +70,146 @@ def persist_tables_to_duckdb(
             parquet_path = output_dir / f"{name}.parquet"
             relation_name = f"{name}_df"
             con.register(relation_name, df)
-            con.execute(f"CREATE OR REPLACE TABLE {name} AS SELECT * FROM {relation_name}")
-            con.execute(f"COPY {name} TO '{parquet_path.as_posix()}' (FORMAT PARQUET)")
+            if options.mode == "views":
+                # DuckDB scans the registered frame in place, so each table is written exactly once.
+                con.execute(f"COPY (SELECT * FROM {relation_name}) TO '{parquet_path.as_posix()}' ({options.copy_options()})")
+                create_parquet_views(con, {name: parquet_path})
+            else:
+                con.execute(f"CREATE OR REPLACE TABLE {name} AS SELECT * FROM {relation_name}")
+                con.execute(f"COPY {name} TO '{parquet_path.as_posix()}' ({options.copy_options()})")
             con.unregister(relation_name)
+
+
+class StreamingTableWriter:
+    """Appends result batches to DuckDB tables in fixed-size chunks.
+
+    Frames passed to `append` are buffered per table and inserted once
+    `chunk_rows` rows have accumulated, so the process never holds more than
+    one chunk per table. Rows land in `<name>__staging` tables; `finalize`
+    rewrites each one into `<name>` in a given order and `export_parquet` /
+    `export_csv` stream the finished tables back out.
+
+    With `options.mode == "views"` the working tables live in a scratch
+    database next to `duckdb_path` that is deleted on `close`, and
+    `export_parquet` leaves only views over the exported files in
+    `duckdb_path`.
+    """
+
+    def __init__(
+        self,
+        duckdb_path: Path,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        options: StorageOptions = StorageOptions(),
+    ) -> None:
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows must be at least 1.")
+        duckdb_path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = duckdb_path
+        self.chunk_rows = chunk_rows
+        self.options = options
+        self.work_path = duckdb_path.with_name(f"{duckdb_path.stem}.work.duckdb") if options.mode == "views" else duckdb_path
+        self.con = duckdb.connect(str(self.work_path))
+        self._buffers: dict[str, list[pd.DataFrame]] = {}
+        self._buffered_rows: dict[str, int] = {}
+        self._staged: set[str] = set()
+
+    def __enter__(self) -> "StreamingTableWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.con.close()
+        if self.work_path != self.path:
+            self.work_path.unlink(missing_ok=True)
+            self.work_path.with_name(f"{self.work_path.name}.wal").unlink(missing_ok=True)
+
+    def append(self, table: str, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        self._buffers.setdefault(table, []).append(df)
+        self._buffered_rows[table] = self._buffered_rows.get(table, 0) + len(df)
+        if self._buffered_rows[table] >= self.chunk_rows:
+            self._flush_table(table)
+
+    def append_parquet(self, table: str, parquet_path: Path) -> None:
+        """Stage every row of a Parquet file without loading it into pandas."""
+        self.append_query(table, f"SELECT * FROM read_parquet('{parquet_path.as_posix()}')")
+
+    def append_query(self, table: str, sql: str) -> None:
+        """Stage the rows of a SELECT run on this writer's connection, without loading them into pandas."""
+        self._flush_table(table)
+        self._insert(table, f"({sql})")
+
+    def flush(self) -> None:
+        for table in list(self._buffers):
+            self._flush_table(table)
+
+    def _flush_table(self, table: str) -> None:
+        frames = self._buffers.pop(table, [])
+        self._buffered_rows.pop(table, None)
+        if not frames:
+            return
+        batch = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        self.con.register("batch_df", batch)
+        try:
+            self._insert(table, "batch_df")
+        finally:
+            self.con.unregister("batch_df")
+
+    def _insert(self, table: str, source: str) -> None:
+        staging = f"{table}__staging"
+        if table not in self._staged:
+            self.con.execute(f"CREATE OR REPLACE TABLE {staging} AS SELECT * FROM {source} LIMIT 0")
+            self._staged.add(table)
+        self.con.execute(f"INSERT INTO {staging} BY NAME SELECT * FROM {source}")
+
+    def finalize(self, order_by: Mapping[str, str]) -> None:
+        """Flush and rewrite each staged table into its final name, sorted by `order_by[table]`."""
+        self.flush()
+        for table, order in order_by.items():
+            if table not in self._staged:
+                raise ValueError(f"No rows were written to {table}.")
+            staging = f"{table}__staging"
+            self.con.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT * FROM {staging} ORDER BY {order}")
+            self.con.execute(f"DROP TABLE {staging}")
+            self._staged.discard(table)
+
+    def write_frame(self, table: str, df: pd.DataFrame) -> None:
+        """Store a small, already-complete frame as a final table."""
+        self.con.register("frame_df", df)
+        try:
+            self.con.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT * FROM frame_df")
+        finally:
+            self.con.unregister("frame_df")
+
+    def query(self, sql: str) -> pd.DataFrame:
+        return self.con.execute(sql).df()
+
+    def export_parquet(self, output_dir: Path, tables: list[str]) -> None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        parquet_paths = {table: output_dir / f"{table}.parquet" for table in tables}
+        for table, parquet_path in parquet_paths.items():
+            self.con.execute(f"COPY {table} TO '{parquet_path.as_posix()}' ({self.options.copy_options()})")
+        if self.work_path != self.path:
+            self.con.execute(f"ATTACH '{self.path.as_posix()}' AS published")
+            try:
+                create_parquet_views(self.con, parquet_paths, schema="published")
+            finally:
+                self.con.execute("DETACH published")
+
+    def export_csv(self, table: str, csv_path: Path) -> None:
+        """Write a final table to CSV one chunk at a time, formatted as `DataFrame.to_csv`."""
+        result = self.con.execute(f"SELECT * FROM {table}")
+        vectors = max(1, self.chunk_rows // 2048)
+        with open(csv_path, "w", encoding="utf-8", newline="") as handle:
+            header = True
+            while True:
+                chunk = result.fetch_df_chunk(vectors)
+                if chunk.empty and not header:
+                    break
+                chunk.to_csv(handle, index=False, header=header)
+                if chunk.empty:
+                    break
+                header = False
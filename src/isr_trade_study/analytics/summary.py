@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import math
+from typing import Iterable, Mapping, Sequence
+
+import duckdb
+import pandas as pd
+
+from isr_trade_study.sim.metrics import METRIC_COLUMNS
+
+
+DEFAULT_BOOTSTRAP_SAMPLES = 1000
+DEFAULT_BOOTSTRAP_BLOCKS = 64
+DEFAULT_CONFIDENCE = 0.95
+PERCENTILES = (0.1, 0.5, 0.9)
+
+# Poisson(1) cumulative probabilities up to where the tail is below 1e-12.
+_POISSON_CDF: tuple[float, ...] = tuple(
+    sum(math.exp(-1.0) / math.factorial(j) for j in range(k + 1)) for k in range(15)
+)
+
+
+def stat_columns(metric: str) -> list[str]:
+    """Uncertainty columns `summarize_runs` adds for `metric`, in output order."""
+    return [
+        f"{metric}_std",
+        f"{metric}_se",
+        *(f"{metric}_p{round(q * 100)}" for q in PERCENTILES),
+        f"{metric}_ci_low",
+        f"{metric}_ci_high",
+    ]
+
+
+def metric_columns(columns: Iterable[str]) -> list[str]:
+    """The `RunMetrics` metric columns among `columns`, in `METRIC_COLUMNS` order."""
+    present = set(columns)
+    return [name for name in METRIC_COLUMNS if name in present]
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _std(col: str) -> str:
+    # DuckDB raises on infinite input; report NaN like pandas does instead.
+    return f"CASE WHEN bool_or(isinf({col})) THEN CAST('NaN' AS DOUBLE) ELSE stddev_samp({col}) FILTER (WHERE NOT isinf({col})) END"
+
+
+def _poisson_weight(uniform: str) -> str:
+    return " + ".join(f"CAST({uniform} >= {cdf!r} AS INTEGER)" for cdf in _POISSON_CDF)
+
+
+def summarize_runs(
+    con: duckdb.DuckDBPyConnection,
+    source: str,
+    group_cols: Sequence[str],
+    order_by: str,
+    metric_cols: Sequence[str] | None = None,
+    extra_aggregates: Mapping[str, str] | None = None,
+    key_col: str = "run_id",
+    bootstrap_samples: int = DEFAULT_BOOTSTRAP_SAMPLES,
+    bootstrap_blocks: int = DEFAULT_BOOTSTRAP_BLOCKS,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Per-point mean and uncertainty of every metric, computed in DuckDB.
+
+    `source` is any relation DuckDB can scan (a table, a registered frame
+    or `read_parquet(...)`), so the raw rows never have to fit in pandas.
+    `metric_cols` defaults to every `RunMetrics` metric in the source, so
+    new metrics are summarized without touching the callers.
+    The result has the group columns, `extra_aggregates` (`column ->
+    aggregate function`, e.g. `{"seed": "min"}`), each metric's mean under
+    its own name and `n_runs`, followed per metric by the `stat_columns`:
+    sample std, standard error, linear p10/p50/p90 and a percentile
+    bootstrap confidence interval of the mean.
+
+    The bootstrap resamples blocks, not rows: a second pass hashes each
+    row's `key_col` into one of `bootstrap_blocks` blocks per point and
+    keeps only per-block sums and counts. Each of `bootstrap_samples`
+    resamples then weights every block by a Poisson(1) draw derived from a
+    hash of `(seed, block, sample)`, so the intervals are reproducible.
+    The draws are shared by all points (blocks are independent within a
+    point, which is what each interval needs). The source is therefore
+    scanned twice, and the bootstrap touches points x min(n_runs,
+    bootstrap_blocks) x bootstrap_samples block rows however large the raw
+    table is. With `bootstrap_samples=0` the interval columns are NULL.
+    """
+    if bootstrap_samples < 0:
+        raise ValueError("bootstrap_samples must be non-negative.")
+    if bootstrap_blocks < 1:
+        raise ValueError("bootstrap_blocks must be at least 1.")
+    if not 0.0 < confidence < 1.0:
+        raise ValueError("confidence must be between 0 and 1.")
+    extra_aggregates = extra_aggregates or {}
+    if metric_cols is None:
+        metric_cols = metric_columns(column for column, *_ in con.execute(f"SELECT * FROM {source} LIMIT 0").description)
+    groups = ", ".join(_quote(col) for col in group_cols)
+    join_on = " AND ".join(f"p.{_quote(col)} IS NOT DISTINCT FROM b.{_quote(col)}" for col in group_cols)
+    metrics = [_quote(col) for col in metric_cols]
+
+    point_columns = [f"{func}({_quote(col)}) AS {_quote(col)}" for col, func in extra_aggregates.items()]
+    point_columns += [f"avg({col}) AS {col}" for col in metrics]
+    point_columns.append("count(*) AS n_runs")
+    for name, col in zip(metric_cols, metrics):
+        std = _std(col)
+        point_columns.append(f"{std} AS {_quote(name + '_std')}")
+        point_columns.append(f"{std} / sqrt(count({col})) AS {_quote(name + '_se')}")
+        for q in PERCENTILES:
+            point_columns.append(f"quantile_cont({col}, {q}) AS {_quote(f'{name}_p{round(q * 100)}')}")
+
+    tail = (1.0 - confidence) / 2.0
+    # DuckDB's multi-argument hash mixes small integers poorly, so each draw
+    # hashes one distinct value with the seed folded in.
+    seed_hash = f"hash({int(seed)})"
+    block_of = f"hash(xor(hash({_quote(key_col)}), {seed_hash})) % {int(bootstrap_blocks)}"
+    uniform = (
+        f"CAST(hash(xor(sample * {int(bootstrap_blocks)} + block, {seed_hash})) AS DOUBLE) "
+        "/ 18446744073709551616.0"
+    )
+    block_sums = [f"sum({col}) AS _sum{i}, count({col}) AS _count{i}" for i, col in enumerate(metrics)]
+    resample_means = [
+        f"sum(w * _sum{i}) FILTER (WHERE w > 0) / nullif(sum(w * _count{i}) FILTER (WHERE w > 0), 0) AS {col}"
+        for i, col in enumerate(metrics)
+    ]
+    interval_columns = [
+        f"quantile_cont({col}, {tail!r}) AS {_quote(name + '_ci_low')}, "
+        f"quantile_cont({col}, {1.0 - tail!r}) AS {_quote(name + '_ci_high')}"
+        for name, col in zip(metric_cols, metrics)
+    ]
+
+    output = [f"p.{_quote(col)}" for col in [*group_cols, *extra_aggregates, *metric_cols, "n_runs"]]
+    for name in metric_cols:
+        output += [f"p.{_quote(col)}" for col in stat_columns(name)[:-2]]
+        output += [f"b.{_quote(col)}" for col in stat_columns(name)[-2:]]
+
+    sql = f"""
+        WITH points AS (
+            SELECT {groups}, {", ".join(point_columns)}
+            FROM {source}
+            GROUP BY {groups}
+        ),
+        blocks AS (
+            SELECT {groups}, {block_of} AS block, {", ".join(block_sums)}
+            FROM {source}
+            GROUP BY ALL
+        ),
+        weights AS (
+            SELECT block, sample, {_poisson_weight(uniform)} AS w
+            FROM (SELECT range AS block FROM range({int(bootstrap_blocks)}))
+            CROSS JOIN (SELECT range AS sample FROM range({int(bootstrap_samples)}))
+        ),
+        resamples AS (
+            SELECT {groups}, sample, {", ".join(resample_means)}
+            FROM blocks JOIN weights USING (block)
+            GROUP BY {groups}, sample
+        ),
+        intervals AS (
+            SELECT {groups}, {", ".join(interval_columns)}
+            FROM resamples
+            GROUP BY {groups}
+        )
+        SELECT {", ".join(output)}
+        FROM points p LEFT JOIN intervals b ON {join_on}
+        ORDER BY {order_by}
+    """
+    return con.execute(sql).df()
+
+
+def summarize_frame(
+    frame: pd.DataFrame,
+    group_cols: Sequence[str],
+    order_by: str,
+    **kwargs: object,
+) -> pd.DataFrame:
+    """`summarize_runs` over an in-memory results frame."""
+    with duckdb.connect() as con:
+        con.register("runs_frame", frame)
+        return summarize_runs(con, "runs_frame", group_cols, order_by, **kwargs)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Sequence
+
+import duckdb
+import pandas as pd
+
+from .storage import StreamingTableWriter
+
+
+RUNS_TABLE = "sweep_runs"
+TIMESERIES_TABLE = "sweep_run_timeseries"
+
+
+class SweepStore:
+    """Persistent DuckDB store of completed sweep jobs, keyed by `job_key`.
+
+    Rows are appended in one transaction per batch as jobs finish, so a
+    killed sweep keeps everything it had completed and a rerun can skip
+    those keys; `copy_stored_runs` moves them into the sweep's outputs. Both tables are created from the first batch's schema: runs
+    hold one results row per job, timeseries hold `(job_key, t, series,
+    value)` long rows.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.con = duckdb.connect(str(path))
+
+    def __enter__(self) -> "SweepStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.con.close()
+
+    def _has_table(self, name: str) -> bool:
+        found = self.con.execute(
+            "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?", [name]
+        ).fetchone()[0]
+        return bool(found)
+
+    def completed(self, keys: Sequence[str]) -> set[str]:
+        """The subset of `keys` already stored."""
+        if not keys or not self._has_table(RUNS_TABLE):
+            return set()
+        wanted = pd.DataFrame({"job_key": list(keys)})
+        self.con.register("wanted_keys", wanted)
+        try:
+            found = self.con.execute(
+                f"SELECT DISTINCT r.job_key FROM {RUNS_TABLE} r JOIN wanted_keys w USING (job_key)"
+            ).fetchall()
+        finally:
+            self.con.unregister("wanted_keys")
+        return {key for (key,) in found}
+
+    def append(self, runs: pd.DataFrame, timeseries: pd.DataFrame) -> None:
+        """Store a batch of finished jobs; both frames carry a `job_key` column."""
+        if runs.empty:
+            return
+        self.con.execute("BEGIN TRANSACTION")
+        try:
+            for table, df in ((RUNS_TABLE, runs), (TIMESERIES_TABLE, timeseries)):
+                self.con.register("batch_df", df)
+                if not self._has_table(table):
+                    self.con.execute(f"CREATE TABLE {table} AS SELECT * FROM batch_df LIMIT 0")
+                self.con.execute(f"INSERT INTO {table} BY NAME SELECT * FROM batch_df")
+                self.con.unregister("batch_df")
+            self.con.execute("COMMIT")
+        except Exception:
+            self.con.execute("ROLLBACK")
+            raise
+
+
+def copy_stored_runs(
+    store_path: Path,
+    writer: StreamingTableWriter,
+    keys: Sequence[str],
+    run_ids: Sequence[int],
+    runs_table: str,
+    timeseries_table: str,
+) -> None:
+    """Stage stored runs and their timeseries into `writer`, renumbered with `run_ids`.
+
+    The store is attached read-only to the writer's connection and rows are
+    copied inside DuckDB, so only the key list is held in memory. The store
+    must be closed first. Row order is left to `writer.finalize`.
+    """
+    wanted = pd.DataFrame({"job_key": list(keys), "run_id": list(run_ids)})
+    con = writer.con
+    con.execute(f"ATTACH '{store_path.as_posix()}' AS sweep_store (READ_ONLY)")
+    con.register("wanted_keys", wanted)
+    try:
+        stored = con.execute(
+            f"SELECT COUNT(*) FROM sweep_store.{RUNS_TABLE} r JOIN wanted_keys w USING (job_key)"
+        ).fetchone()[0]
+        if stored != len(keys):
+            raise ValueError(f"Sweep store {store_path} holds {stored} of the {len(keys)} requested jobs.")
+        writer.append_query(
+            runs_table,
+            f"SELECT r.* EXCLUDE (job_key) REPLACE (w.run_id AS run_id) "
+            f"FROM sweep_store.{RUNS_TABLE} r JOIN wanted_keys w USING (job_key)",
+        )
+        writer.append_query(
+            timeseries_table,
+            f"SELECT w.run_id, s.t, s.series, s.value "
+            f"FROM sweep_store.{TIMESERIES_TABLE} s JOIN wanted_keys w USING (job_key)",
+        )
+    finally:
+        con.unregister("wanted_keys")
+        con.execute("DETACH sweep_store")
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from isr_trade_study.sim.metrics import RunMetrics
+
+
+TIMESERIES_TABLE = "replicate_timeseries"
+
+# Long-table series name -> RunMetrics attribute.
+SERIES_FIELDS = {
+    "coverage": "coverage_over_time",
+    "weighted_coverage": "weighted_coverage_over_time",
+    "task_service": "task_service_over_time",
+}
+
+# SQL ORDER BY reproducing `TimeseriesCollector.to_frame` row order.
+TIMESERIES_ORDER_BY = "run_id, list_position([{}], series), t".format(
+    ", ".join(f"'{name}'" for name in SERIES_FIELDS)
+)
+
+
+class TimeseriesCollector:
+    """Collects every replicate's per-step series into one long table.
+
+    The table has one row per `(run_id, series, t)` with the series value
+    in `value`; `run_id` matches the `run_id` column of the raw results.
+    """
+
+    def __init__(self) -> None:
+        self._run_ids: list[np.ndarray] = []
+        self._series: list[np.ndarray] = []
+        self._steps: list[np.ndarray] = []
+        self._values: list[np.ndarray] = []
+
+    def add(self, run_id: int, metrics: RunMetrics) -> None:
+        for series, field in SERIES_FIELDS.items():
+            values = np.asarray(getattr(metrics, field), dtype=float)
+            self._run_ids.append(np.full(values.size, run_id, dtype=np.int64))
+            self._series.append(np.full(values.size, series, dtype=object))
+            self._steps.append(np.arange(values.size, dtype=np.int64))
+            self._values.append(values)
+
+    def to_frame(self) -> pd.DataFrame:
+        if not self._values:
+            return pd.DataFrame(
+                {
+                    "run_id": pd.Series(dtype="int64"),
+                    "t": pd.Series(dtype="int64"),
+                    "series": pd.Series(dtype="object"),
+                    "value": pd.Series(dtype="float64"),
+                }
+            )
+        return pd.DataFrame(
+            {
+                "run_id": np.concatenate(self._run_ids),
+                "t": np.concatenate(self._steps),
+                "series": np.concatenate(self._series),
+                "value": np.concatenate(self._values),
+            }
+        )
+
+
+def load_run_timeseries(duckdb_path: Path, run_id: int) -> pd.DataFrame:
+    """Wide `t, coverage, weighted_coverage, task_service` frame for one stored run."""
+    with duckdb.connect(str(duckdb_path), read_only=True) as con:
+        long = con.execute(
+            f"SELECT t, series, value FROM {TIMESERIES_TABLE} WHERE run_id = ? ORDER BY series, t",
+            [int(run_id)],
+        ).df()
+    if long.empty:
+        raise ValueError(f"No stored timeseries for run_id={run_id} in {duckdb_path}.")
+    wide = long.pivot(index="t", columns="series", values="value").reset_index()
+    wide.columns.name = None
+    return wide[["t", *SERIES_FIELDS]]
@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import os
+import re
+import shutil
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import duckdb
+import pandas as pd
+
+from .storage import StorageOptions
+from .timeseries import TIMESERIES_ORDER_BY, TIMESERIES_TABLE
+
+
+DEFAULT_WAREHOUSE = Path("results") / "warehouse"
+CATALOG_NAME = "catalog.duckdb"
+RUNS_TABLE = "runs"
+TAGS_TABLE = "run_tags"
+RAW_TABLE = "results_raw"
+AGG_TABLE = "results_agg"
+WAREHOUSE_TABLES = (RAW_TABLE, AGG_TABLE, TIMESERIES_TABLE)
+PARTITION_COLS = ("kind", "scenario", "strategy", "date")
+
+_RUN_LABEL = re.compile(r"^(?P<study>.+)_(?P<stamp>\d{8}_\d{6})$")
+_RUNS_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {RUNS_TABLE} (
+    run VARCHAR PRIMARY KEY,
+    kind VARCHAR NOT NULL,
+    study VARCHAR NOT NULL,
+    scenario VARCHAR NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    date DATE NOT NULL,
+    run_dir VARCHAR NOT NULL,
+    raw_rows BIGINT NOT NULL,
+    compacted BOOLEAN NOT NULL DEFAULT false
+)
+"""
+_TAGS_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {TAGS_TABLE} (
+    run VARCHAR NOT NULL,
+    tag VARCHAR NOT NULL,
+    PRIMARY KEY (run, tag)
+)
+"""
+# Sort order inside compacted files, so row-group statistics prune by run.
+_COMPACT_ORDER = {
+    RAW_TABLE: "run, run_id",
+    AGG_TABLE: "run",
+    TIMESERIES_TABLE: f"run, {TIMESERIES_ORDER_BY}",
+}
+# Columns that name where a row was published rather than what it contains.
+_PLACEMENT_COLS = ("kind", "date", "run", "run_id")
+
+
+def _sql_str(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _run_identity(run_dir: Path) -> tuple[str, datetime]:
+    """`(study, created_at)` from a `<study>_<YYYYmmdd_HHMMSS>` run directory."""
+    match = _RUN_LABEL.match(run_dir.name)
+    if match is None:
+        return run_dir.name, datetime.fromtimestamp(run_dir.stat().st_mtime).replace(microsecond=0)
+    return match["study"], datetime.strptime(match["stamp"], "%Y%m%d_%H%M%S")
+
+
+def _run_tables(run_dir: Path) -> tuple[str, dict[str, Path]]:
+    """Run kind and the warehouse tables found in a run directory."""
+    raw = sorted(run_dir.glob("*_results_raw.parquet"))
+    if len(raw) != 1:
+        raise ValueError(f"Expected exactly one *_results_raw.parquet in {run_dir}, found {len(raw)}.")
+    kind = raw[0].name[: -len("_results_raw.parquet")]
+    tables = {RAW_TABLE: raw[0]}
+    agg = run_dir / f"{kind}_results_agg.parquet"
+    if agg.exists():
+        tables[AGG_TABLE] = agg
+    timeseries = run_dir / f"{TIMESERIES_TABLE}.parquet"
+    if timeseries.exists():
+        tables[TIMESERIES_TABLE] = timeseries
+    return kind, tables
+
+
+def _ensure_catalog(con: duckdb.DuckDBPyConnection) -> None:
+    con.execute(_RUNS_SCHEMA)
+    con.execute(f"ALTER TABLE {RUNS_TABLE} ADD COLUMN IF NOT EXISTS compacted BOOLEAN DEFAULT false")
+    con.execute(_TAGS_SCHEMA)
+
+
+def _parquet_glob(warehouse_root: Path, table: str) -> str:
+    return (warehouse_root.resolve() / table / "**" / "*.parquet").as_posix()
+
+
+def refresh_catalog_views(con: duckdb.DuckDBPyConnection, warehouse_root: Path) -> None:
+    """(Re)create one view per warehouse table over all of its partitions.
+
+    Columns are unioned by name, so demo, policy and sweep rows share a view
+    and filters on the partition columns only open matching directories.
+    """
+    for table in WAREHOUSE_TABLES:
+        if not any((warehouse_root / table).glob("**/*.parquet")):
+            con.execute(f"DROP VIEW IF EXISTS {table}")
+            continue
+        con.execute(
+            f"CREATE OR REPLACE VIEW {table} AS SELECT * FROM read_parquet("
+            f"{_sql_str(_parquet_glob(warehouse_root, table))}, hive_partitioning = true, union_by_name = true)"
+        )
+
+
+def publish_run(warehouse_root: Path, run_dir: Path, options: StorageOptions = StorageOptions()) -> str:
+    """Copy a finished run directory into the warehouse and register it in the catalog.
+
+    Raw rows, aggregates and `replicate_timeseries` are written as
+    `<table>/kind=/scenario=/strategy=/date=/<run>_<i>.parquet` with a `run`
+    column naming the source directory. Aggregate rows carry the run's
+    scenario (`mixed` when its raw rows span several); timeseries rows take
+    scenario and strategy from their raw row. Republishing a run replaces
+    its files and catalog entry. Returns the run label.
+    """
+    kind, tables = _run_tables(run_dir)
+    run = run_dir.name
+    study, created_at = _run_identity(run_dir)
+    warehouse_root.mkdir(parents=True, exist_ok=True)
+    own_file = re.compile(rf"^{re.escape(run)}_\d+\.parquet$")
+
+    with duckdb.connect(str(warehouse_root / CATALOG_NAME)) as con:
+        _ensure_catalog(con)
+        compacted = con.execute(f"SELECT compacted FROM {RUNS_TABLE} WHERE run = ?", [run]).fetchone()
+        if compacted is not None and compacted[0]:
+            raise ValueError(f"Run {run} was compacted into shared files and can no longer be republished.")
+        raw_source = f"read_parquet({_sql_str(tables[RAW_TABLE].as_posix())})"
+        scenarios = [name for (name,) in con.execute(f"SELECT DISTINCT scenario FROM {raw_source} ORDER BY 1").fetchall()]
+        run_scenario = scenarios[0] if len(scenarios) == 1 else "mixed"
+        raw_rows = con.execute(f"SELECT COUNT(*) FROM {raw_source}").fetchone()[0]
+
+        extra = f"{_sql_str(kind)} AS kind, DATE {_sql_str(created_at.date().isoformat())} AS date, {_sql_str(run)} AS run"
+        selects = {RAW_TABLE: f"SELECT *, {extra} FROM {raw_source} ORDER BY run_id"}
+        if AGG_TABLE in tables:
+            agg_source = f"read_parquet({_sql_str(tables[AGG_TABLE].as_posix())})"
+            agg_columns = con.execute(f"SELECT * FROM {agg_source} LIMIT 0").df().columns
+            scenario = "" if "scenario" in agg_columns else f"{_sql_str(run_scenario)} AS scenario, "
+            selects[AGG_TABLE] = f"SELECT *, {scenario}{extra} FROM {agg_source}"
+        if TIMESERIES_TABLE in tables:
+            selects[TIMESERIES_TABLE] = (
+                f"SELECT s.*, r.scenario, r.strategy, {extra} "
+                f"FROM read_parquet({_sql_str(tables[TIMESERIES_TABLE].as_posix())}) s "
+                f"JOIN (SELECT run_id, scenario, strategy FROM {raw_source}) r USING (run_id) "
+                f"ORDER BY s.run_id"
+            )
+
+        for table in WAREHOUSE_TABLES:
+            for stale in (warehouse_root / table).glob("**/*.parquet"):
+                if own_file.match(stale.name):
+                    stale.unlink()
+        for table, select in selects.items():
+            (warehouse_root / table).mkdir(parents=True, exist_ok=True)
+            con.execute(
+                f"COPY ({select}) TO {_sql_str((warehouse_root / table).as_posix())} ("
+                f"{options.copy_options()}, PARTITION_BY ({', '.join(PARTITION_COLS)}), "
+                f"OVERWRITE_OR_IGNORE, FILENAME_PATTERN {_sql_str(run + '_{i}')})"
+            )
+
+        con.execute(
+            f"INSERT OR REPLACE INTO {RUNS_TABLE} "
+            f"(run, kind, study, scenario, created_at, date, run_dir, raw_rows) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                run,
+                kind,
+                study,
+                run_scenario,
+                created_at,
+                created_at.date(),
+                os.path.relpath(run_dir.resolve(), warehouse_root.resolve()),
+                raw_rows,
+            ],
+        )
+        refresh_catalog_views(con, warehouse_root)
+    return run
+
+
+def latest_run(warehouse_root: Path, kind: str, study: str) -> Optional[tuple[str, Path]]:
+    """Label and directory of the newest cataloged run of `study`, if any."""
+    catalog = warehouse_root / CATALOG_NAME
+    if not catalog.exists():
+        return None
+    with duckdb.connect(str(catalog), read_only=True) as con:
+        found = con.execute(
+            f"SELECT run, run_dir FROM {RUNS_TABLE} WHERE kind = ? AND study = ? "
+            f"ORDER BY created_at DESC, run DESC LIMIT 1",
+            [kind, study],
+        ).fetchone()
+    if found is None:
+        return None
+    run, run_dir = found
+    return run, Path(os.path.normpath(warehouse_root / run_dir))
+
+
+def load_run_table(warehouse_root: Path, table: str, kind: str, run: str) -> pd.DataFrame:
+    """One run's rows from a warehouse view, without the warehouse-only columns."""
+    if table not in WAREHOUSE_TABLES:
+        raise ValueError(f"Unknown warehouse table: {table}")
+    with duckdb.connect(str(warehouse_root / CATALOG_NAME), read_only=True) as con:
+        return con.execute(
+            f"SELECT * EXCLUDE (kind, date, run) FROM {table} WHERE kind = ? AND run = ?", [kind, run]
+        ).df()
+
+
+def tag_run(warehouse_root: Path, run: str, tag: str, remove: bool = False) -> None:
+    """Attach `tag` to a cataloged run (or detach it); tagged runs survive retention."""
+    with duckdb.connect(str(warehouse_root / CATALOG_NAME)) as con:
+        _ensure_catalog(con)
+        if con.execute(f"SELECT COUNT(*) FROM {RUNS_TABLE} WHERE run = ?", [run]).fetchone()[0] == 0:
+            raise ValueError(f"Run {run} is not in the warehouse catalog.")
+        if remove:
+            con.execute(f"DELETE FROM {TAGS_TABLE} WHERE run = ? AND tag = ?", [run, tag])
+        else:
+            con.execute(f"INSERT OR IGNORE INTO {TAGS_TABLE} VALUES (?, ?)", [run, tag])
+
+
+@dataclass(frozen=True)
+class CompactionReport:
+    expired: tuple[str, ...]
+    superseded: tuple[str, ...]
+    files_before: int
+    files_after: int
+
+    @property
+    def removed(self) -> tuple[str, ...]:
+        return tuple(sorted(set(self.expired) | set(self.superseded)))
+
+
+def _expired_runs(con: duckdb.DuckDBPyConnection, keep_last: int) -> list[str]:
+    """Untagged runs older than the newest `keep_last` of their kind and study."""
+    rows = con.execute(
+        f"SELECT run FROM ("
+        f"  SELECT run, row_number() OVER (PARTITION BY kind, study ORDER BY created_at DESC, run DESC) AS rank"
+        f"  FROM {RUNS_TABLE}"
+        f") WHERE rank > ? AND run NOT IN (SELECT run FROM {TAGS_TABLE}) ORDER BY run",
+        [keep_last],
+    ).fetchall()
+    return [run for (run,) in rows]
+
+
+def _superseded_runs(con: duckdb.DuckDBPyConnection, warehouse_root: Path) -> list[str]:
+    """Untagged runs whose every raw row also appears in a newer run of the same study.
+
+    Rows are compared by an MD5 content hash of every column except where
+    they were published (`kind`, `date`, `run`, `run_id`), so an identical
+    rerun, or a sweep later extended with more points or replicates, makes
+    the earlier run redundant.
+    """
+    if not any((warehouse_root / RAW_TABLE).glob("**/*.parquet")):
+        return []
+    columns = [name for (name, *_rest) in con.execute(f"DESCRIBE {RAW_TABLE}").fetchall() if name not in _PLACEMENT_COLS]
+    content = "struct_pack(" + ", ".join(f'"{name}" := "{name}"' for name in columns) + ")"
+    rows = con.execute(
+        f"""
+        WITH hashes AS (
+            SELECT DISTINCT run, md5(CAST(to_json({content}) AS VARCHAR)) AS content_hash FROM {RAW_TABLE}
+        ),
+        pairs AS (
+            SELECT older.run AS older, newer.run AS newer
+            FROM {RUNS_TABLE} older JOIN {RUNS_TABLE} newer
+              ON older.kind = newer.kind AND older.study = newer.study
+             AND (newer.created_at, newer.run) > (older.created_at, older.run)
+        )
+        SELECT DISTINCT p.older FROM pairs p
+        WHERE p.older NOT IN (SELECT run FROM {TAGS_TABLE})
+          AND NOT EXISTS (
+              SELECT 1 FROM hashes a
+              WHERE a.run = p.older
+                AND NOT EXISTS (SELECT 1 FROM hashes b WHERE b.run = p.newer AND b.content_hash = a.content_hash)
+          )
+        ORDER BY 1
+        """
+    ).fetchall()
+    return [run for (run,) in rows]
+
+
+def _rewrite_table(con: duckdb.DuckDBPyConnection, warehouse_root: Path, table: str, options: StorageOptions) -> None:
+    """Rewrite a table as one sorted file per partition, dropping runs listed in `removed_runs`."""
+    table_dir = warehouse_root / table
+    if not any(table_dir.glob("**/*.parquet")):
+        return
+    staging_dir = warehouse_root / f".{table}.compacting"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    staging_dir.mkdir()
+    source = f"read_parquet({_sql_str(_parquet_glob(warehouse_root, table))}, hive_partitioning = true, union_by_name = true)"
+    keep = f"SELECT * FROM {source} WHERE run NOT IN (SELECT run FROM removed_runs)"
+    if con.execute(f"SELECT COUNT(*) FROM ({keep})").fetchone()[0]:
+        con.execute(
+            f"COPY ({keep} ORDER BY {_COMPACT_ORDER[table]}) TO {_sql_str(staging_dir.as_posix())} ("
+            f"{options.copy_options()}, PARTITION_BY ({', '.join(PARTITION_COLS)}), "
+            f"OVERWRITE_OR_IGNORE, FILENAME_PATTERN 'compacted_{{i}}')"
+        )
+    retired_dir = warehouse_root / f".{table}.retired"
+    shutil.rmtree(retired_dir, ignore_errors=True)
+    table_dir.rename(retired_dir)
+    staging_dir.rename(table_dir)
+    shutil.rmtree(retired_dir)
+
+
+def compact_warehouse(
+    warehouse_root: Path,
+    keep_last: Optional[int] = None,
+    dedupe: bool = False,
+    remove_run_dirs: bool = False,
+    dry_run: bool = False,
+    options: StorageOptions = StorageOptions(compression="zstd"),
+) -> CompactionReport:
+    """Apply retention, then merge every table into one sorted file per partition.
+
+    Runs beyond the newest `keep_last` per kind and study expire, and with
+    `dedupe` runs superseded by a newer run with the same rows are dropped
+    too (see `_superseded_runs`); tagged runs are always kept. Removed runs
+    leave the catalog and the warehouse files; their source run directory
+    is only deleted with `remove_run_dirs`. Compacted runs cannot be
+    republished.
+    With `dry_run` nothing is changed and the report lists what would be.
+    """
+    if keep_last is not None and keep_last < 1:
+        raise ValueError("keep_last must be at least 1.")
+    catalog = warehouse_root / CATALOG_NAME
+    if not catalog.exists():
+        raise ValueError(f"No warehouse catalog at {catalog}.")
+
+    files_before = sum(1 for table in WAREHOUSE_TABLES for _ in (warehouse_root / table).glob("**/*.parquet"))
+    with duckdb.connect(str(catalog)) as con:
+        _ensure_catalog(con)
+        expired = _expired_runs(con, keep_last) if keep_last is not None else []
+        superseded = [run for run in _superseded_runs(con, warehouse_root) if run not in expired] if dedupe else []
+        report = CompactionReport(tuple(expired), tuple(superseded), files_before, files_before)
+        if dry_run:
+            return report
+
+        con.execute(
+            "CREATE OR REPLACE TEMP TABLE removed_runs AS SELECT unnest(CAST(? AS VARCHAR[])) AS run",
+            [list(report.removed)],
+        )
+        run_dirs = [
+            run_dir
+            for (run_dir,) in con.execute(
+                f"SELECT run_dir FROM {RUNS_TABLE} WHERE run IN (SELECT run FROM removed_runs)"
+            ).fetchall()
+        ]
+        for table in WAREHOUSE_TABLES:
+            _rewrite_table(con, warehouse_root, table, options)
+        con.execute("BEGIN TRANSACTION")
+        con.execute(f"DELETE FROM {RUNS_TABLE} WHERE run IN (SELECT run FROM removed_runs)")
+        con.execute(f"DELETE FROM {TAGS_TABLE} WHERE run IN (SELECT run FROM removed_runs)")
+        con.execute(f"UPDATE {RUNS_TABLE} SET compacted = true")
+        con.execute("COMMIT")
+        refresh_catalog_views(con, warehouse_root)
+
+    if remove_run_dirs:
+        for relative in run_dirs:
+            run_dir = Path(os.path.normpath(warehouse_root / relative))
+            # Only delete directories that still look like the published run.
+            if run_dir.is_dir() and any(run_dir.glob("*_results_raw.parquet")):
+                shutil.rmtree(run_dir)
+    files_after = sum(1 for table in WAREHOUSE_TABLES for _ in (warehouse_root / table).glob("**/*.parquet"))
+    return CompactionReport(report.expired, report.superseded, files_before, files_after)
@@ -7,8 +7,12 @@ The site stitches together:
   * stable showcase figures committed under ``docs/figures``
   * deep links into the per-run reports + dashboards
 
-Designed to render even when no runs are present: every section
-fails over to a friendly empty-state instead of crashing.
+Runs are looked up in the results warehouse catalog
+(``results/warehouse/catalog.duckdb``) first; when the catalog is missing
+or has no run of a study, the newest run directory under ``results/`` is
+used instead. If neither has a run the build fails and points at
+``scripts/warehouse.py publish`` to backfill the catalog. Sections whose
+run has no rows or whose figures are missing still render an empty-state.
 """
 
 from __future__ import annotations
@@ -19,6 +23,7 @@ import math
 from pathlib import Path
 from typing import Any, Sequence
 
+from ..analytics.warehouse import AGG_TABLE, DEFAULT_WAREHOUSE, latest_run, load_run_table
 from .theme import (
     relative_to,
     render_figure,
@@ -38,24 +43,33 @@ _STABLE_FIGURES: tuple[tuple[str, str, bool], ...] = (
 )
 
 
-def _latest(pattern_root: Path, pattern: str) -> Path | None:
-    matches = sorted(pattern_root.glob(pattern))
-    return matches[-1] if matches else None
-
-
-def _read_rows(path: Path) -> list[dict[str, str]]:
-    with path.open("r", encoding="utf-8", newline="") as handle:
-        return list(csv.DictReader(handle))
+def _latest_agg_rows(
+    warehouse_root: Path, results_root: Path, kind: str, study: str
+) -> tuple[list[dict[str, Any]], Path]:
+    latest = latest_run(warehouse_root, kind, study)
+    if latest is not None:
+        run, run_dir = latest
+        return load_run_table(warehouse_root, AGG_TABLE, kind, run).to_dict("records"), run_dir
+
+    # Runs from before the warehouse existed (or published nowhere) are only on disk.
+    agg_files = sorted((results_root / kind).glob(f"{study}_*/{kind}_results_agg.csv"))
+    if agg_files:
+        with agg_files[-1].open(newline="", encoding="utf-8") as handle:
+            return list(csv.DictReader(handle)), agg_files[-1].parent
+    raise FileNotFoundError(
+        f"No {kind} run of {study} in {warehouse_root} or {results_root / kind}. "
+        f"Generate one, or backfill the catalog with `python scripts/warehouse.py publish <run_dir>`."
+    )
 
 
-def _as_float(row: dict[str, str], key: str) -> float:
+def _as_float(row: dict[str, Any], key: str) -> float:
     try:
         return float(row[key])
     except (KeyError, TypeError, ValueError):
         return float("nan")
 
 
-def _as_int(row: dict[str, str], key: str) -> int:
+def _as_int(row: dict[str, Any], key: str) -> int:
     value = _as_float(row, key)
     return int(round(value)) if math.isfinite(value) else 0
 
@@ -66,22 +80,11 @@ def _fmt(value: float, digits: int = 3) -> str:
     return f"{value:.{digits}f}"
 
 
-def _build_demo_snapshot(results_root: Path, live_demo_root: Path) -> dict[str, Any]:
-    latest_demo = _latest(results_root, "demo/demo_priority_trade_study_*/demo_results_agg.csv")
-    if latest_demo is None:
-        return {
-            "best_static": None,
-            "best_patrol": None,
-            "top_configs": [],
-            "report_link": None,
-            "run_label": None,
-        }
-
-    rows = _read_rows(latest_demo)
+def _build_demo_snapshot(warehouse_root: Path, results_root: Path, live_demo_root: Path) -> dict[str, Any]:
+    rows, demo_dir = _latest_agg_rows(warehouse_root, results_root, "demo", "demo_priority_trade_study")
     rows.sort(key=lambda row: _as_float(row, "mission_fit_score"), reverse=True)
     static_rows = [row for row in rows if row.get("strategy") == "static"]
     patrol_rows = [row for row in rows if row.get("strategy") == "patrol"]
-    demo_dir = latest_demo.parent
 
     return {
         "best_static": static_rows[0] if static_rows else None,
@@ -92,26 +95,9 @@ def _build_demo_snapshot(results_root: Path, live_demo_root: Path) -> dict[str,
     }
 
 
-def _build_policy_snapshot(results_root: Path, live_demo_root: Path) -> dict[str, Any]:
-    latest_policy = _latest(
-        results_root,
-        "policy/policy_comparison_dynamic_heterogeneous_*/policy_results_agg.csv",
-    )
-    if latest_policy is None:
-        return {
-            "best": None,
-            "static_baseline": None,
-            "ranking": [],
-            "dashboard_link": None,
-            "report_link": None,
-            "task_completion_lift_vs_static": None,
-            "weighted_coverage_lift_vs_static": None,
-            "run_label": None,
-        }
-
-    rows = _read_rows(latest_policy)
+def _build_policy_snapshot(warehouse_root: Path, results_root: Path, live_demo_root: Path) -> dict[str, Any]:
+    rows, policy_dir = _latest_agg_rows(warehouse_root, results_root, "policy", "policy_comparison_dynamic_heterogeneous")
     rows.sort(key=lambda row: _as_float(row, "mission_fit_score"), reverse=True)
-    policy_dir = latest_policy.parent
 
     best = rows[0] if rows else None
     static_row = next((row for row in rows if row.get("strategy") == "static"), None)
@@ -442,17 +428,18 @@ http://127.0.0.1:8010/docs/live_demo/index.html</pre>
 """
 
 
-def build_live_demo_site(repo_root: Path, site_path: Path) -> None:
-    """Render the live-demo HTML at ``site_path`` from the repo's latest artifacts."""
+def build_live_demo_site(repo_root: Path, site_path: Path, warehouse_root: Path | None = None) -> None:
+    """Render the live-demo HTML at ``site_path`` from the latest demo and policy runs."""
     results_root = repo_root / "results"
+    warehouse_root = warehouse_root or repo_root / DEFAULT_WAREHOUSE
     docs_root = repo_root / "docs"
     figures_root = docs_root / "figures"
     live_demo_root = site_path.parent
 
     css_href = relative_to(live_demo_root, live_demo_root / "assets" / "styles.css") or "assets/styles.css"
 
-    demo = _build_demo_snapshot(results_root, live_demo_root)
-    policy = _build_policy_snapshot(results_root, live_demo_root)
+    demo = _build_demo_snapshot(warehouse_root, results_root, live_demo_root)
+    policy = _build_policy_snapshot(warehouse_root, results_root, live_demo_root)
 
     body = "\n".join(
         [
@@ -5,6 +5,7 @@ from typing import Any, Dict, Tuple
 
 import yaml
 
+from isr_trade_study.analytics.storage import StorageOptions
 from isr_trade_study.sim.placements import resolve_static_points
 from isr_trade_study.sim.scenario import (
     DynamicTask,
@@ -74,6 +75,17 @@ def _build_fleet_spec(cfg: dict) -> FleetSpec:
     )
 
 
+def build_storage_options(cfg: dict) -> StorageOptions:
+    """Parquet/DuckDB persistence settings from the optional `run.storage` block."""
+    storage = cfg.get("run", {}).get("storage") or {}
+    defaults = StorageOptions()
+    return StorageOptions(
+        mode=str(storage.get("mode", defaults.mode)),
+        compression=str(storage.get("compression", defaults.compression)).lower(),
+        row_group_size=int(storage.get("row_group_size", defaults.row_group_size)),
+    )
+
+
 def build_objects_from_cfg(cfg: dict) -> Tuple[Scenario, StrategySpec, int, str]:
     seed = int(cfg["run"]["seed"])
     out_root = str(cfg["run"]["output_dir"])
@@ -106,6 +118,9 @@ def build_objects_from_cfg(cfg: dict) -> Tuple[Scenario, StrategySpec, int, str]
         )
     elif st["type"] in {"patrol", "priority_patrol", "greedy_patrol"}:
         patrol_cfg = st["patrol"]
+        explore_mode = str(patrol_cfg.get("explore_mode", "uniform"))
+        if explore_mode not in {"uniform", "frontier"}:
+            raise ValueError(f"Unknown strategy.patrol.explore_mode: {explore_mode}")
         strategy = StrategySpec(
             type=str(st["type"]),
             patrol_step_size=int(patrol_cfg.get("step_size", 1)),
@@ -115,6 +130,7 @@ def build_objects_from_cfg(cfg: dict) -> Tuple[Scenario, StrategySpec, int, str]
             exploration_bias=float(patrol_cfg.get("exploration_bias", 0.35)),
             target_commitment_steps=int(patrol_cfg.get("target_commitment_steps", 4)),
             congestion_penalty=float(patrol_cfg.get("congestion_penalty", 0.35)),
+            explore_mode=explore_mode,
         )
     else:
         raise ValueError(f"Unknown strategy.type: {st['type']}")
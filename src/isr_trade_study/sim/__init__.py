@@ -1,3 +1,3 @@
 """Simulation primitives: scenarios, metrics, and the Monte Carlo runner."""
 
-__all__ = ["metrics", "monte_carlo", "placements", "scenario"]
+__all__ = ["cache", "cell_index", "fleet", "footprint", "metrics", "monte_carlo", "parallel", "placements", "rect_index", "scenario", "trajectory"]
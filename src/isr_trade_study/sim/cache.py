@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import pickle
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+from .monte_carlo import ENGINE_VERSION
+
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Keys per `IN (...)` lookup, below SQLite's historical 999 host-parameter limit.
+_KEYS_PER_QUERY = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_access INTEGER NOT NULL
+)
+"""
+
+
+def _canonical(value: Any) -> Any:
+    """JSON-ready form of specs, containers and callables, stable across runs."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {
+            "__type__": type(value).__name__,
+            **{field.name: _canonical(getattr(value, field.name)) for field in dataclasses.fields(value)},
+        }
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if callable(value):
+        return f"{value.__module__}.{value.__qualname__}"
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def result_key(func: Callable[..., Any], args: Sequence[Any], seed: int) -> str:
+    """Content hash of one replicate: batch function, its specs, seed and engine version."""
+    canonical = json.dumps(
+        {"engine": ENGINE_VERSION, "func": _canonical(func), "args": _canonical(list(args)), "seed": int(seed)},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclasses.dataclass(frozen=True)
+class ResultCache:
+    """On-disk SQLite store of per-replicate results with size-bounded LRU eviction.
+
+    Entries are keyed by `result_key` and hold one seed's share of a batch
+    result: a `RunMetrics` for `run_simulation_batch`, or a `{level:
+    RunMetrics}` dict for the nested batch runners. Once the stored payloads
+    exceed `max_bytes`, the least recently read or written entries are
+    dropped. The object only holds the path, so it pickles into pool workers;
+    each call opens its own connection and SQLite serialises the writers.
+    """
+
+    path: Path
+    max_bytes: int = DEFAULT_MAX_BYTES
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        con = sqlite3.connect(str(self.path), timeout=60.0)
+        con.execute(_SCHEMA)
+        return con
+
+    def get_many(self, keys: Sequence[str]) -> dict[str, Any]:
+        if not keys:
+            return {}
+        con = self._connect()
+        try:
+            with con:
+                found: list[tuple[str, bytes]] = []
+                for lo in range(0, len(keys), _KEYS_PER_QUERY):
+                    batch = list(keys[lo : lo + _KEYS_PER_QUERY])
+                    placeholders = ",".join("?" * len(batch))
+                    found += con.execute(
+                        f"SELECT key, payload FROM results WHERE key IN ({placeholders})", batch
+                    ).fetchall()
+                con.executemany(
+                    "UPDATE results SET last_access = ? WHERE key = ?",
+                    [(time.time_ns(), key) for key, _ in found],
+                )
+        finally:
+            con.close()
+        return {key: pickle.loads(zlib.decompress(payload)) for key, payload in found}
+
+    def put_many(self, items: dict[str, Any]) -> None:
+        if not items:
+            return
+        rows = []
+        for key, value in items.items():
+            payload = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            rows.append((key, payload, len(payload), time.time_ns()))
+        con = self._connect()
+        try:
+            with con:
+                con.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", rows)
+                self._evict(con)
+        finally:
+            con.close()
+
+    def _evict(self, con: sqlite3.Connection) -> None:
+        total = con.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed: list[tuple[str]] = []
+        for key, size in con.execute("SELECT key, size FROM results ORDER BY last_access, key"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        con.executemany("DELETE FROM results WHERE key = ?", doomed)
+
+    def stats(self) -> tuple[int, int]:
+        """`(entries, payload bytes)` currently stored."""
+        con = self._connect()
+        try:
+            count, size = con.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        finally:
+            con.close()
+        return int(count), int(size)
+
+    def run_batch(self, func: Callable[..., Any], args: Sequence[Any], seeds: Sequence[int]) -> Any:
+        """`func(*args, seeds)`, simulating only the seeds that are not cached.
+
+        Every batch runner is per-seed deterministic, so a result stitched
+        from cached and freshly simulated seeds equals the uncached one.
+        """
+        keys = [result_key(func, args, seed) for seed in seeds]
+        cached = self.get_many(keys)
+        missing = [seed for seed, key in zip(seeds, keys) if key not in cached]
+        fresh: dict[str, Any] = {}
+        if missing:
+            result = func(*args, missing)
+            for i, seed in enumerate(missing):
+                fresh[result_key(func, args, seed)] = _replicate(result, i)
+            self.put_many(fresh)
+        per_seed = [cached[key] if key in cached else fresh[key] for key in keys]
+        return _combine(per_seed)
+
+
+def _replicate(result: Any, index: int) -> Any:
+    if isinstance(result, dict):
+        return {level: metrics[index] for level, metrics in result.items()}
+    return result[index]
+
+
+def _combine(per_seed: list[Any]) -> Any:
+    if per_seed and isinstance(per_seed[0], dict):
+        return {level: [entry[level] for entry in per_seed] for level in per_seed[0]}
+    return per_seed
+
+
+def open_cache(path: Optional[str], max_mb: float = DEFAULT_MAX_BYTES / (1024 * 1024)) -> Optional[ResultCache]:
+    """`ResultCache` at `path`, or `None` when caching is disabled (`path` empty)."""
+    if not path:
+        return None
+    if max_mb <= 0:
+        raise ValueError("Cache size limit must be positive.")
+    return ResultCache(Path(path), int(max_mb * 1024 * 1024))
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+
+class CellSet:
+    """Set of flat cell ids with O(1) swap-remove and O(k) uniform sampling.
+
+    Members live in the first `len(self)` slots of `cells`; `position` maps a
+    cell id back to its slot, or -1 when the cell is not a member.
+    """
+
+    def __init__(self, capacity: int, initial: Optional[np.ndarray] = None) -> None:
+        self.cells = np.empty(capacity, dtype=np.int64)
+        self.position = np.full(capacity, -1, dtype=np.int64)
+        self.size = 0
+        if initial is not None:
+            self.add(initial)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def members(self) -> np.ndarray:
+        return self.cells[: self.size]
+
+    def add(self, cells: np.ndarray) -> None:
+        """Add distinct cell ids; ids that are already members are ignored."""
+        new = cells[self.position[cells] < 0]
+        end = self.size + new.size
+        self.cells[self.size : end] = new
+        self.position[new] = np.arange(self.size, end)
+        self.size = end
+
+    def discard(self, cells: np.ndarray) -> None:
+        """Remove distinct cell ids; ids that are not members are ignored."""
+        present = cells[self.position[cells] >= 0]
+        if present.size == 0:
+            return
+        slots = self.position[present]
+        self.position[present] = -1
+        new_size = self.size - present.size
+        holes = slots[slots < new_size]
+        tail = self.cells[new_size : self.size]
+        movers = tail[self.position[tail] >= 0]
+        self.cells[holes] = movers
+        self.position[movers] = holes
+        self.size = new_size
+
+    def sample(self, rng: np.random.Generator, count: int) -> np.ndarray:
+        """Up to `count` distinct members drawn uniformly without replacement."""
+        picks = rng.choice(self.size, size=min(count, self.size), replace=False)
+        return self.cells[picks]
+
+
+class UnseenCells:
+    """Incrementally maintained set of a lane's never-seen cells.
+
+    With `frontier=True` it also tracks the frontier: unseen cells with at
+    least one seen 4-neighbour. `sample` draws from the frontier when asked
+    and falls back to all unseen cells while the frontier is empty.
+    """
+
+    def __init__(self, width: int, height: int, frontier: bool = False) -> None:
+        self.width = width
+        self.height = height
+        self.unseen = CellSet(width * height, np.arange(width * height, dtype=np.int64))
+        self.frontier = CellSet(width * height) if frontier else None
+
+    def __len__(self) -> int:
+        return len(self.unseen)
+
+    def mark_seen(self, cells: np.ndarray, ever_seen: np.ndarray) -> None:
+        """Drop newly seen flat cell ids; `ever_seen` is the lane grid after the update."""
+        if cells.size == 0:
+            return
+        self.unseen.discard(cells)
+        if self.frontier is None:
+            return
+
+        self.frontier.discard(cells)
+        ys, xs = np.divmod(cells, self.width)
+        neighbours = np.concatenate(
+            [
+                cells[xs > 0] - 1,
+                cells[xs < self.width - 1] + 1,
+                cells[ys > 0] - self.width,
+                cells[ys < self.height - 1] + self.width,
+            ]
+        )
+        neighbours = np.unique(neighbours)
+        self.frontier.add(neighbours[~ever_seen.reshape(-1)[neighbours]])
+
+    def sample(self, rng: np.random.Generator, count: int, frontier_only: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """Sample up to `count` unseen cells; returns `(xs, ys)`."""
+        pool = self.frontier if frontier_only and self.frontier is not None and len(self.frontier) else self.unseen
+        ys, xs = np.divmod(pool.sample(rng, count), self.width)
+        return xs, ys
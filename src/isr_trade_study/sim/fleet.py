@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+# The eight non-zero unit headings (dx, dy) a patrolling drone can take.
+DIRECTIONS = np.array(
+    [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)],
+    dtype=np.int64,
+)
+
+NO_TARGET = -1
+
+
+@dataclass(frozen=True)
+class PatrolDraws:
+    """Pre-drawn per-drone patrol randomness, one column per step.
+
+    `turn[i, t]` is the uniform draw deciding whether drone `i` turns at
+    step `t` and `direction[i, t]` indexes `DIRECTIONS` for its new heading.
+    Row `i` comes from drone `i`'s own stream.
+    """
+
+    turn: np.ndarray
+    direction: np.ndarray
+
+
+@dataclass
+class FleetState:
+    """Struct-of-arrays fleet state; entry `i` of every array is drone `i`.
+
+    Drones are ordered platform by platform, matching the order of
+    `FleetSpec.platforms`. `platform_id` indexes into `platform_names` and
+    `target_id` holds the planner target a drone is committed to, or
+    `NO_TARGET`. When `patrol_draws` is set, patrol steps read the
+    pre-drawn per-drone randomness instead of the shared generator.
+    """
+
+    x: np.ndarray
+    y: np.ndarray
+    heading_x: np.ndarray
+    heading_y: np.ndarray
+    sensor_radius: np.ndarray
+    step_size: np.ndarray
+    endurance_steps: np.ndarray
+    cost_per_step: np.ndarray
+    platform_id: np.ndarray
+    platform_names: tuple[str, ...]
+    active: np.ndarray
+    target_id: np.ndarray
+    target_lock_remaining: np.ndarray
+    patrol_draws: Optional[PatrolDraws] = None
+
+    def __len__(self) -> int:
+        return int(self.x.shape[0])
+
+    def platform_name(self, idx: int) -> str:
+        return self.platform_names[int(self.platform_id[idx])]
+
+
+def random_directions(rng: np.random.Generator, count: int) -> tuple[np.ndarray, np.ndarray]:
+    """Draw `count` headings uniformly from the eight non-zero directions."""
+    picks = rng.integers(0, len(DIRECTIONS), size=count)
+    return DIRECTIONS[picks, 0], DIRECTIONS[picks, 1]
+
+
+def spawn_drone_streams(rng: np.random.Generator, count: int) -> list[np.random.Generator]:
+    """One independent generator per drone, seeded from a single draw of `rng`.
+
+    Stream `i` depends only on that draw and on `i`, so the first `k`
+    streams are the same whatever `count` is.
+    """
+    root = np.random.SeedSequence(int(rng.integers(0, 2**63)))
+    return [np.random.default_rng(child) for child in root.spawn(count)]
+
+
+def draw_patrol_schedule(streams: Sequence[np.random.Generator], steps: int) -> PatrolDraws:
+    """Draw every patrol turn decision and heading for `steps` steps up front."""
+    turn = np.array([stream.random(steps) for stream in streams], dtype=float).reshape(len(streams), steps)
+    direction = np.array(
+        [stream.integers(0, len(DIRECTIONS), size=steps) for stream in streams],
+        dtype=np.int64,
+    ).reshape(len(streams), steps)
+    return PatrolDraws(turn=turn, direction=direction)
+
+
+def step_patrol(
+    fleet: FleetState,
+    idx: np.ndarray,
+    turn_prob: float,
+    width: int,
+    height: int,
+    rng: np.random.Generator,
+    t: Optional[int] = None,
+) -> None:
+    """Random-walk patrol step for the drones in `idx`, applied in place.
+
+    Fleets with `patrol_draws` need the step index `t` and leave `rng`
+    untouched.
+    """
+    if idx.size == 0:
+        return
+    draws = fleet.patrol_draws
+    if draws is None:
+        turning = idx[rng.random(idx.size) < turn_prob]
+        if turning.size:
+            fleet.heading_x[turning], fleet.heading_y[turning] = random_directions(rng, turning.size)
+    else:
+        if t is None:
+            raise ValueError("Pre-drawn patrol randomness requires the step index.")
+        turning = idx[draws.turn[idx, t] < turn_prob]
+        picks = draws.direction[turning, t]
+        fleet.heading_x[turning], fleet.heading_y[turning] = DIRECTIONS[picks, 0], DIRECTIONS[picks, 1]
+    fleet.x[idx] = np.clip(fleet.x[idx] + fleet.heading_x[idx] * fleet.step_size[idx], 0, width - 1)
+    fleet.y[idx] = np.clip(fleet.y[idx] + fleet.heading_y[idx] * fleet.step_size[idx], 0, height - 1)
+
+
+def move_toward(
+    fleet: FleetState,
+    idx: np.ndarray,
+    target_x: np.ndarray,
+    target_y: np.ndarray,
+    width: int,
+    height: int,
+) -> None:
+    """Step each drone in `idx` one stride toward its target cell, in place.
+
+    Drones already sitting on their target keep their previous heading.
+    """
+    dx = np.sign(target_x - fleet.x[idx])
+    dy = np.sign(target_y - fleet.y[idx])
+    moving = (dx != 0) | (dy != 0)
+    idx, dx, dy = idx[moving], dx[moving], dy[moving]
+    fleet.heading_x[idx] = dx
+    fleet.heading_y[idx] = dy
+    fleet.x[idx] = np.clip(fleet.x[idx] + dx * fleet.step_size[idx], 0, width - 1)
+    fleet.y[idx] = np.clip(fleet.y[idx] + dy * fleet.step_size[idx], 0, height - 1)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .rect_index import RectIndex
+
+
+@dataclass(frozen=True)
+class FootprintUpdate:
+    """Per-lane counters produced by stamping one drone's footprint.
+
+    Arrays indexed by lane have one entry per replicate in the batch.
+    `revisit_gaps` is flat; `gap_lanes` says which lane each gap belongs to
+    and `priority_gap` flags gaps that fell on priority cells. `fresh_cells`
+    lists the flat grid cells seen for the first time, with their lanes in
+    `fresh_lanes`.
+    """
+
+    observations: np.ndarray
+    newly_covered: np.ndarray
+    newly_covered_weight: np.ndarray
+    revisit_gaps: np.ndarray
+    gap_lanes: np.ndarray
+    priority_gap: np.ndarray
+    fresh_cells: np.ndarray
+    fresh_lanes: np.ndarray
+
+
+@lru_cache(maxsize=None)
+def disk_stencil(radius: int) -> np.ndarray:
+    """Boolean `(2r+1, 2r+1)` stencil of cells within `radius` of the centre.
+
+    Rows index `dy` and columns index `dx`, both running from `-r` to `r`.
+    The returned array is cached per radius and marked read-only.
+    """
+    offsets = np.arange(-radius, radius + 1)
+    stencil = (offsets[:, None] ** 2 + offsets[None, :] ** 2) <= radius * radius
+    stencil.setflags(write=False)
+    return stencil
+
+
+@lru_cache(maxsize=None)
+def disk_offsets(radius: int) -> tuple[np.ndarray, np.ndarray]:
+    """`(dy, dx)` offset vectors of the cells set in `disk_stencil(radius)`."""
+    dy, dx = np.nonzero(disk_stencil(radius))
+    dy = dy - radius
+    dx = dx - radius
+    dy.setflags(write=False)
+    dx.setflags(write=False)
+    return dy, dx
+
+
+def stamp_footprints(
+    t: int,
+    lanes: np.ndarray,
+    cx: np.ndarray,
+    cy: np.ndarray,
+    radius: int,
+    ever_seen: np.ndarray,
+    last_seen: np.ndarray,
+    priority_mask: np.ndarray,
+    priority_weights: np.ndarray,
+    rects: Optional[RectIndex] = None,
+) -> FootprintUpdate:
+    """Stamp one drone's footprint at step `t` in every listed lane at once.
+
+    `ever_seen` and `last_seen` carry a leading lane axis
+    and are updated in place (they must be C-contiguous so the flat views
+    write through); `cx` / `cy` give the drone position in each of
+    `lanes`. The stencil is clipped against the grid per lane. Cells already
+    stamped earlier in the same step (by another drone) count as
+    observations but never as new coverage or as a revisit. When `rects`
+    is given, its per-rectangle counters are updated from the same stamp.
+    """
+    num_lanes, height, width = ever_seen.shape
+    dy, dx = disk_offsets(radius)
+
+    ys = cy[:, None] + dy[None, :]
+    xs = cx[:, None] + dx[None, :]
+    inside = (ys >= 0) & (ys < height) & (xs >= 0) & (xs < width)
+    per_lane = np.count_nonzero(inside, axis=1)
+    cell_lanes = np.repeat(lanes, per_lane)
+    cells = ys[inside] * width + xs[inside]
+    flat = cell_lanes * (height * width) + cells
+
+    seen_flat = ever_seen.reshape(-1)
+    last_flat = last_seen.reshape(-1)
+    prev = last_flat[flat]
+    fresh = ~seen_flat[flat]
+    revisit = (prev >= 0) & (prev < t)
+    gap_lanes = cell_lanes[revisit]
+    gaps = t - prev[revisit]
+    priority_gap = priority_mask.reshape(-1)[cells[revisit]]
+
+    fresh_lanes = cell_lanes[fresh]
+    fresh_cells = cells[fresh]
+    newly_covered = np.bincount(fresh_lanes, minlength=num_lanes)
+    newly_covered_weight = np.bincount(
+        fresh_lanes,
+        weights=priority_weights.reshape(-1)[fresh_cells],
+        minlength=num_lanes,
+    )
+
+    if rects is not None:
+        deltas = np.zeros((lanes.size, 3, dy.size), dtype=np.int64)
+        deltas[:, 0][inside] = fresh
+        deltas[:, 1][inside] = np.where(fresh, t, t - prev)
+        deltas[:, 2][inside] = prev != t
+        rects.add_footprint(lanes, cx, cy, radius, deltas)
+
+    seen_flat[flat] = True
+    last_flat[flat] = t
+
+    observations = np.zeros(num_lanes, dtype=np.int64)
+    observations[lanes] = per_lane
+
+    return FootprintUpdate(
+        observations=observations,
+        newly_covered=newly_covered,
+        newly_covered_weight=newly_covered_weight,
+        revisit_gaps=gaps,
+        gap_lanes=gap_lanes,
+        priority_gap=priority_gap,
+        fresh_cells=fresh_cells,
+        fresh_lanes=fresh_lanes,
+    )
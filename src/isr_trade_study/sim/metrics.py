@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import math
+from dataclasses import dataclass, fields
 from typing import Any, Dict
 
 import numpy as np
@@ -39,39 +40,60 @@ class RunMetrics:
     coverage_efficiency: float
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "avg_coverage": float(self.avg_coverage),
-            "final_coverage": float(self.final_coverage),
-            "avg_weighted_coverage": float(self.avg_weighted_coverage),
-            "final_weighted_coverage": float(self.final_weighted_coverage),
-            "priority_cell_coverage": float(self.priority_cell_coverage),
-            "revisit_gap_mean": float(self.revisit_gap_mean),
-            "revisit_gap_p90": float(self.revisit_gap_p90),
-            "pct_revisits_within_threshold": float(self.pct_revisits_within_threshold),
-            "priority_revisit_gap_mean": float(self.priority_revisit_gap_mean),
-            "priority_revisit_gap_p90": float(self.priority_revisit_gap_p90),
-            "pct_priority_revisits_within_threshold": float(self.pct_priority_revisits_within_threshold),
-            "avg_task_service_rate": float(self.avg_task_service_rate),
-            "task_completion_rate": float(self.task_completion_rate),
-            "mean_task_response_time": float(self.mean_task_response_time),
-            "p90_task_response_time": float(self.p90_task_response_time),
-            "pct_tasks_responded_within_threshold": float(self.pct_tasks_responded_within_threshold),
-            "total_cost": float(self.total_cost),
-            "utilization": float(self.utilization),
-            "redundancy_ratio": float(self.redundancy_ratio),
-            "coverage_efficiency": float(self.coverage_efficiency),
-        }
+        return {name: float(getattr(self, name)) for name in METRIC_COLUMNS}
+
+
+# Scalar `RunMetrics` fields, in declaration order: the per-run metric
+# columns of every results table. Annotations are strings under
+# `from __future__ import annotations` and types otherwise, so match both.
+METRIC_COLUMNS: tuple[str, ...] = tuple(
+    field.name for field in fields(RunMetrics) if field.type in ("float", float)
+)
+
+
+def histogram_percentile(counts: np.ndarray, q: float) -> float:
+    """`np.percentile` (linear method) of the values a count histogram describes.
+
+    `counts[v]` is how often value `v` occurs. The order statistics either
+    side of the virtual index are read off the cumulative counts and
+    interpolated exactly as numpy does, so the result matches
+    `np.percentile(np.repeat(np.arange(counts.size), counts), q)` bit for
+    bit without materialising the samples.
+    """
+    cumulative = np.cumsum(counts)
+    n = int(cumulative[-1]) if cumulative.size else 0
+    if n == 0:
+        raise ValueError("Cannot take a percentile of an empty histogram.")
+    virtual_index = (n - 1) * (q / 100)
+    lower = math.floor(virtual_index)
+    gamma = virtual_index - lower
+    upper = min(lower + 1, n - 1)
+    a = float(np.searchsorted(cumulative, lower, side="right"))
+    b = float(np.searchsorted(cumulative, upper, side="right"))
+    diff = b - a
+    return b - diff * (1 - gamma) if gamma >= 0.5 else a + diff * gamma
+
+
+def summarize_revisit_histogram(gap_counts: np.ndarray, threshold_steps: int) -> tuple[float, float, float]:
+    """Mean / 90th-percentile / fraction-within-threshold from a revisit-gap histogram.
+
+    `gap_counts[g]` is the number of revisits that came `g` steps after the
+    previous look; gaps never exceed the horizon, so the histogram stays
+    O(steps) however many cells and drones produced it.
+    """
+    total = int(np.sum(gap_counts))
+    if total == 0:
+        return float("inf"), float("inf"), 0.0
+
+    mean_gap = float(np.dot(np.arange(gap_counts.size, dtype=np.int64), gap_counts)) / total
+    p90_gap = histogram_percentile(gap_counts, 90)
+    pct_within = float(np.sum(gap_counts[: max(threshold_steps + 1, 0)])) / total
+    return mean_gap, p90_gap, pct_within
 
 
 def summarize_revisit_gaps(gaps: np.ndarray, threshold_steps: int) -> tuple[float, float, float]:
     """Mean / 90th-percentile / fraction-within-threshold for revisit gaps."""
-    if gaps.size == 0:
-        return float("inf"), float("inf"), 0.0
-
-    mean_gap = float(np.mean(gaps))
-    p90_gap = float(np.percentile(gaps, 90))
-    pct_within = float(np.mean(gaps <= threshold_steps))
-    return mean_gap, p90_gap, pct_within
+    return summarize_revisit_histogram(np.bincount(np.asarray(gaps, dtype=np.int64)), threshold_steps)
 
 
 def summarize_response_times(times: np.ndarray, threshold_steps: int) -> tuple[float, float, float]:
@@ -1,28 +1,35 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Optional, Sequence, Tuple
+import copy
+from dataclasses import dataclass, replace
+from typing import Optional, Sequence
 
 import numpy as np
 
-from .metrics import RunMetrics, summarize_response_times, summarize_revisit_gaps
+from ..utils.seed import make_rng
+from .cell_index import UnseenCells
+from .fleet import (
+    DIRECTIONS,
+    NO_TARGET,
+    FleetState,
+    draw_patrol_schedule,
+    move_toward,
+    random_directions,
+    spawn_drone_streams,
+    step_patrol,
+)
+from .footprint import disk_offsets, stamp_footprints
+from .metrics import RunMetrics, summarize_response_times, summarize_revisit_histogram
+from .rect_index import Bounds, RectIndex
 from .scenario import DynamicTask, Scenario, StrategySpec
+from .trajectory import Trajectory, TrajectoryRecorder
 
 
-@dataclass
-class DroneState:
-    x: int
-    y: int
-    sensor_radius: int
-    endurance_steps: int
-    cost_per_step: float
-    step_size: int
-    platform_name: str
-    heading_x: int = 1
-    heading_y: int = 0
-    active: bool = True
-    target_key: Optional[str] = None
-    target_lock_remaining: int = 0
+PERSISTENCE_THRESHOLD_STEPS = 10
+
+# Bump whenever a change alters the metrics any (scenario, strategy, seed)
+# produces; cached results are keyed on it.
+ENGINE_VERSION = 1
 
 
 @dataclass(frozen=True)
@@ -32,36 +39,38 @@ class CandidateTarget:
     centroid: tuple[int, int]
     utility: float
     capacity: int = 1
+    target_id: int = NO_TARGET
 
 
-def _clip(v: int, lo: int, hi: int) -> int:
-    return max(lo, min(hi, v))
+@dataclass(frozen=True)
+class _LaneVariant:
+    """How a lane deviates from the fleet whose trajectory it shares.
 
+    `sensor_radius` overrides every drone's radius and `num_drones` keeps
+    only that many leading drones; `None` leaves the fleet as built.
+    """
 
-def _sign(v: int) -> int:
-    if v > 0:
-        return 1
-    if v < 0:
-        return -1
-    return 0
+    sensor_radius: Optional[int] = None
+    num_drones: Optional[int] = None
 
 
-def _random_direction(rng: np.random.Generator) -> tuple[int, int]:
-    while True:
-        dx = int(rng.choice([-1, 0, 1]))
-        dy = int(rng.choice([-1, 0, 1]))
-        if dx != 0 or dy != 0:
-            return dx, dy
+def _clip(v: int, lo: int, hi: int) -> int:
+    return max(lo, min(hi, v))
 
 
-def _disk_offsets(r: int) -> List[Tuple[int, int]]:
-    offsets: List[Tuple[int, int]] = []
-    r2 = r * r
-    for dx in range(-r, r + 1):
-        for dy in range(-r, r + 1):
-            if dx * dx + dy * dy <= r2:
-                offsets.append((dx, dy))
-    return offsets
+def _rect_bounds(
+    width: int,
+    height: int,
+    x_min: int,
+    x_max: int,
+    y_min: int,
+    y_max: int,
+) -> Bounds:
+    y0 = _clip(min(y_min, y_max), 0, height - 1)
+    y1 = _clip(max(y_min, y_max), 0, height - 1) + 1
+    x0 = _clip(min(x_min, x_max), 0, width - 1)
+    x1 = _clip(max(x_min, x_max), 0, width - 1) + 1
+    return y0, y1, x0, x1
 
 
 def _make_rect_mask(
@@ -73,101 +82,140 @@ def _make_rect_mask(
     y_max: int,
 ) -> np.ndarray:
     mask = np.zeros((height, width), dtype=bool)
-    xs = slice(_clip(min(x_min, x_max), 0, width - 1), _clip(max(x_min, x_max), 0, width - 1) + 1)
-    ys = slice(_clip(min(y_min, y_max), 0, height - 1), _clip(max(y_min, y_max), 0, height - 1) + 1)
-    mask[ys, xs] = True
+    y0, y1, x0, x1 = _rect_bounds(width, height, x_min, x_max, y_min, y_max)
+    mask[y0:y1, x0:x1] = True
     return mask
 
 
-def _mask_centroid(mask: np.ndarray) -> tuple[int, int]:
-    ys, xs = np.where(mask)
-    if xs.size == 0:
-        return 0, 0
-    return int(round(np.mean(xs))), int(round(np.mean(ys)))
+def _rect_centroid(bounds: Bounds) -> tuple[int, int]:
+    y0, y1, x0, x1 = bounds
+    return int(round((x0 + x1 - 1) / 2)), int(round((y0 + y1 - 1) / 2))
 
 
-def _mean_mask_age(mask: np.ndarray, last_seen: np.ndarray, t: int) -> float:
-    seen_steps = last_seen[mask]
-    if seen_steps.size == 0:
-        return float(t + 1)
-    ages = np.where(seen_steps < 0, t + 1, t - seen_steps)
-    return float(np.mean(ages))
+def _priority_grids(scenario: Scenario) -> tuple[np.ndarray, np.ndarray]:
+    """Per-cell priority weight (max over overlapping zones, default 1) and zone mask."""
+    width, height = scenario.grid.width, scenario.grid.height
+    priority_weights = np.ones((height, width), dtype=float)
+    priority_mask = np.zeros((height, width), dtype=bool)
+    for zone in scenario.priority_zones:
+        mask = _make_rect_mask(width, height, zone.x_min, zone.x_max, zone.y_min, zone.y_max)
+        priority_weights[mask] = np.maximum(priority_weights[mask], float(zone.weight))
+        priority_mask[mask] = True
+    return priority_weights, priority_mask
 
 
-def _move_toward(
-    drone: DroneState,
-    target_x: int,
-    target_y: int,
-    width: int,
-    height: int,
-) -> None:
-    dx = _sign(target_x - drone.x)
-    dy = _sign(target_y - drone.y)
-    if dx == 0 and dy == 0:
-        return
-    drone.heading_x = dx
-    drone.heading_y = dy
-    drone.x = _clip(drone.x + dx * drone.step_size, 0, width - 1)
-    drone.y = _clip(drone.y + dy * drone.step_size, 0, height - 1)
-
-
-def _expand_fleet(scenario: Scenario, strategy: StrategySpec, rng: np.random.Generator) -> list[DroneState]:
+def _platform_arrays(
+    scenario: Scenario,
+    default_step: int,
+) -> tuple[tuple[str, ...], np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Per-drone `(platform_names, sensor_radius, endurance_steps, cost_per_step, step_size, platform_id)`."""
+    if scenario.fleet.platforms:
+        platforms = scenario.fleet.platforms
+        counts = [platform.count for platform in platforms]
+        platform_names = tuple(platform.name for platform in platforms)
+        sensor_radius = np.repeat([platform.sensor_radius for platform in platforms], counts)
+        endurance_steps = np.repeat([platform.endurance_steps for platform in platforms], counts)
+        cost_per_step = np.repeat([float(platform.cost_per_step) for platform in platforms], counts)
+        step_size = np.repeat(
+            [max(default_step, int(platform.cruise_step_size)) for platform in platforms],
+            counts,
+        )
+        platform_id = np.repeat(np.arange(len(platforms)), counts)
+    else:
+        count = scenario.fleet.num_drones
+        platform_names = ("homogeneous",)
+        sensor_radius = np.full(count, scenario.fleet.sensor_radius)
+        endurance_steps = np.full(count, scenario.fleet.endurance_steps)
+        cost_per_step = np.full(count, float(scenario.fleet.cost_per_step))
+        step_size = np.full(count, default_step)
+        platform_id = np.zeros(count, dtype=np.int64)
+    return platform_names, sensor_radius, endurance_steps, cost_per_step, step_size, platform_id
+
+
+def _expand_fleet(
+    scenario: Scenario,
+    strategy: StrategySpec,
+    rng: np.random.Generator,
+    per_drone_streams: bool = False,
+) -> FleetState:
+    """Build the fleet's initial state.
+
+    With `per_drone_streams`, every drone draws its heading, start cell and
+    patrol schedule from its own stream, so drone `i` behaves the same in
+    any fleet of more than `i` drones.
+    """
     width, height = scenario.grid.width, scenario.grid.height
-    drones: list[DroneState] = []
-    default_step = max(1, int(strategy.patrol_step_size))
+    platform_names, sensor_radius, endurance_steps, cost_per_step, step_size, platform_id = _platform_arrays(
+        scenario,
+        max(1, int(strategy.patrol_step_size)),
+    )
 
-    if scenario.fleet.platforms:
-        for platform in scenario.fleet.platforms:
-            for _ in range(platform.count):
-                heading_x, heading_y = _random_direction(rng)
-                drones.append(
-                    DroneState(
-                        x=0,
-                        y=0,
-                        sensor_radius=platform.sensor_radius,
-                        endurance_steps=platform.endurance_steps,
-                        cost_per_step=platform.cost_per_step,
-                        step_size=max(default_step, int(platform.cruise_step_size)),
-                        platform_name=platform.name,
-                        heading_x=heading_x,
-                        heading_y=heading_y,
-                    )
-                )
+    num_drones = int(platform_id.shape[0])
+    streams = spawn_drone_streams(rng, num_drones) if per_drone_streams else []
+    if per_drone_streams:
+        picks = np.array([stream.integers(0, len(DIRECTIONS)) for stream in streams], dtype=np.int64)
+        heading_x, heading_y = DIRECTIONS[picks, 0], DIRECTIONS[picks, 1]
     else:
-        for _ in range(scenario.fleet.num_drones):
-            heading_x, heading_y = _random_direction(rng)
-            drones.append(
-                DroneState(
-                    x=0,
-                    y=0,
-                    sensor_radius=scenario.fleet.sensor_radius,
-                    endurance_steps=scenario.fleet.endurance_steps,
-                    cost_per_step=scenario.fleet.cost_per_step,
-                    step_size=default_step,
-                    platform_name="homogeneous",
-                    heading_x=heading_x,
-                    heading_y=heading_y,
-                )
-            )
+        heading_x, heading_y = random_directions(rng, num_drones)
 
     if strategy.type == "static":
-        if not strategy.static_points or len(strategy.static_points) < len(drones):
+        if not strategy.static_points or len(strategy.static_points) < num_drones:
             raise ValueError("Static strategy requires >= total drone count points.")
-        for drone, (x, y) in zip(drones, strategy.static_points):
-            drone.x = _clip(x, 0, width - 1)
-            drone.y = _clip(y, 0, height - 1)
+        points = np.array(strategy.static_points[:num_drones], dtype=np.int64).reshape(num_drones, 2)
+        x = np.clip(points[:, 0], 0, width - 1)
+        y = np.clip(points[:, 1], 0, height - 1)
+    elif per_drone_streams:
+        x = np.array([stream.integers(0, width) for stream in streams], dtype=np.int64)
+        y = np.array([stream.integers(0, height) for stream in streams], dtype=np.int64)
     else:
-        for drone in drones:
-            drone.x = int(rng.integers(0, width))
-            drone.y = int(rng.integers(0, height))
+        x = rng.integers(0, width, size=num_drones)
+        y = rng.integers(0, height, size=num_drones)
+
+    return FleetState(
+        x=x.astype(np.int64),
+        y=y.astype(np.int64),
+        heading_x=heading_x,
+        heading_y=heading_y,
+        sensor_radius=sensor_radius.astype(np.int64),
+        step_size=step_size.astype(np.int64),
+        endurance_steps=endurance_steps.astype(np.int64),
+        cost_per_step=cost_per_step.astype(float),
+        platform_id=platform_id.astype(np.int64),
+        platform_names=platform_names,
+        active=np.ones(num_drones, dtype=bool),
+        target_id=np.full(num_drones, NO_TARGET, dtype=np.int64),
+        target_lock_remaining=np.zeros(num_drones, dtype=np.int64),
+        patrol_draws=draw_patrol_schedule(streams, scenario.time.steps) if per_drone_streams else None,
+    )
 
-    return drones
+
+def _replay_fleet(trajectory: Trajectory, scenario: Scenario) -> FleetState:
+    """Fleet whose radii and costs come from `scenario`, frozen at the recording's start."""
+    platform_names, sensor_radius, _, cost_per_step, step_size, platform_id = _platform_arrays(scenario, 1)
+    if sensor_radius.shape[0] != trajectory.num_drones:
+        raise ValueError("Scenario fleet size does not match the recorded trajectory.")
+    num_drones = trajectory.num_drones
+    return FleetState(
+        x=trajectory.x[0].astype(np.int64) if trajectory.steps else np.zeros(num_drones, dtype=np.int64),
+        y=trajectory.y[0].astype(np.int64) if trajectory.steps else np.zeros(num_drones, dtype=np.int64),
+        heading_x=np.zeros(num_drones, dtype=np.int64),
+        heading_y=np.zeros(num_drones, dtype=np.int64),
+        sensor_radius=sensor_radius.astype(np.int64),
+        step_size=step_size.astype(np.int64),
+        endurance_steps=trajectory.endurance_steps.astype(np.int64),
+        cost_per_step=cost_per_step.astype(float),
+        platform_id=platform_id.astype(np.int64),
+        platform_names=platform_names,
+        active=np.ones(num_drones, dtype=bool),
+        target_id=np.full(num_drones, NO_TARGET, dtype=np.int64),
+        target_lock_remaining=np.zeros(num_drones, dtype=np.int64),
+    )
 
 
-def _build_priority_targets(scenario: Scenario) -> list[tuple[np.ndarray, tuple[int, int], float]]:
-    targets: list[tuple[np.ndarray, tuple[int, int], float]] = []
+def _build_priority_targets(scenario: Scenario) -> list[tuple[Bounds, tuple[int, int], float]]:
+    targets: list[tuple[Bounds, tuple[int, int], float]] = []
     for zone in scenario.priority_zones:
-        mask = _make_rect_mask(
+        bounds = _rect_bounds(
             scenario.grid.width,
             scenario.grid.height,
             zone.x_min,
@@ -175,14 +223,14 @@ def _build_priority_targets(scenario: Scenario) -> list[tuple[np.ndarray, tuple[
             zone.y_min,
             zone.y_max,
         )
-        targets.append((mask, _mask_centroid(mask), float(zone.weight)))
+        targets.append((bounds, _rect_centroid(bounds), float(zone.weight)))
     return targets
 
 
 def _build_task_records(scenario: Scenario) -> list[dict]:
     records: list[dict] = []
     for task in scenario.dynamic_tasks:
-        mask = _make_rect_mask(
+        bounds = _rect_bounds(
             scenario.grid.width,
             scenario.grid.height,
             task.x_min,
@@ -193,71 +241,95 @@ def _build_task_records(scenario: Scenario) -> list[dict]:
         records.append(
             {
                 "task": task,
-                "mask": mask,
-                "centroid": _mask_centroid(mask),
+                "bounds": bounds,
+                "centroid": _rect_centroid(bounds),
                 "response_time": None,
             }
         )
     return records
 
 
-def _step_patrol(drone: DroneState, turn_prob: float, width: int, height: int, rng: np.random.Generator) -> None:
-    if rng.random() < turn_prob:
-        drone.heading_x, drone.heading_y = _random_direction(rng)
-    drone.x = _clip(drone.x + drone.heading_x * drone.step_size, 0, width - 1)
-    drone.y = _clip(drone.y + drone.heading_y * drone.step_size, 0, height - 1)
+def _score_matrix(
+    fleet: FleetState,
+    drones: np.ndarray,
+    candidates: Sequence[CandidateTarget],
+    strategy: StrategySpec,
+    mode: str,
+    active_task_exists: bool,
+) -> np.ndarray:
+    """`(len(drones), len(candidates))` matrix of drone-to-candidate scores.
+
+    Factors are applied in the same order as the scalar formula
+    `kind_bias * utility * platform_fit / (1 + dist)` followed by the
+    priority-patrol adjustments, so every entry is bit-identical to scoring
+    the pair on its own.
+    """
+    kinds = np.array([candidate.kind for candidate in candidates])
+    is_task = kinds == "task"
+    is_zone = kinds == "priority_zone"
+    is_explore = ~(is_task | is_zone)
+    utility = np.array([candidate.utility for candidate in candidates], dtype=float)
+    cx = np.array([candidate.centroid[0] for candidate in candidates], dtype=np.int64)
+    cy = np.array([candidate.centroid[1] for candidate in candidates], dtype=np.int64)
+    target_id = np.array([candidate.target_id for candidate in candidates], dtype=np.int64)
+
+    names = np.array(fleet.platform_names)[fleet.platform_id[drones]]
+    is_scout = (names == "scout")[:, None]
+    is_sentinel = (names == "sentinel")[:, None]
+
+    kind_bias = np.where(
+        is_task,
+        strategy.task_priority_bias,
+        np.where(is_zone, strategy.priority_zone_bias, strategy.exploration_bias),
+    )
+    dist = np.abs(cx[None, :] - fleet.x[drones, None]) + np.abs(cy[None, :] - fleet.y[drones, None])
+    base_fit = 1.0 + 0.08 * fleet.sensor_radius[drones] + 0.04 * fleet.step_size[drones]
+    platform_fit = np.broadcast_to(base_fit[:, None], dist.shape)
 
+    if mode == "priority_patrol":
+        fit_factor = np.ones(dist.shape, dtype=float)
+        fit_factor = np.where(is_task & is_scout, 1.42, fit_factor)
+        fit_factor = np.where(is_task & is_sentinel, 0.72, fit_factor)
+        fit_factor = np.where(is_zone & is_sentinel, 1.48, fit_factor)
+        fit_factor = np.where(is_zone & is_scout, 0.74, fit_factor)
+        fit_factor = np.where(is_explore & is_scout, 1.08, fit_factor)
+        platform_fit = platform_fit * fit_factor
 
-def _candidate_score(
-    drone: DroneState,
-    candidate: CandidateTarget,
-    strategy: StrategySpec,
-) -> float:
-    cx, cy = candidate.centroid
-    dist = abs(cx - drone.x) + abs(cy - drone.y)
-    platform_fit = 1.0 + 0.08 * drone.sensor_radius + 0.04 * drone.step_size
-
-    if candidate.kind == "task":
-        kind_bias = strategy.task_priority_bias
-    elif candidate.kind == "priority_zone":
-        kind_bias = strategy.priority_zone_bias
-    else:
-        kind_bias = strategy.exploration_bias
+    scores = (kind_bias * utility)[None, :] * platform_fit / (1.0 + dist)
 
-    if strategy.type == "priority_patrol":
-        if candidate.kind == "task":
-            if drone.platform_name == "scout":
-                platform_fit *= 1.42
-            elif drone.platform_name == "sentinel":
-                platform_fit *= 0.72
-        elif candidate.kind == "priority_zone":
-            if drone.platform_name == "sentinel":
-                platform_fit *= 1.48
-            elif drone.platform_name == "scout":
-                platform_fit *= 0.74
-        elif candidate.kind == "explore" and drone.platform_name == "scout":
-            platform_fit *= 1.08
+    if mode == "priority_patrol":
+        if active_task_exists:
+            scores = scores * np.where(is_sentinel & is_task, 0.72, np.where(is_scout & is_zone, 0.78, 1.0))
+        scores = scores * np.where(target_id[None, :] == fleet.target_id[drones, None], 1.2, 1.0)
 
-    return kind_bias * candidate.utility * platform_fit / (1.0 + dist)
+    return scores
 
 
 def _build_candidate_targets(
     task_records: Sequence[dict],
-    priority_targets: Sequence[tuple[np.ndarray, tuple[int, int], float]],
-    ever_seen: np.ndarray,
-    last_seen: np.ndarray,
+    priority_targets: Sequence[tuple[Bounds, tuple[int, int], float]],
+    seen_ratio: np.ndarray,
+    mean_age: np.ndarray,
+    unseen: UnseenCells,
     t: int,
     strategy: StrategySpec,
     rng: np.random.Generator,
 ) -> list[CandidateTarget]:
+    """Candidate targets for step `t`.
+
+    `seen_ratio` and `mean_age` hold per-rectangle statistics in `RectIndex`
+    order: tasks first, then priority zones. Exploration candidates are
+    sampled from `unseen`, restricted to its frontier when
+    `strategy.explore_mode` is "frontier".
+    """
     candidates: list[CandidateTarget] = []
 
-    for record in task_records:
+    for task_idx, record in enumerate(task_records):
         task: DynamicTask = record["task"]
         if not (task.start_step <= t < task.end_step):
             continue
-        task_seen_ratio = float(np.mean(ever_seen[record["mask"]]))
-        age_factor = min(1.0, _mean_mask_age(record["mask"], last_seen, t) / max(1, t + 1))
+        task_seen_ratio = float(seen_ratio[task_idx])
+        age_factor = min(1.0, float(mean_age[task_idx]) / max(1, t + 1))
         urgency_boost = 1.55 if record["response_time"] is None else 1.0
         cx, cy = record["centroid"]
         utility = (
@@ -274,35 +346,35 @@ def _build_candidate_targets(
                 centroid=(cx, cy),
                 utility=utility,
                 capacity=capacity,
+                target_id=task_idx,
             )
         )
 
-    for idx, (mask, centroid, weight) in enumerate(priority_targets):
-        seen_ratio = float(np.mean(ever_seen[mask]))
-        age_factor = min(1.0, _mean_mask_age(mask, last_seen, t) / max(1, t + 1))
+    for idx, (_, centroid, weight) in enumerate(priority_targets):
+        zone_seen_ratio = float(seen_ratio[len(task_records) + idx])
+        age_factor = min(1.0, float(mean_age[len(task_records) + idx]) / max(1, t + 1))
         candidates.append(
             CandidateTarget(
                 key=f"zone:{idx}",
                 kind="priority_zone",
                 centroid=centroid,
-                utility=weight * max(0.18, (0.35 * (1.0 - seen_ratio)) + (0.65 * age_factor)),
+                utility=weight * max(0.18, (0.35 * (1.0 - zone_seen_ratio)) + (0.65 * age_factor)),
                 capacity=2 if weight >= 3.0 else 1,
+                target_id=len(task_records) + idx,
             )
         )
 
-    unseen = np.argwhere(~ever_seen)
-    if unseen.size > 0:
-        sample_size = min(len(unseen), 48)
-        sample_indices = rng.choice(len(unseen), size=sample_size, replace=False)
-        for seq, idx in enumerate(sample_indices):
-            y, x = unseen[int(idx)]
+    if len(unseen) > 0:
+        xs, ys = unseen.sample(rng, 48, frontier_only=strategy.explore_mode == "frontier")
+        for seq, (x, y) in enumerate(zip(xs.tolist(), ys.tolist())):
             candidates.append(
                 CandidateTarget(
                     key=f"explore:{seq}",
                     kind="explore",
-                    centroid=(int(x), int(y)),
+                    centroid=(x, y),
                     utility=1.0,
                     capacity=1,
+                    target_id=len(task_records) + len(priority_targets) + seq,
                 )
             )
 
@@ -310,64 +382,65 @@ def _build_candidate_targets(
 
 
 def _assign_targets(
-    drones: Sequence[DroneState],
+    fleet: FleetState,
+    drones: np.ndarray,
     candidates: Sequence[CandidateTarget],
     strategy: StrategySpec,
     mode: str,
 ) -> dict[int, CandidateTarget]:
+    """Greedy capacity-constrained assignment, keyed by position in `drones`."""
     assignments: dict[int, CandidateTarget] = {}
-    candidate_map = {candidate.key: candidate for candidate in candidates}
-    used_capacity = {candidate.key: 0 for candidate in candidates}
+    candidate_map = {candidate.target_id: candidate for candidate in candidates}
+    used_capacity = {candidate.target_id: 0 for candidate in candidates}
     active_task_exists = any(candidate.kind == "task" for candidate in candidates)
+    platform_names = [fleet.platform_name(drone) for drone in drones]
 
     if mode == "priority_patrol":
         for idx, drone in enumerate(drones):
-            if drone.target_key is None or drone.target_lock_remaining <= 0:
+            if fleet.target_id[drone] == NO_TARGET or fleet.target_lock_remaining[drone] <= 0:
                 continue
-            candidate = candidate_map.get(drone.target_key)
+            candidate = candidate_map.get(int(fleet.target_id[drone]))
             if candidate is None:
                 continue
             if candidate.kind == "explore":
                 continue
             if active_task_exists and candidate.kind != "task":
-                if not (candidate.kind == "priority_zone" and drone.platform_name == "sentinel"):
+                if not (candidate.kind == "priority_zone" and platform_names[idx] == "sentinel"):
                     continue
-            if candidate.kind == "priority_zone" and drone.platform_name not in {"sentinel", "homogeneous"}:
+            if candidate.kind == "priority_zone" and platform_names[idx] not in {"sentinel", "homogeneous"}:
                 continue
-            if used_capacity[candidate.key] >= candidate.capacity:
+            if used_capacity[candidate.target_id] >= candidate.capacity:
                 continue
             assignments[idx] = candidate
-            used_capacity[candidate.key] += 1
-
-    pending = [idx for idx in range(len(drones)) if idx not in assignments]
-    proposals: list[tuple[float, int, str]] = []
-    for idx in pending:
-        drone = drones[idx]
-        for candidate in candidates:
-            score = _candidate_score(drone, candidate, strategy)
-            if mode == "priority_patrol":
-                if active_task_exists and drone.platform_name == "sentinel" and candidate.kind == "task":
-                    score *= 0.72
-                if active_task_exists and drone.platform_name == "scout" and candidate.kind == "priority_zone":
-                    score *= 0.78
-            if mode == "priority_patrol" and candidate.key == drone.target_key:
-                score *= 1.2
-            proposals.append((score, idx, candidate.key))
-
-    proposals.sort(reverse=True, key=lambda item: item[0])
-
-    for score, idx, candidate_key in proposals:
+            used_capacity[candidate.target_id] += 1
+
+    pending = np.array([idx for idx in range(len(drones)) if idx not in assignments], dtype=np.int64)
+    if pending.size == 0 or not candidates:
+        return assignments
+
+    scores = _score_matrix(fleet, drones[pending], candidates, strategy, mode, active_task_exists)
+    flat_scores = scores.ravel()
+    order = np.argsort(-flat_scores, kind="stable")
+    proposal_drones = pending[order // len(candidates)].tolist()
+    proposal_candidates = (order % len(candidates)).tolist()
+    proposal_scores = flat_scores[order].tolist()
+
+    remaining = pending.size
+    for score, idx, candidate_idx in zip(proposal_scores, proposal_drones, proposal_candidates):
         if idx in assignments:
             continue
-        candidate = candidate_map[candidate_key]
-        occupancy = used_capacity[candidate_key]
+        candidate = candidates[candidate_idx]
+        occupancy = used_capacity[candidate.target_id]
         if occupancy >= candidate.capacity:
             continue
         adjusted_score = score * ((1.0 - strategy.congestion_penalty) ** occupancy)
         if adjusted_score <= 0:
             continue
         assignments[idx] = candidate
-        used_capacity[candidate_key] += 1
+        used_capacity[candidate.target_id] += 1
+        remaining -= 1
+        if remaining == 0:
+            break
 
     return assignments
 
@@ -378,146 +451,682 @@ def run_simulation(
     rng: np.random.Generator,
 ) -> RunMetrics:
     """Single Monte Carlo execution of a scenario under a strategy."""
-    width, height = scenario.grid.width, scenario.grid.height
+    if strategy.type == "static":
+        return _simulate_static(scenario, strategy, rng)
+    return _simulate_lanes(scenario, strategy, [rng])[0]
+
+
+def is_seed_independent(scenario: Scenario, strategy: StrategySpec) -> bool:
+    """Whether every seed yields the same metrics for this scenario and strategy.
+
+    Static drones loiter on fixed points and only draw headings they never
+    use, and an empty fleet has nothing to randomise.
+    """
+    return strategy.type == "static" or scenario.fleet.total_drones == 0
+
+
+def run_simulation_batch(
+    scenario: Scenario,
+    strategy: StrategySpec,
+    seeds: Sequence[int],
+) -> list[RunMetrics]:
+    """Run one replicate per seed, advancing all replicates in lock-step.
+
+    Coverage grids carry a leading replicate axis and each drone's footprint
+    is stamped across every replicate in a single vectorized pass. Each
+    replicate draws from its own `make_rng(seed)` stream, so the result for
+    a seed matches `run_simulation(scenario, strategy, make_rng(seed))`.
+
+    When `is_seed_independent` holds, the first seed is evaluated once and
+    every replicate receives a copy of that result.
+    """
+    if is_seed_independent(scenario, strategy):
+        if not seeds:
+            return []
+        result = run_simulation(scenario, strategy, make_rng(int(seeds[0])))
+        return [result] + [copy.deepcopy(result) for _ in seeds[1:]]
+    return _simulate_lanes(scenario, strategy, [make_rng(int(seed)) for seed in seeds])
+
+
+def supports_radius_nesting(scenario: Scenario, strategy: StrategySpec) -> bool:
+    """Whether drone trajectories are independent of the sensor radius."""
+    return strategy.type in {"static", "patrol"} and not scenario.fleet.is_heterogeneous
+
+
+def run_radius_nested_batch(
+    scenario: Scenario,
+    strategy: StrategySpec,
+    sensor_radii: Sequence[int],
+    seeds: Sequence[int],
+) -> dict[int, list[RunMetrics]]:
+    """Score every sensor radius from one trajectory per seed.
+
+    Static and patrol movement never looks at coverage, so each seed's
+    trajectory is simulated once and stamped at every radius. The entry
+    for radius `r` and a seed matches `run_simulation` on the scenario with
+    `sensor_radius=r` under `make_rng(seed)`. Results are keyed by radius,
+    one entry per seed.
+    """
+    if not supports_radius_nesting(scenario, strategy):
+        raise ValueError("Radius-nested evaluation requires a homogeneous fleet under the static or patrol strategy.")
+    radii = list(dict.fromkeys(int(radius) for radius in sensor_radii))
+
+    if strategy.type == "static":
+        return {
+            radius: run_simulation_batch(
+                replace(scenario, fleet=replace(scenario.fleet, sensor_radius=radius)),
+                strategy,
+                seeds,
+            )
+            for radius in radii
+        }
+
+    variants = [_LaneVariant(sensor_radius=radius) for radius in radii]
+    results = _simulate_lanes(scenario, strategy, [make_rng(int(seed)) for seed in seeds], variants)
+    return {radius: results[pos :: len(radii)] for pos, radius in enumerate(radii)}
+
+
+def supports_fleet_nesting(scenario: Scenario, strategy: StrategySpec) -> bool:
+    """Whether smaller fleets can be scored as prefixes of a larger one."""
+    return strategy.type == "patrol" and not scenario.fleet.is_heterogeneous
+
+
+def run_fleet_nested_batch(
+    scenario: Scenario,
+    strategy: StrategySpec,
+    fleet_sizes: Sequence[int],
+    seeds: Sequence[int],
+) -> dict[int, list[RunMetrics]]:
+    """Score every fleet size as a prefix of the largest fleet, per seed.
+
+    Drones draw from per-drone streams (common random numbers), so patrol
+    drone `i` flies the same path in every fleet that contains it. The
+    largest fleet is simulated once per seed and each smaller size is
+    scored from its leading drones. Results are keyed by fleet size, one
+    entry per seed, and match runs that use per-drone streams on the
+    smaller fleet; they differ per seed from `run_simulation`, which shares
+    one stream across the fleet.
+    """
+    if not supports_fleet_nesting(scenario, strategy):
+        raise ValueError("Fleet-nested evaluation requires a homogeneous fleet under the patrol strategy.")
+    sizes = list(dict.fromkeys(int(size) for size in fleet_sizes))
+    if not sizes or min(sizes) < 0:
+        raise ValueError("Fleet sizes must be non-negative.")
+
+    largest = replace(scenario, fleet=replace(scenario.fleet, num_drones=max(sizes)))
+    variants = [_LaneVariant(num_drones=size) for size in sizes]
+    results = _simulate_lanes(
+        largest,
+        strategy,
+        [make_rng(int(seed)) for seed in seeds],
+        variants,
+        per_drone_streams=True,
+    )
+    return {size: results[pos :: len(sizes)] for pos, size in enumerate(sizes)}
+
+
+def run_simulation_horizons(
+    scenario: Scenario,
+    strategy: StrategySpec,
+    rng: np.random.Generator,
+    horizons: Sequence[int],
+) -> dict[int, RunMetrics]:
+    """Metrics for several mission lengths from a single run.
+
+    A run of `h` steps is an exact prefix of a longer run under the same
+    seed, so the scenario is simulated once up to the longest horizon and
+    the running accumulators are snapshotted at every checkpoint. The entry
+    for `h` matches `run_simulation` on the scenario with `steps=h`.
+    Horizons must lie in `1..scenario.time.steps`.
+    """
+    checkpoints = sorted({int(horizon) for horizon in horizons})
+    if not checkpoints or checkpoints[0] < 1 or checkpoints[-1] > scenario.time.steps:
+        raise ValueError("Horizons must be within 1..scenario.time.steps.")
+
+    if strategy.type == "static":
+        return {
+            horizon: _simulate_static(replace(scenario, time=replace(scenario.time, steps=horizon)), strategy, rng)
+            for horizon in checkpoints
+        }
+    results = _simulate_lane_horizons(scenario, strategy, [rng], checkpoints)
+    return {horizon: lanes[0] for horizon, lanes in results.items()}
+
+
+def run_simulation_recorded(
+    scenario: Scenario,
+    strategy: StrategySpec,
+    rng: np.random.Generator,
+) -> tuple[RunMetrics, Trajectory]:
+    """`run_simulation` that also returns the recorded drone trajectory.
+
+    Always steps the full engine (static runs included) so that every
+    step's positions are captured; metrics match `run_simulation`.
+    """
+    trajectories: list[Trajectory] = []
+    metrics = _simulate_lanes(scenario, strategy, [rng], trajectories=trajectories)[0]
+    return metrics, trajectories[0]
+
+
+def rescore(
+    trajectory: Trajectory,
+    scenario: Scenario,
+    persistence_threshold_steps: int = PERSISTENCE_THRESHOLD_STEPS,
+) -> RunMetrics:
+    """Recompute every metric for a recorded trajectory under a scenario variant.
+
+    Movement, activity and endurance come from the recording; the
+    variant supplies the grid, priority zones, dynamic tasks, sensor radii
+    and per-step costs, and may shorten the horizon. The variant fleet must
+    have as many drones as the recording. Re-scoring under the recording's
+    own scenario reproduces the original metrics.
+    """
+    if scenario.time.steps > trajectory.steps:
+        raise ValueError("Scenario horizon exceeds the recorded trajectory.")
+    if trajectory.steps and (
+        int(trajectory.x.max(initial=0)) >= scenario.grid.width
+        or int(trajectory.y.max(initial=0)) >= scenario.grid.height
+    ):
+        raise ValueError("Recorded positions fall outside the scenario grid.")
     steps = scenario.time.steps
+    return _simulate_lane_horizons(
+        scenario,
+        StrategySpec(type=trajectory.strategy_type),
+        [],
+        [steps],
+        replay=trajectory,
+        persistence_threshold_steps=persistence_threshold_steps,
+    )[steps][0]
 
-    ever_seen = np.zeros((height, width), dtype=bool)
-    last_seen = np.full((height, width), -1, dtype=int)
-    coverage_over_time = np.zeros(steps, dtype=float)
-    weighted_coverage_over_time = np.zeros(steps, dtype=float)
-    task_service_over_time = np.zeros(steps, dtype=float)
 
-    priority_weights = np.ones((height, width), dtype=float)
-    priority_mask = np.zeros((height, width), dtype=bool)
-    for zone in scenario.priority_zones:
-        mask = _make_rect_mask(width, height, zone.x_min, zone.x_max, zone.y_min, zone.y_max)
-        priority_weights[mask] = np.maximum(priority_weights[mask], float(zone.weight))
-        priority_mask[mask] = True
+def _simulate_lanes(
+    scenario: Scenario,
+    strategy: StrategySpec,
+    rngs: Sequence[np.random.Generator],
+    lane_variants: Optional[Sequence[_LaneVariant]] = None,
+    per_drone_streams: bool = False,
+    trajectories: Optional[list[Trajectory]] = None,
+) -> list[RunMetrics]:
+    """Lock-step engine: one fleet per generator, one coverage lane per result.
+
+    By default every fleet owns one lane. With `lane_variants`, each fleet's
+    trajectory is shared by one lane per variant, which may stamp with a
+    different sensor radius or keep only a prefix of the drones; results
+    are ordered fleet by fleet, variant by variant. Only policies whose
+    movement ignores coverage may share a trajectory. When `trajectories`
+    is given, one recorded `Trajectory` per fleet is appended to it.
+    """
+    steps = scenario.time.steps
+    return _simulate_lane_horizons(
+        scenario,
+        strategy,
+        rngs,
+        [steps],
+        lane_variants,
+        per_drone_streams,
+        trajectories=trajectories,
+    )[steps]
+
+
+def _simulate_lane_horizons(
+    scenario: Scenario,
+    strategy: StrategySpec,
+    rngs: Sequence[np.random.Generator],
+    horizons: Sequence[int],
+    lane_variants: Optional[Sequence[_LaneVariant]] = None,
+    per_drone_streams: bool = False,
+    trajectories: Optional[list[Trajectory]] = None,
+    replay: Optional[Trajectory] = None,
+    persistence_threshold_steps: int = PERSISTENCE_THRESHOLD_STEPS,
+) -> dict[int, list[RunMetrics]]:
+    """`_simulate_lanes`, run to the longest horizon and finalised at each one.
+
+    With `replay`, `rngs` is ignored: a single fleet follows the recorded
+    positions and activity instead of moving under the strategy.
+    """
+    width, height = scenario.grid.width, scenario.grid.height
+    steps = max(horizons)
+    variants = list(lane_variants) if lane_variants is not None else [_LaneVariant()]
+    variants_per_fleet = len(variants)
+    num_fleets = 1 if replay is not None else len(rngs)
+    num_lanes = num_fleets * variants_per_fleet
+    lanes = np.arange(num_lanes)
+
+    ever_seen = np.zeros((num_lanes, height, width), dtype=bool)
+    last_seen = np.full((num_lanes, height, width), -1, dtype=np.int32)
+    coverage_over_time = np.zeros((num_lanes, steps), dtype=float)
+    weighted_coverage_over_time = np.zeros((num_lanes, steps), dtype=float)
+    task_service_over_time = np.zeros((num_lanes, steps), dtype=float)
+
+    priority_weights, priority_mask = _priority_grids(scenario)
     total_priority_weight = float(np.sum(priority_weights))
+    total_cells = float(width * height)
+    cells_seen = np.zeros(num_lanes, dtype=np.int64)
+    weight_seen = np.zeros(num_lanes, dtype=float)
 
-    revisit_gaps: list[int] = []
-    priority_revisit_gaps: list[int] = []
-    persistence_threshold_steps = 10
+    # Revisit gaps never exceed the horizon, so per-lane histograms replace gap lists.
+    gap_counts = np.zeros((num_lanes, steps + 1), dtype=np.int64)
+    priority_gap_counts = np.zeros((num_lanes, steps + 1), dtype=np.int64)
 
-    drones = _expand_fleet(scenario, strategy, rng)
-    max_available_steps = float(sum(min(steps, drone.endurance_steps) for drone in drones))
-    offset_cache = {drone.sensor_radius: _disk_offsets(drone.sensor_radius) for drone in drones}
+    if replay is not None:
+        fleets = [_replay_fleet(replay, scenario)]
+    else:
+        fleets = [_expand_fleet(scenario, strategy, rng, per_drone_streams) for rng in rngs]
+    endurance_steps = fleets[0].endurance_steps if fleets else np.zeros(0, dtype=np.int64)
+    sensor_radius = fleets[0].sensor_radius if fleets else np.zeros(0, dtype=np.int64)
+    cost_per_step = fleets[0].cost_per_step.tolist() if fleets else []
+    drone_ids = np.arange(sensor_radius.size)
+    variant_radius = np.array(
+        [sensor_radius if variant.sensor_radius is None else np.full_like(sensor_radius, variant.sensor_radius) for variant in variants]
+    ).reshape(variants_per_fleet, -1)
+    variant_drones = np.array(
+        [drone_ids < (sensor_radius.size if variant.num_drones is None else variant.num_drones) for variant in variants]
+    ).reshape(variants_per_fleet, -1)
+    lane_radius = np.tile(variant_radius, (num_fleets, 1))
+    lane_drones = np.tile(variant_drones, (num_fleets, 1))
+    drone_lanes = [lanes[lane_drones[:, idx]] for idx in drone_ids]
+    stamp_groups = [
+        [
+            (int(radius), drone_lanes[idx][lane_radius[drone_lanes[idx], idx] == radius])
+            for radius in np.unique(lane_radius[drone_lanes[idx], idx])
+        ]
+        for idx in drone_ids
+    ]
     priority_targets = _build_priority_targets(scenario)
-    task_records = _build_task_records(scenario)
+    base_task_records = _build_task_records(scenario)
+    lane_task_records = [[dict(record) for record in base_task_records] for _ in range(num_lanes)]
+    rects = RectIndex(
+        [record["bounds"] for record in base_task_records] + [bounds for bounds, _, _ in priority_targets],
+        num_lanes,
+    )
+    task_windows = np.array(
+        [(record["task"].start_step, record["task"].end_step) for record in base_task_records],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    planner = replay is None and strategy.type in {"priority_patrol", "greedy_patrol"}
+    if planner and variants_per_fleet > 1:
+        raise ValueError(f"{strategy.type} plans from its own coverage, so its fleets cannot share lane variants.")
+    zones_live = np.full(len(priority_targets), planner)
+    unseen_cells = [
+        UnseenCells(width, height, frontier=strategy.explore_mode == "frontier") if planner else None
+        for _ in range(num_lanes)
+    ]
+
+    recorders = (
+        [TrajectoryRecorder(strategy.type, fleet.endurance_steps, steps, width, height) for fleet in fleets]
+        if trajectories is not None
+        else []
+    )
 
-    active_steps_total = 0.0
-    total_cost = 0.0
-    total_sensor_observations = 0
-    newly_covered_observations = 0
-    weighted_task_service_numerator = 0.0
+    active_steps_total = np.zeros(num_lanes, dtype=float)
+    total_cost = np.zeros(num_lanes, dtype=float)
+    total_sensor_observations = np.zeros(num_lanes, dtype=np.int64)
+    newly_covered_observations = np.zeros(num_lanes, dtype=np.int64)
+    weighted_task_service_numerator = np.zeros(num_lanes, dtype=float)
     weighted_task_service_denominator = 0.0
 
-    for t in range(steps):
-        seen_this_step = np.zeros((height, width), dtype=bool)
-
-        for drone in drones:
-            drone.active = t < drone.endurance_steps
-
-        if strategy.type == "patrol":
-            for drone in drones:
-                if drone.active:
-                    _step_patrol(drone, float(strategy.patrol_turn_prob), width, height, rng)
-        elif strategy.type in {"priority_patrol", "greedy_patrol"}:
-            active_drone_indices = [idx for idx, drone in enumerate(drones) if drone.active]
-            active_drones = [drones[idx] for idx in active_drone_indices]
-            candidates = _build_candidate_targets(
-                task_records=task_records,
-                priority_targets=priority_targets,
-                ever_seen=ever_seen,
-                last_seen=last_seen,
-                t=t,
-                strategy=strategy,
-                rng=rng,
-            )
-            assignments = _assign_targets(
-                drones=active_drones,
-                candidates=candidates,
-                strategy=strategy,
-                mode=strategy.type,
-            )
+    checkpoints = set(horizons)
+    snapshots: dict[int, dict] = {}
+
+    def take_snapshot() -> dict:
+        return {
+            "ever_seen": ever_seen.copy(),
+            "gap_counts": gap_counts.copy(),
+            "priority_gap_counts": priority_gap_counts.copy(),
+            "task_records": [[dict(record) for record in records] for records in lane_task_records],
+            "weighted_task_service_numerator": weighted_task_service_numerator.copy(),
+            "weighted_task_service_denominator": weighted_task_service_denominator,
+            "active_steps_total": active_steps_total.copy(),
+            "total_cost": total_cost.copy(),
+            "total_sensor_observations": total_sensor_observations.copy(),
+            "newly_covered_observations": newly_covered_observations.copy(),
+        }
+
+    if 0 in checkpoints:
+        snapshots[0] = take_snapshot()
 
-            for local_idx, drone in enumerate(active_drones):
-                candidate = assignments.get(local_idx)
-                if candidate is None:
-                    _step_patrol(drone, float(strategy.patrol_turn_prob), width, height, rng)
-                    drone.target_key = None
-                    drone.target_lock_remaining = 0
-                    continue
-
-                _move_toward(drone, candidate.centroid[0], candidate.centroid[1], width, height)
-                if strategy.type == "priority_patrol":
-                    drone.target_key = candidate.key
-                    drone.target_lock_remaining = max(0, int(strategy.target_commitment_steps))
-                else:
-                    drone.target_key = None
-                    drone.target_lock_remaining = 0
+    for t in range(steps):
+        tasks_live = (task_windows[:, 0] <= t) & (t < task_windows[:, 1])
+        rects.set_live(np.concatenate([tasks_live, zones_live]), ever_seen, last_seen)
+        rects.start_step()
+
+        if replay is not None:
+            fleets[0].x = replay.x[t].astype(np.int64)
+            fleets[0].y = replay.y[t].astype(np.int64)
+            stamping = np.flatnonzero(replay.active[t])
+        else:
+            stamping = np.flatnonzero(t < endurance_steps)
+            for fleet_index, rng in enumerate(rngs):
+                # Per-lane planner state belongs to the fleet's own (first) lane.
+                lane = fleet_index * variants_per_fleet
+                assigned_ids = _advance_fleet(
+                    fleets[fleet_index],
+                    t=t,
+                    strategy=strategy,
+                    task_records=lane_task_records[lane],
+                    priority_targets=priority_targets,
+                    rects=rects,
+                    lane=lane,
+                    unseen=unseen_cells[lane],
+                    width=width,
+                    height=height,
+                    rng=rng,
+                )
+                if recorders:
+                    fleet = fleets[fleet_index]
+                    recorders[fleet_index].record(t, fleet.x, fleet.y, fleet.active, assigned_ids)
+
+        xs = np.repeat(np.stack([fleet.x for fleet in fleets]), variants_per_fleet, axis=0)
+        ys = np.repeat(np.stack([fleet.y for fleet in fleets]), variants_per_fleet, axis=0)
+        fresh_cells: list[np.ndarray] = []
+        fresh_lanes: list[np.ndarray] = []
+        for idx in stamping:
+            active_steps_total[drone_lanes[idx]] += 1.0
+            total_cost[drone_lanes[idx]] += cost_per_step[idx]
+            for radius, group in stamp_groups[idx]:
+                update = stamp_footprints(
+                    t,
+                    group,
+                    xs[group, idx],
+                    ys[group, idx],
+                    radius,
+                    ever_seen,
+                    last_seen,
+                    priority_mask,
+                    priority_weights,
+                    rects,
+                )
+                total_sensor_observations += update.observations
+                newly_covered_observations += update.newly_covered
+                cells_seen += update.newly_covered
+                weight_seen += update.newly_covered_weight
+                np.add.at(gap_counts, (update.gap_lanes, update.revisit_gaps), 1)
+                np.add.at(
+                    priority_gap_counts,
+                    (update.gap_lanes[update.priority_gap], update.revisit_gaps[update.priority_gap]),
+                    1,
+                )
+                if planner:
+                    fresh_cells.append(update.fresh_cells)
+                    fresh_lanes.append(update.fresh_lanes)
 
-            if strategy.type == "priority_patrol":
-                for drone in drones:
-                    if drone.active and drone.target_lock_remaining > 0:
-                        drone.target_lock_remaining -= 1
+        if planner and fresh_cells:
+            step_cells = np.concatenate(fresh_cells)
+            step_lanes = np.concatenate(fresh_lanes)
+            for lane in range(num_lanes):
+                unseen_cells[lane].mark_seen(step_cells[step_lanes == lane], ever_seen[lane])
 
-        for drone in drones:
-            if not drone.active:
-                continue
-            active_steps_total += 1.0
-            total_cost += float(drone.cost_per_step)
-            cx, cy = drone.x, drone.y
-            for dx, dy in offset_cache[drone.sensor_radius]:
-                x = cx + dx
-                y = cy + dy
-                if 0 <= x < width and 0 <= y < height:
-                    seen_this_step[y, x] = True
-                    total_sensor_observations += 1
-                    if not ever_seen[y, x]:
-                        newly_covered_observations += 1
-
-                    prev = last_seen[y, x]
-                    if 0 <= prev < t:
-                        gap = t - prev
-                        revisit_gaps.append(gap)
-                        if priority_mask[y, x]:
-                            priority_revisit_gaps.append(gap)
-
-                    ever_seen[y, x] = True
-                    last_seen[y, x] = t
-
-        coverage_over_time[t] = float(np.mean(ever_seen))
-        weighted_coverage_over_time[t] = float(np.sum(priority_weights * ever_seen) / total_priority_weight)
+        coverage_over_time[:, t] = cells_seen / total_cells
+        weighted_coverage_over_time[:, t] = weight_seen / total_priority_weight
 
         active_task_weight = 0.0
-        weighted_task_service = 0.0
-        for record in task_records:
+        weighted_task_service = np.zeros(num_lanes, dtype=float)
+        step_fraction = rects.step_fraction()
+        for task_idx, record in enumerate(base_task_records):
             task: DynamicTask = record["task"]
             if not (task.start_step <= t < task.end_step):
                 continue
-            service_fraction = float(np.mean(seen_this_step[record["mask"]]))
+            service_fraction = step_fraction[:, task_idx]
             weighted_task_service += task.priority * service_fraction
             active_task_weight += task.priority
-            if service_fraction > 0.0 and record["response_time"] is None:
-                record["response_time"] = t - task.start_step
+            for lane in np.flatnonzero(service_fraction > 0.0):
+                lane_record = lane_task_records[lane][task_idx]
+                if lane_record["response_time"] is None:
+                    lane_record["response_time"] = t - task.start_step
 
         if active_task_weight > 0:
-            task_service_over_time[t] = weighted_task_service / active_task_weight
+            task_service_over_time[:, t] = weighted_task_service / active_task_weight
             weighted_task_service_numerator += weighted_task_service
             weighted_task_service_denominator += active_task_weight
 
+        if t + 1 in checkpoints:
+            snapshots[t + 1] = take_snapshot()
+
+    if trajectories is not None:
+        trajectories.extend(recorder.finish() for recorder in recorders)
+
+    results: dict[int, list[RunMetrics]] = {}
+    for horizon, snapshot in snapshots.items():
+        available_steps = np.minimum(horizon, endurance_steps)
+
+        horizon_results: list[RunMetrics] = []
+        for lane in range(num_lanes):
+            horizon_results.append(
+                _finalize_metrics(
+                    coverage_over_time=coverage_over_time[lane, :horizon],
+                    weighted_coverage_over_time=weighted_coverage_over_time[lane, :horizon],
+                    task_service_over_time=task_service_over_time[lane, :horizon],
+                    ever_seen=snapshot["ever_seen"][lane],
+                    priority_mask=priority_mask,
+                    gap_counts=snapshot["gap_counts"][lane],
+                    priority_gap_counts=snapshot["priority_gap_counts"][lane],
+                    task_records=snapshot["task_records"][lane],
+                    weighted_task_service_numerator=float(snapshot["weighted_task_service_numerator"][lane]),
+                    weighted_task_service_denominator=snapshot["weighted_task_service_denominator"],
+                    active_steps_total=float(snapshot["active_steps_total"][lane]),
+                    max_available_steps=float(np.sum(available_steps[lane_drones[lane]])),
+                    total_cost=float(snapshot["total_cost"][lane]),
+                    total_sensor_observations=int(snapshot["total_sensor_observations"][lane]),
+                    newly_covered_observations=int(snapshot["newly_covered_observations"][lane]),
+                    persistence_threshold_steps=persistence_threshold_steps,
+                )
+            )
+        results[horizon] = horizon_results
+    return results
+
+
+def _simulate_static(
+    scenario: Scenario,
+    strategy: StrategySpec,
+    rng: np.random.Generator,
+) -> RunMetrics:
+    """Closed-form evaluation of the static strategy.
+
+    Static drones never move and the active set only shrinks as endurance
+    runs out, so step 0 establishes all coverage and every later step
+    re-observes exactly the cells still under an active drone, each with a
+    revisit gap of 1. Only step 0 is stamped; everything else follows from
+    a per-cell "covered until" grid, with sequential sums kept in the
+    stepping engine's order so the metrics match it bit for bit.
+    """
+    width, height = scenario.grid.width, scenario.grid.height
+    steps = scenario.time.steps
+    fleet = _expand_fleet(scenario, strategy, rng)
+    priority_weights, priority_mask = _priority_grids(scenario)
+    task_records = _build_task_records(scenario)
+    endurance = np.minimum(fleet.endurance_steps, steps)
+
+    ever_seen = np.zeros((1, height, width), dtype=bool)
+    last_seen = np.full((1, height, width), -1, dtype=np.int32)
+    covered_until = np.zeros((height, width), dtype=np.int64)
+    observations = np.zeros(len(fleet), dtype=np.int64)
+    cells_seen = 0
+    weight_seen = np.zeros(1, dtype=float)
+    lane = np.zeros(1, dtype=np.int64)
+    for idx in np.flatnonzero(endurance > 0):
+        radius = int(fleet.sensor_radius[idx])
+        update = stamp_footprints(
+            0,
+            lane,
+            fleet.x[idx : idx + 1],
+            fleet.y[idx : idx + 1],
+            radius,
+            ever_seen,
+            last_seen,
+            priority_mask,
+            priority_weights,
+        )
+        observations[idx] = update.observations[0]
+        cells_seen += int(update.newly_covered[0])
+        weight_seen += update.newly_covered_weight
+
+        dy, dx = disk_offsets(radius)
+        ys = fleet.y[idx] + dy
+        xs = fleet.x[idx] + dx
+        inside = (ys >= 0) & (ys < height) & (xs >= 0) & (xs < width)
+        np.maximum.at(covered_until, (ys[inside], xs[inside]), endurance[idx])
+
+    t_axis = np.arange(steps)
+    active = t_axis[:, None] < endurance[None, :]
+    step_costs = (active * fleet.cost_per_step[None, :]).ravel()
+    total_cost = float(np.cumsum(step_costs)[-1]) if step_costs.size else 0.0
+
+    coverage_over_time = np.full(steps, cells_seen / float(width * height))
+    weighted_coverage_over_time = np.full(steps, float(weight_seen[0] / float(np.sum(priority_weights))))
+
+    # Cell c is re-observed at every step 1 <= t < covered_until[c], always one step after the last look.
+    revisits = np.maximum(covered_until - 1, 0)
+    gap_counts = np.zeros(steps + 1, dtype=np.int64)
+    priority_gap_counts = np.zeros(steps + 1, dtype=np.int64)
+    if steps:
+        gap_counts[1] = np.sum(revisits)
+        priority_gap_counts[1] = np.sum(revisits[priority_mask])
+
+    weighted_service = np.zeros(steps, dtype=float)
+    active_task_weight = np.zeros(steps, dtype=float)
+    for record in task_records:
+        task: DynamicTask = record["task"]
+        live = (task.start_step <= t_axis) & (t_axis < task.end_step)
+        if not np.any(live):
+            continue
+        y0, y1, x0, x1 = record["bounds"]
+        until = np.sort(covered_until[y0:y1, x0:x1], axis=None)
+        in_view = until.size - np.searchsorted(until, t_axis, side="right")
+        service_fraction = in_view / until.size
+        weighted_service += np.where(live, task.priority * service_fraction, 0.0)
+        active_task_weight += np.where(live, task.priority, 0.0)
+        first_live = int(np.argmax(live))
+        if in_view[first_live] > 0:
+            record["response_time"] = first_live - task.start_step
+
+    has_tasks = active_task_weight > 0
+    task_service_over_time = np.zeros(steps, dtype=float)
+    task_service_over_time[has_tasks] = weighted_service[has_tasks] / active_task_weight[has_tasks]
+    serviced = np.where(has_tasks, weighted_service, 0.0)
+
+    return _finalize_metrics(
+        coverage_over_time=coverage_over_time,
+        weighted_coverage_over_time=weighted_coverage_over_time,
+        task_service_over_time=task_service_over_time,
+        ever_seen=ever_seen[0],
+        priority_mask=priority_mask,
+        gap_counts=gap_counts,
+        priority_gap_counts=priority_gap_counts,
+        task_records=task_records,
+        weighted_task_service_numerator=float(np.cumsum(serviced)[-1]) if steps else 0.0,
+        weighted_task_service_denominator=float(np.cumsum(active_task_weight)[-1]) if steps else 0.0,
+        active_steps_total=float(np.count_nonzero(active)),
+        max_available_steps=float(np.sum(endurance)),
+        total_cost=total_cost,
+        total_sensor_observations=int(np.sum(active * observations[None, :])),
+        newly_covered_observations=cells_seen,
+        persistence_threshold_steps=PERSISTENCE_THRESHOLD_STEPS,
+    )
+
+
+def _advance_fleet(
+    fleet: FleetState,
+    t: int,
+    strategy: StrategySpec,
+    task_records: Sequence[dict],
+    priority_targets: Sequence[tuple[Bounds, tuple[int, int], float]],
+    rects: RectIndex,
+    lane: int,
+    unseen: Optional[UnseenCells],
+    width: int,
+    height: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Apply endurance cut-offs and one policy movement step to a fleet.
+
+    Returns the target id each drone was assigned this step, `NO_TARGET`
+    for drones that patrolled or stayed put.
+    """
+    fleet.active = t < fleet.endurance_steps
+    active = np.flatnonzero(fleet.active)
+    assigned_ids = np.full(len(fleet), NO_TARGET, dtype=np.int64)
+
+    if strategy.type == "patrol":
+        step_patrol(fleet, active, float(strategy.patrol_turn_prob), width, height, rng, t)
+    elif strategy.type in {"priority_patrol", "greedy_patrol"}:
+        candidates = _build_candidate_targets(
+            task_records=task_records,
+            priority_targets=priority_targets,
+            seen_ratio=rects.seen_ratio(lane),
+            mean_age=rects.mean_age(lane, t),
+            unseen=unseen,
+            t=t,
+            strategy=strategy,
+            rng=rng,
+        )
+        assignments = _assign_targets(
+            fleet=fleet,
+            drones=active,
+            candidates=candidates,
+            strategy=strategy,
+            mode=strategy.type,
+        )
+
+        assigned_local = np.array(sorted(assignments), dtype=np.int64)
+        unassigned = np.setdiff1d(active, active[assigned_local])
+        if assigned_local.size:
+            assigned = active[assigned_local]
+            targets = [assignments[int(local)] for local in assigned_local]
+            assigned_ids[assigned] = [candidate.target_id for candidate in targets]
+            move_toward(
+                fleet,
+                assigned,
+                np.array([candidate.centroid[0] for candidate in targets], dtype=np.int64),
+                np.array([candidate.centroid[1] for candidate in targets], dtype=np.int64),
+                width,
+                height,
+            )
+            if strategy.type == "priority_patrol":
+                fleet.target_id[assigned] = [candidate.target_id for candidate in targets]
+                fleet.target_lock_remaining[assigned] = max(0, int(strategy.target_commitment_steps))
+            else:
+                fleet.target_id[assigned] = NO_TARGET
+                fleet.target_lock_remaining[assigned] = 0
+
+        step_patrol(fleet, unassigned, float(strategy.patrol_turn_prob), width, height, rng, t)
+        fleet.target_id[unassigned] = NO_TARGET
+        fleet.target_lock_remaining[unassigned] = 0
+
+        if strategy.type == "priority_patrol":
+            locked = active[fleet.target_lock_remaining[active] > 0]
+            fleet.target_lock_remaining[locked] -= 1
+
+    return assigned_ids
+
+
+def _finalize_metrics(
+    coverage_over_time: np.ndarray,
+    weighted_coverage_over_time: np.ndarray,
+    task_service_over_time: np.ndarray,
+    ever_seen: np.ndarray,
+    priority_mask: np.ndarray,
+    gap_counts: np.ndarray,
+    priority_gap_counts: np.ndarray,
+    task_records: Sequence[dict],
+    weighted_task_service_numerator: float,
+    weighted_task_service_denominator: float,
+    active_steps_total: float,
+    max_available_steps: float,
+    total_cost: float,
+    total_sensor_observations: int,
+    newly_covered_observations: int,
+    persistence_threshold_steps: int,
+) -> RunMetrics:
+    """Collapse one replicate's accumulators into `RunMetrics`."""
+    steps = coverage_over_time.shape[0]
     avg_coverage = float(np.mean(coverage_over_time))
     final_coverage = float(coverage_over_time[-1]) if steps else 0.0
     avg_weighted_coverage = float(np.mean(weighted_coverage_over_time))
     final_weighted_coverage = float(weighted_coverage_over_time[-1]) if steps else 0.0
     priority_cell_coverage = float(np.mean(ever_seen[priority_mask])) if np.any(priority_mask) else final_coverage
 
-    gaps = np.array(revisit_gaps, dtype=int)
-    priority_gaps = np.array(priority_revisit_gaps, dtype=int)
-    gap_mean, gap_p90, pct_within = summarize_revisit_gaps(gaps, persistence_threshold_steps)
-    priority_gap_mean, priority_gap_p90, priority_pct_within = summarize_revisit_gaps(
-        priority_gaps,
+    gap_mean, gap_p90, pct_within = summarize_revisit_histogram(gap_counts, persistence_threshold_steps)
+    priority_gap_mean, priority_gap_p90, priority_pct_within = summarize_revisit_histogram(
+        priority_gap_counts,
         persistence_threshold_steps,
     )
 
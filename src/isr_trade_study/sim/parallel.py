@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+from .cache import ResultCache
+
+
+# Seed chunks per worker; a few per worker keeps the pool busy when sweep
+# points take uneven time without giving up much lane batching.
+TASKS_PER_WORKER = 4
+
+
+@dataclass(frozen=True)
+class BatchTask:
+    """One unit of pool work: `func(*args, list(seeds))`.
+
+    `func` must be a module-level callable (such as `run_simulation_batch`)
+    so the task pickles by reference. Every batch runner is per-seed
+    deterministic, so splitting a point's seeds across tasks and
+    concatenating the results in order reproduces the single-batch output.
+    With a `cache`, seeds already stored there are not simulated again.
+    """
+
+    func: Callable[..., Any]
+    args: tuple
+    seeds: tuple[int, ...]
+    cache: Optional[ResultCache] = None
+
+
+def _run_task(task: BatchTask) -> Any:
+    if task.cache is not None:
+        return task.cache.run_batch(task.func, task.args, task.seeds)
+    return task.func(*task.args, list(task.seeds))
+
+
+def seed_chunk_size(total_seeds: int, jobs: int) -> int:
+    """Largest seed chunk that still gives every worker a few tasks."""
+    if jobs <= 1:
+        return max(total_seeds, 1)
+    return max(1, math.ceil(total_seeds / (jobs * TASKS_PER_WORKER)))
+
+
+def chunk_seeds(seeds: Sequence[int], chunk_size: int) -> list[tuple[int, ...]]:
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    return [tuple(seeds[i : i + chunk_size]) for i in range(0, len(seeds), chunk_size)]
+
+
+def run_tasks(
+    tasks: Sequence[BatchTask],
+    jobs: int = 1,
+    on_result: Optional[Callable[[int, Any], None]] = None,
+    keep_results: bool = True,
+) -> list[Any]:
+    """Run tasks serially (`jobs <= 1`) or over a process pool.
+
+    Results come back in task order either way, and `on_result(index,
+    result)` is called as each one is collected, so callers can report
+    progress without caring how the work was scheduled. Callers that
+    consume every result in `on_result` can pass `keep_results=False` so
+    finished batches are released instead of held until the end.
+    """
+    if jobs <= 1 or len(tasks) <= 1:
+        return _collect(map(_run_task, tasks), on_result, keep_results)
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        return _collect(pool.map(_run_task, tasks), on_result, keep_results)
+
+
+def _collect(
+    outputs: Iterable[Any],
+    on_result: Optional[Callable[[int, Any], None]],
+    keep_results: bool,
+) -> list[Any]:
+    results: list[Any] = []
+    for index, result in enumerate(outputs):
+        if keep_results:
+            results.append(result)
+        if on_result is not None:
+            on_result(index, result)
+    return results
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Sequence
+
+import numpy as np
+
+from .footprint import disk_offsets
+
+
+Bounds = tuple[int, int, int, int]
+
+_CORNER_SIGNS = np.array([1, -1, -1, 1], dtype=np.int64)
+
+
+@lru_cache(maxsize=None)
+def _padded_stencil_index(radius: int) -> np.ndarray:
+    """Flat positions of the stencil cells inside a zero-padded `(2r+2)^2` box."""
+    dy, dx = disk_offsets(radius)
+    side = 2 * radius + 2
+    return (dy + radius + 1) * side + (dx + radius + 1)
+
+
+class RectIndex:
+    """Running per-rectangle coverage statistics for axis-aligned regions.
+
+    Tracks, per lane and per rectangle, the number of cells ever seen, the
+    sum of `last_seen` over those cells and the number of cells seen in the
+    current step. Footprint stamps update the counters in O(footprint +
+    rectangles) via a small integral image of the stamp's deltas, so
+    seen-ratio, mean-age and service-fraction queries are O(1) per
+    rectangle instead of O(area).
+
+    Only *live* rectangles are maintained; `set_live` brings a rectangle up
+    to date from the coverage grids (O(area), once) when it becomes live.
+    Statistics of rectangles that are not live are stale.
+
+    `bounds` are half-open `(y0, y1, x0, x1)` cell ranges, already clipped
+    to the grid.
+    """
+
+    def __init__(self, bounds: Sequence[Bounds], num_lanes: int) -> None:
+        self.bounds = np.array(bounds, dtype=np.int64).reshape(-1, 4).T.copy()
+        y0, y1, x0, x1 = self.bounds
+        self.area = (y1 - y0) * (x1 - x0)
+        self.seen_cells = np.zeros((num_lanes, len(self)), dtype=np.int64)
+        self.last_seen_sum = np.zeros((num_lanes, len(self)), dtype=np.int64)
+        self.step_cells = np.zeros((num_lanes, len(self)), dtype=np.int64)
+        self.live = np.zeros(len(self), dtype=bool)
+        self._live_idx = np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return int(self.area.shape[0])
+
+    def set_live(self, live: np.ndarray, ever_seen: np.ndarray, last_seen: np.ndarray) -> None:
+        """Choose which rectangles to maintain, syncing newly live ones from the grids."""
+        for idx in np.flatnonzero(live & ~self.live):
+            y0, y1, x0, x1 = self.bounds[:, idx]
+            seen = ever_seen[:, y0:y1, x0:x1]
+            self.seen_cells[:, idx] = np.count_nonzero(seen, axis=(1, 2))
+            self.last_seen_sum[:, idx] = np.sum(last_seen[:, y0:y1, x0:x1], axis=(1, 2), where=seen)
+            self.step_cells[:, idx] = 0
+        self.live = live.copy()
+        self._live_idx = np.flatnonzero(live)
+
+    def start_step(self) -> None:
+        self.step_cells[:, self._live_idx] = 0
+
+    def add_footprint(
+        self,
+        lanes: np.ndarray,
+        cx: np.ndarray,
+        cy: np.ndarray,
+        radius: int,
+        deltas: np.ndarray,
+    ) -> None:
+        """Fold one stamped footprint into the live rectangle counters.
+
+        `deltas` has shape `(len(lanes), 3, K)` over the `K` cells of
+        `disk_offsets(radius)` (zero for cells off the grid) and holds the
+        per-cell increments of seen cells, `last_seen` sum and cells seen
+        this step.
+        """
+        live = self._live_idx
+        if live.size == 0 or lanes.size == 0:
+            return
+
+        side = 2 * radius + 2
+        integral = np.zeros((lanes.size, 3, side * side), dtype=np.int64)
+        integral[:, :, _padded_stencil_index(radius)] = deltas
+        integral = integral.reshape(lanes.size, 3, side, side)
+        integral.cumsum(axis=2, out=integral)
+        integral.cumsum(axis=3, out=integral)
+
+        origin = np.stack([cy, cy, cx, cx], axis=1)[:, :, None] - radius
+        local = np.minimum(np.maximum(self.bounds[None, :, live] - origin, 0), side - 1)
+        ly0, ly1, lx0, lx1 = local[:, 0], local[:, 1], local[:, 2], local[:, 3]
+        corners = np.stack(
+            [ly1 * side + lx1, ly0 * side + lx1, ly1 * side + lx0, ly0 * side + lx0],
+            axis=2,
+        ).reshape(lanes.size, 1, -1)
+        values = np.take_along_axis(integral.reshape(lanes.size, 3, -1), corners, axis=2)
+        sums = values.reshape(lanes.size, 3, live.size, 4) @ _CORNER_SIGNS
+
+        self.seen_cells[lanes[:, None], live] += sums[:, 0]
+        self.last_seen_sum[lanes[:, None], live] += sums[:, 1]
+        self.step_cells[lanes[:, None], live] += sums[:, 2]
+
+    def seen_ratio(self, lane: int) -> np.ndarray:
+        """Fraction of each rectangle ever seen."""
+        return self.seen_cells[lane] / self.area
+
+    def mean_age(self, lane: int, t: int) -> np.ndarray:
+        """Mean steps since each cell was last seen (`t + 1` if never seen)."""
+        seen = self.seen_cells[lane]
+        total = (t + 1) * (self.area - seen) + t * seen - self.last_seen_sum[lane]
+        return total / self.area
+
+    def step_fraction(self) -> np.ndarray:
+        """`(lanes, rectangles)` fraction of each rectangle seen this step."""
+        return self.step_cells / self.area
@@ -85,6 +85,10 @@ class StrategySpec:
       - "patrol"          : random-walk patrol
       - "greedy_patrol"   : assign drones to highest-utility candidate each step
       - "priority_patrol" : task-aware planner with target commitment
+
+    `explore_mode` controls where planner exploration candidates are drawn:
+    "uniform" samples any unseen cell, "frontier" samples unseen cells next
+    to already-seen ones (falling back to uniform while no frontier exists).
     """
 
     type: str
@@ -96,3 +100,4 @@ class StrategySpec:
     exploration_bias: float = 0.35
     target_commitment_steps: int = 4
     congestion_penalty: float = 0.35
+    explore_mode: str = "uniform"
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+
+_INT16_MAX = np.iinfo(np.int16).max
+
+
+@dataclass(frozen=True)
+class Trajectory:
+    """Recorded movement of one run, enough to re-score it without replanning.
+
+    Arrays are `(steps, drones)`: `x` / `y` hold the cell each drone
+    occupied (and stamped) at every step, `active` flags the drones that
+    stamped, and `target_id` holds the planner target a drone was assigned
+    that step (`NO_TARGET` while patrolling). Target ids follow
+    `CandidateTarget.target_id`: task index, then zone index offset by the
+    task count, then per-step exploration slots. `endurance_steps` is per
+    drone.
+    """
+
+    strategy_type: str
+    x: np.ndarray
+    y: np.ndarray
+    active: np.ndarray
+    target_id: np.ndarray
+    endurance_steps: np.ndarray
+
+    @property
+    def steps(self) -> int:
+        return int(self.x.shape[0])
+
+    @property
+    def num_drones(self) -> int:
+        return int(self.x.shape[1])
+
+    def save(self, path: str | Path) -> Path:
+        """Write the trajectory to a compressed `.npz` archive."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as handle:
+            np.savez_compressed(
+                handle,
+                strategy_type=np.array(self.strategy_type),
+                x=self.x,
+                y=self.y,
+                active=self.active,
+                target_id=self.target_id,
+                endurance_steps=self.endurance_steps,
+            )
+        return path
+
+
+def load_trajectory(path: str | Path) -> Trajectory:
+    with np.load(Path(path)) as data:
+        return Trajectory(
+            strategy_type=str(data["strategy_type"]),
+            x=data["x"],
+            y=data["y"],
+            active=data["active"],
+            target_id=data["target_id"],
+            endurance_steps=data["endurance_steps"],
+        )
+
+
+class TrajectoryRecorder:
+    """Accumulates one fleet's per-step positions, activity and assignments."""
+
+    def __init__(self, strategy_type: str, endurance_steps: np.ndarray, steps: int, width: int, height: int) -> None:
+        if max(width, height) - 1 > _INT16_MAX:
+            raise ValueError("Trajectory recording supports grids up to 32768 cells per side.")
+        num_drones = int(endurance_steps.shape[0])
+        self.strategy_type = strategy_type
+        self.endurance_steps = endurance_steps.copy()
+        self.x = np.zeros((steps, num_drones), dtype=np.int16)
+        self.y = np.zeros((steps, num_drones), dtype=np.int16)
+        self.active = np.zeros((steps, num_drones), dtype=bool)
+        self.target_id = np.zeros((steps, num_drones), dtype=np.int32)
+
+    def record(self, t: int, x: np.ndarray, y: np.ndarray, active: np.ndarray, target_id: np.ndarray) -> None:
+        self.x[t] = x
+        self.y[t] = y
+        self.active[t] = active
+        self.target_id[t] = target_id
+
+    def finish(self) -> Trajectory:
+        return Trajectory(
+            strategy_type=self.strategy_type,
+            x=self.x,
+            y=self.y,
+            active=self.active,
+            target_id=self.target_id,
+            endurance_steps=self.endurance_steps,
+        )
@@ -1,8 +1,43 @@
 from __future__ import annotations
 
+import hashlib
+import json
+from typing import Optional, Union
+
 import numpy as np
 
 
+JobKey = Optional[Union[str, int]]
+
+_SEED_MASK = (1 << 63) - 1
+
+
 def make_rng(seed: int) -> np.random.Generator:
     """Build a numpy random Generator from an integer seed."""
     return np.random.default_rng(seed)
+
+
+def job_seed_sequence(base_seed: int, **identity: JobKey) -> np.random.SeedSequence:
+    """Child `SeedSequence` of `base_seed` for the job named by `identity`.
+
+    The identity fields (e.g. `strategy="patrol", fleet_size=4,
+    sensor_radius=2, replicate=0`) are canonicalised, hashed with SHA-256
+    and used as the spawn key, so every distinct identity gets its own
+    independent stream regardless of the order jobs are planned or run in.
+    Field names are part of the key: `fleet_size=2` and `sensor_radius=2`
+    differ, as do `"2"` and `2`.
+    """
+    canonical = json.dumps(identity, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    digest = hashlib.sha256(canonical).digest()
+    spawn_key = tuple(int(word) for word in np.frombuffer(digest, dtype="<u4"))
+    return np.random.SeedSequence(int(base_seed), spawn_key=spawn_key)
+
+
+def job_seed(base_seed: int, **identity: JobKey) -> int:
+    """Non-negative 63-bit integer seed drawn from `job_seed_sequence`.
+
+    The integer fits an int64 results column and reproduces the job through
+    `make_rng(seed)`.
+    """
+    words = job_seed_sequence(base_seed, **identity).generate_state(2, dtype=np.uint32)
+    return ((int(words[1]) << 32) | int(words[0])) & _SEED_MASK
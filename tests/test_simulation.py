@@ -1,19 +1,79 @@
 from __future__ import annotations
 
+import tempfile
 import unittest
+from pathlib import Path
 
-from isr_trade_study.sim.monte_carlo import run_simulation
+import duckdb
+import numpy as np
+import pandas as pd
+
+from isr_trade_study.analytics.storage import StorageOptions, StreamingTableWriter, persist_tables_to_duckdb
+from isr_trade_study.analytics.summary import summarize_frame
+from isr_trade_study.analytics.sweep_store import SweepStore, copy_stored_runs
+from isr_trade_study.analytics.timeseries import TIMESERIES_ORDER_BY, TIMESERIES_TABLE, TimeseriesCollector, load_run_timeseries
+from isr_trade_study.analytics.warehouse import (
+    CATALOG_NAME,
+    CompactionReport,
+    compact_warehouse,
+    latest_run,
+    load_run_table,
+    publish_run,
+    tag_run,
+)
+from isr_trade_study.dashboard.live_demo import _build_demo_snapshot, _build_policy_snapshot
+from isr_trade_study.sim.cache import ResultCache, result_key
+from isr_trade_study.sim.cell_index import UnseenCells
+from isr_trade_study.sim.fleet import FleetState, move_toward, step_patrol
+from isr_trade_study.sim.footprint import disk_stencil, stamp_footprints
+from isr_trade_study.sim.metrics import METRIC_COLUMNS, summarize_revisit_gaps, summarize_revisit_histogram
+from isr_trade_study.sim.monte_carlo import (
+    CandidateTarget,
+    _LaneVariant,
+    _assign_targets,
+    _simulate_lanes,
+    is_seed_independent,
+    rescore,
+    run_fleet_nested_batch,
+    run_radius_nested_batch,
+    run_simulation,
+    run_simulation_batch,
+    run_simulation_horizons,
+    run_simulation_recorded,
+)
+from isr_trade_study.sim.parallel import BatchTask, chunk_seeds, run_tasks
 from isr_trade_study.sim.placements import resolve_static_points
+from isr_trade_study.sim.rect_index import RectIndex
+from isr_trade_study.sim.trajectory import load_trajectory
 from isr_trade_study.sim.scenario import (
     DynamicTask,
     FleetSpec,
     GridSpec,
     PlatformSpec,
+    PriorityZone,
     Scenario,
     StrategySpec,
     TimeSpec,
 )
-from isr_trade_study.utils.seed import make_rng
+from isr_trade_study.utils.seed import job_seed, make_rng
+
+
+def _write_demo_run(run_dir: Path, coverage: float) -> None:
+    raw = pd.DataFrame(
+        {
+            "run_id": [0, 1],
+            "scenario": ["grid", "grid"],
+            "strategy": ["static", "patrol"],
+            "final_coverage": [coverage, coverage + 0.5],
+        }
+    )
+    agg = raw.drop(columns=["run_id", "scenario"])
+    series = pd.DataFrame({"run_id": [0, 0, 1], "t": [0, 1, 0], "series": "coverage", "value": [0.1, 0.2, 0.3]})
+    persist_tables_to_duckdb(
+        run_dir,
+        run_dir / "analysis.duckdb",
+        {"demo_results_raw": raw, "demo_results_agg": agg, TIMESERIES_TABLE: series},
+    )
 
 
 class SimulationTests(unittest.TestCase):
@@ -36,6 +96,707 @@ class SimulationTests(unittest.TestCase):
         self.assertEqual(metrics.revisit_gap_mean, 1.0)
         self.assertEqual(metrics.revisit_gap_p90, 1.0)
 
+    def test_job_seeds_are_keyed_by_full_identity(self) -> None:
+        identities = [
+            {"strategy": strategy, "fleet_size": n, "sensor_radius": r, "replicate": k}
+            for strategy in ("patrol", "ptarol", "static")
+            for n in (1, 2)
+            for r in (1, 100)
+            for k in (0, 1, 100)
+        ]
+        seeds = [job_seed(42, **identity) for identity in identities]
+
+        self.assertEqual(len(set(seeds)), len(identities))
+        self.assertTrue(all(0 <= seed < 2**63 for seed in seeds))
+        self.assertEqual(job_seed(42, replicate=3, strategy="patrol"), job_seed(42, strategy="patrol", replicate=3))
+        self.assertNotEqual(job_seed(42, strategy="patrol", replicate=3), job_seed(43, strategy="patrol", replicate=3))
+        self.assertNotEqual(job_seed(42, fleet_size=2), job_seed(42, sensor_radius=2))
+
+    def test_footprint_stencil_clips_at_grid_corner(self) -> None:
+        stencil = disk_stencil(2)
+        expected = sum(1 for dx in range(-2, 3) for dy in range(-2, 3) if dx * dx + dy * dy <= 4)
+        self.assertEqual(int(np.count_nonzero(stencil)), expected)
+
+        ever_seen = np.zeros((2, 10, 10), dtype=bool)
+        last_seen = np.full((2, 10, 10), -1, dtype=np.int32)
+        update = stamp_footprints(
+            0,
+            np.array([0, 1]),
+            np.array([0, 5]),
+            np.array([0, 5]),
+            2,
+            ever_seen,
+            last_seen,
+            np.zeros((10, 10), dtype=bool),
+            np.ones((10, 10), dtype=float),
+        )
+
+        expected_corner = sum(1 for dx in range(0, 3) for dy in range(0, 3) if dx * dx + dy * dy <= 4)
+        self.assertEqual(update.observations.tolist(), [expected_corner, expected])
+        self.assertEqual(update.newly_covered.tolist(), [expected_corner, expected])
+        self.assertEqual(int(np.count_nonzero(ever_seen[0, 3:, :])), 0)
+        self.assertEqual(int(np.count_nonzero(ever_seen[1])), expected)
+
+    def test_running_coverage_counters_match_zone_weights(self) -> None:
+        scenario = Scenario(
+            name="weighted_coverage_check",
+            grid=GridSpec(width=4, height=4),
+            time=TimeSpec(steps=2),
+            fleet=FleetSpec(
+                num_drones=1,
+                sensor_radius=1,
+                endurance_steps=2,
+                cost_per_step=1.0,
+            ),
+            priority_zones=(PriorityZone(name="corner", x_min=0, x_max=1, y_min=0, y_max=1, weight=3.0),),
+        )
+        strategy = StrategySpec(type="static", static_points=[(0, 0)])
+
+        metrics = run_simulation(scenario, strategy, make_rng(5))
+
+        np.testing.assert_allclose(metrics.coverage_over_time, [3 / 16, 3 / 16])
+        np.testing.assert_allclose(metrics.weighted_coverage_over_time, [9 / 24, 9 / 24])
+        self.assertAlmostEqual(metrics.priority_cell_coverage, 0.75)
+
+    def test_batch_matches_independent_runs(self) -> None:
+        scenario = Scenario(
+            name="batch_check",
+            grid=GridSpec(width=20, height=16),
+            time=TimeSpec(steps=25),
+            fleet=FleetSpec(
+                num_drones=3,
+                sensor_radius=2,
+                endurance_steps=20,
+                cost_per_step=1.0,
+            ),
+            priority_zones=(PriorityZone(name="zone", x_min=2, x_max=8, y_min=3, y_max=9, weight=2.0),),
+            dynamic_tasks=(
+                DynamicTask(name="spike", start_step=5, end_step=20, x_min=12, x_max=15, y_min=10, y_max=13),
+            ),
+        )
+        seeds = [11, 12, 13]
+        for strategy_type in ("static", "patrol", "priority_patrol"):
+            strategy = StrategySpec(
+                type=strategy_type,
+                static_points=[(4, 4), (10, 8), (14, 12)],
+                patrol_step_size=1,
+                patrol_turn_prob=0.3,
+            )
+            self.assertEqual(is_seed_independent(scenario, strategy), strategy_type == "static")
+            batch = run_simulation_batch(scenario, strategy, seeds)
+            for seed, batched in zip(seeds, batch):
+                single = run_simulation(scenario, strategy, make_rng(seed))
+                self.assertEqual(batched.to_dict(), single.to_dict())
+                np.testing.assert_array_equal(batched.coverage_over_time, single.coverage_over_time)
+
+    def test_parallel_chunks_match_single_batch(self) -> None:
+        scenario = Scenario(
+            name="pool",
+            grid=GridSpec(width=16, height=12),
+            time=TimeSpec(steps=12),
+            fleet=FleetSpec(num_drones=3, sensor_radius=1, endurance_steps=12, cost_per_step=1.0),
+        )
+        strategy = StrategySpec(type="patrol")
+        seeds = [5, 6, 7, 8, 9]
+        tasks = [BatchTask(run_simulation_batch, (scenario, strategy), chunk) for chunk in chunk_seeds(seeds, 2)]
+        seen: list[int] = []
+
+        results = run_tasks(tasks, jobs=2, on_result=lambda index, _: seen.append(index))
+
+        self.assertEqual([len(batch) for batch in results], [2, 2, 1])
+        self.assertEqual(seen, [0, 1, 2])
+        expected = run_simulation_batch(scenario, strategy, seeds)
+        self.assertEqual(
+            [metrics.to_dict() for batch in results for metrics in batch],
+            [metrics.to_dict() for metrics in expected],
+        )
+
+    def test_result_cache_stitches_hits_and_evicts_oldest(self) -> None:
+        scenario = Scenario(
+            name="cache",
+            grid=GridSpec(width=14, height=10),
+            time=TimeSpec(steps=10),
+            fleet=FleetSpec(num_drones=2, sensor_radius=1, endurance_steps=10, cost_per_step=1.0),
+        )
+        strategy = StrategySpec(type="patrol")
+        expected = run_simulation_batch(scenario, strategy, [1, 2, 3])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(Path(tmp) / "results.sqlite")
+            cache.run_batch(run_simulation_batch, (scenario, strategy), [2])
+            stitched = cache.run_batch(run_simulation_batch, (scenario, strategy), [1, 2, 3])
+            self.assertEqual([m.to_dict() for m in stitched], [m.to_dict() for m in expected])
+            self.assertEqual(cache.stats()[0], 3)
+
+            entry_size = cache.stats()[1] // 3
+            small = ResultCache(cache.path, max_bytes=2 * entry_size + entry_size // 2)
+            keys = {seed: result_key(run_simulation_batch, (scenario, strategy), seed) for seed in (1, 2, 3)}
+            small.get_many([keys[2]])
+            small.get_many([keys[1]])
+            small.put_many({"newest": 0})
+            self.assertEqual(set(small.get_many(list(keys.values()))), {keys[2], keys[1]})
+
+            bulk = ResultCache(Path(tmp) / "bulk.sqlite")
+            bulk.put_many({f"key{i}": i for i in range(0, 2500, 2)})
+            found = bulk.get_many([f"key{i}" for i in range(2500)])
+            self.assertEqual(found, {f"key{i}": i for i in range(0, 2500, 2)})
+
+        self.assertNotEqual(
+            result_key(run_simulation_batch, (scenario, strategy), 1),
+            result_key(run_simulation_batch, (scenario, StrategySpec(type="patrol", patrol_turn_prob=0.5)), 1),
+        )
+
+    def test_radius_nested_batch_matches_per_radius_runs(self) -> None:
+        scenario = Scenario(
+            name="radius_nesting",
+            grid=GridSpec(width=18, height=14),
+            time=TimeSpec(steps=20),
+            fleet=FleetSpec(num_drones=3, sensor_radius=1, endurance_steps=15, cost_per_step=1.0),
+            priority_zones=(PriorityZone(name="zone", x_min=1, x_max=6, y_min=1, y_max=6, weight=2.0),),
+            dynamic_tasks=(DynamicTask(name="spike", start_step=4, end_step=18, x_min=9, x_max=13, y_min=6, y_max=10),),
+        )
+        seeds = [3, 4]
+        for strategy_type in ("static", "patrol"):
+            strategy = StrategySpec(type=strategy_type, static_points=[(2, 2), (9, 7), (15, 11)])
+            nested = run_radius_nested_batch(scenario, strategy, [1, 3, 5], seeds)
+            for radius, replicates in nested.items():
+                radius_scenario = Scenario(
+                    name=scenario.name,
+                    grid=scenario.grid,
+                    time=scenario.time,
+                    fleet=FleetSpec(num_drones=3, sensor_radius=radius, endurance_steps=15, cost_per_step=1.0),
+                    priority_zones=scenario.priority_zones,
+                    dynamic_tasks=scenario.dynamic_tasks,
+                )
+                for seed, metrics in zip(seeds, replicates):
+                    single = run_simulation(radius_scenario, strategy, make_rng(seed))
+                    self.assertEqual(metrics.to_dict(), single.to_dict())
+
+        with self.assertRaises(ValueError):
+            run_radius_nested_batch(scenario, StrategySpec(type="greedy_patrol"), [1, 2], seeds)
+        with self.assertRaises(ValueError):
+            _simulate_lanes(
+                scenario,
+                StrategySpec(type="priority_patrol"),
+                [make_rng(3)],
+                lane_variants=[_LaneVariant(sensor_radius=1), _LaneVariant(sensor_radius=2)],
+            )
+
+    def test_fleet_nested_batch_matches_smaller_fleets(self) -> None:
+        scenario = Scenario(
+            name="fleet_nesting",
+            grid=GridSpec(width=20, height=15),
+            time=TimeSpec(steps=18),
+            fleet=FleetSpec(num_drones=5, sensor_radius=2, endurance_steps=14, cost_per_step=1.1),
+            priority_zones=(PriorityZone(name="zone", x_min=2, x_max=8, y_min=2, y_max=7, weight=1.5),),
+            dynamic_tasks=(DynamicTask(name="spike", start_step=3, end_step=16, x_min=12, x_max=16, y_min=8, y_max=12),),
+        )
+        strategy = StrategySpec(type="patrol", patrol_turn_prob=0.4)
+        seeds = [21, 22]
+
+        nested = run_fleet_nested_batch(scenario, strategy, [1, 3, 5], seeds)
+
+        for size, replicates in nested.items():
+            small = Scenario(
+                name=scenario.name,
+                grid=scenario.grid,
+                time=scenario.time,
+                fleet=FleetSpec(num_drones=size, sensor_radius=2, endurance_steps=14, cost_per_step=1.1),
+                priority_zones=scenario.priority_zones,
+                dynamic_tasks=scenario.dynamic_tasks,
+            )
+            singles = _simulate_lanes(small, strategy, [make_rng(seed) for seed in seeds], per_drone_streams=True)
+            for metrics, single in zip(replicates, singles):
+                self.assertEqual(metrics.to_dict(), single.to_dict())
+
+        with self.assertRaises(ValueError):
+            run_fleet_nested_batch(scenario, StrategySpec(type="priority_patrol"), [1, 2], seeds)
+
+    def test_horizon_checkpoints_match_shorter_runs(self) -> None:
+        scenario = Scenario(
+            name="horizons",
+            grid=GridSpec(width=16, height=12),
+            time=TimeSpec(steps=24),
+            fleet=FleetSpec(num_drones=3, sensor_radius=2, endurance_steps=18, cost_per_step=1.5),
+            priority_zones=(PriorityZone(name="zone", x_min=0, x_max=5, y_min=0, y_max=4, weight=2.0),),
+            dynamic_tasks=(
+                DynamicTask(name="early", start_step=2, end_step=9, x_min=10, x_max=14, y_min=7, y_max=11),
+                DynamicTask(name="late", start_step=15, end_step=30, x_min=3, x_max=6, y_min=6, y_max=9),
+            ),
+        )
+        horizons = [5, 12, 24]
+        for strategy_type in ("static", "patrol", "priority_patrol"):
+            strategy = StrategySpec(type=strategy_type, static_points=[(2, 2), (8, 6), (12, 9)])
+            nested = run_simulation_horizons(scenario, strategy, make_rng(9), horizons)
+            self.assertEqual(sorted(nested), horizons)
+            for horizon in horizons:
+                short = Scenario(
+                    name=scenario.name,
+                    grid=scenario.grid,
+                    time=TimeSpec(steps=horizon),
+                    fleet=scenario.fleet,
+                    priority_zones=scenario.priority_zones,
+                    dynamic_tasks=scenario.dynamic_tasks,
+                )
+                single = run_simulation(short, strategy, make_rng(9))
+                self.assertEqual(nested[horizon].to_dict(), single.to_dict())
+                np.testing.assert_array_equal(nested[horizon].task_service_over_time, single.task_service_over_time)
+
+        with self.assertRaises(ValueError):
+            run_simulation_horizons(scenario, StrategySpec(type="patrol"), make_rng(9), [25])
+
+    def test_recorded_trajectory_rescores_to_same_metrics(self) -> None:
+        scenario = Scenario(
+            name="replay",
+            grid=GridSpec(width=22, height=16),
+            time=TimeSpec(steps=20),
+            fleet=FleetSpec(
+                num_drones=0,
+                sensor_radius=0,
+                endurance_steps=0,
+                cost_per_step=0.0,
+                platforms=(
+                    PlatformSpec(name="scout", count=2, sensor_radius=2, endurance_steps=16, cost_per_step=1.2),
+                    PlatformSpec(name="sentinel", count=1, sensor_radius=3, endurance_steps=20, cost_per_step=0.8),
+                ),
+            ),
+            priority_zones=(PriorityZone(name="zone", x_min=1, x_max=7, y_min=1, y_max=6, weight=2.5),),
+            dynamic_tasks=(DynamicTask(name="spike", start_step=4, end_step=15, x_min=14, x_max=18, y_min=9, y_max=13),),
+        )
+        strategy = StrategySpec(type="priority_patrol")
+
+        metrics, trajectory = run_simulation_recorded(scenario, strategy, make_rng(17))
+
+        self.assertEqual(metrics.to_dict(), run_simulation(scenario, strategy, make_rng(17)).to_dict())
+        self.assertEqual(trajectory.x.dtype, np.int16)
+        self.assertEqual((trajectory.steps, trajectory.num_drones), (20, 3))
+        self.assertTrue(np.any(trajectory.target_id >= 0))
+        with tempfile.TemporaryDirectory() as tmp:
+            loaded = load_trajectory(trajectory.save(Path(tmp) / "run.npz"))
+        np.testing.assert_array_equal(loaded.x, trajectory.x)
+        self.assertEqual(rescore(loaded, scenario).to_dict(), metrics.to_dict())
+
+        pricier = Scenario(
+            name=scenario.name,
+            grid=scenario.grid,
+            time=scenario.time,
+            fleet=FleetSpec(
+                num_drones=0,
+                sensor_radius=0,
+                endurance_steps=0,
+                cost_per_step=0.0,
+                platforms=(
+                    PlatformSpec(name="scout", count=2, sensor_radius=2, endurance_steps=16, cost_per_step=2.4),
+                    PlatformSpec(name="sentinel", count=1, sensor_radius=3, endurance_steps=20, cost_per_step=1.6),
+                ),
+            ),
+            priority_zones=(),
+            dynamic_tasks=scenario.dynamic_tasks,
+        )
+        variant = rescore(trajectory, pricier, persistence_threshold_steps=0)
+        self.assertEqual(variant.total_cost, 2 * metrics.total_cost)
+        self.assertEqual(variant.final_coverage, metrics.final_coverage)
+        self.assertEqual(variant.pct_revisits_within_threshold, 0.0)
+
+    def test_stored_timeseries_round_trip_per_run(self) -> None:
+        scenario = Scenario(
+            name="timeseries",
+            grid=GridSpec(width=18, height=14),
+            time=TimeSpec(steps=15),
+            fleet=FleetSpec(num_drones=2, sensor_radius=2, endurance_steps=15, cost_per_step=1.0),
+            dynamic_tasks=(DynamicTask(name="spike", start_step=3, end_step=12, x_min=9, x_max=12, y_min=6, y_max=9),),
+        )
+        runs = run_simulation_batch(scenario, StrategySpec(type="priority_patrol"), [3, 4])
+        collector = TimeseriesCollector()
+        for run_id, metrics in enumerate(runs):
+            collector.add(run_id, metrics)
+
+        for options in (StorageOptions(), StorageOptions(mode="views", compression="zstd", row_group_size=16)):
+            with self.subTest(mode=options.mode), tempfile.TemporaryDirectory() as tmp:
+                db_path = Path(tmp) / "analysis.duckdb"
+                persist_tables_to_duckdb(Path(tmp), db_path, {TIMESERIES_TABLE: collector.to_frame()}, options)
+                series = load_run_timeseries(db_path, 1)
+                with self.assertRaises(ValueError):
+                    load_run_timeseries(db_path, 2)
+                with duckdb.connect(str(db_path), read_only=True) as con:
+                    table_type = con.execute(
+                        "SELECT table_type FROM information_schema.tables WHERE table_name = ?", [TIMESERIES_TABLE]
+                    ).fetchone()[0]
+                    codecs = con.execute(
+                        f"SELECT DISTINCT compression FROM parquet_metadata('{Path(tmp, TIMESERIES_TABLE).as_posix()}.parquet')"
+                    ).fetchall()
+
+                self.assertEqual(table_type, "VIEW" if options.mode == "views" else "BASE TABLE")
+                self.assertEqual(codecs, [(options.compression.upper(),)])
+                self.assertEqual(list(series.columns), ["t", "coverage", "weighted_coverage", "task_service"])
+                np.testing.assert_array_equal(series["t"], np.arange(15))
+                np.testing.assert_array_equal(series["coverage"], runs[1].coverage_over_time)
+                np.testing.assert_array_equal(series["task_service"], runs[1].task_service_over_time)
+
+    def test_sweep_store_skips_completed_jobs_and_copies_in_order(self) -> None:
+        scenario = Scenario(
+            name="store",
+            grid=GridSpec(width=12, height=10),
+            time=TimeSpec(steps=8),
+            fleet=FleetSpec(num_drones=2, sensor_radius=1, endurance_steps=8, cost_per_step=1.0),
+        )
+        runs = run_simulation_batch(scenario, StrategySpec(type="patrol"), [1, 2, 3])
+
+        def batch(keys: list[str], metrics: list) -> tuple:
+            collector = TimeseriesCollector()
+            for i, run_metrics in enumerate(metrics):
+                collector.add(i, run_metrics)
+            series = collector.to_frame()
+            series.insert(0, "job_key", [keys[i] for i in series.pop("run_id")])
+            rows = [{**m.to_dict(), "run_id": -1, "job_key": key} for key, m in zip(keys, metrics)]
+            return pd.DataFrame(rows), series
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "store.duckdb"
+            with SweepStore(path) as store:
+                store.append(*batch(["a", "c"], [runs[0], runs[2]]))
+            with SweepStore(path) as store:
+                self.assertEqual(store.completed(["a", "b", "c"]), {"a", "c"})
+                store.append(*batch(["b"], [runs[1]]))
+            with StreamingTableWriter(Path(tmp) / "out.duckdb") as writer:
+                copy_stored_runs(path, writer, ["c", "a", "b"], [0, 1, 2], "runs", "series")
+                writer.finalize({"runs": "run_id", "series": TIMESERIES_ORDER_BY})
+                copied = writer.query("SELECT * FROM runs")
+                copied_series = writer.query("SELECT * FROM series")
+                with self.assertRaises(ValueError):
+                    copy_stored_runs(path, writer, ["a", "missing"], [0, 1], "runs", "series")
+
+        expected = pd.DataFrame([{**runs[i].to_dict(), "run_id": run_id} for run_id, i in enumerate((2, 0, 1))])
+        pd.testing.assert_frame_equal(copied, expected)
+        expected_series = TimeseriesCollector()
+        for run_id, i in enumerate((2, 0, 1)):
+            expected_series.add(run_id, runs[i])
+        pd.testing.assert_frame_equal(copied_series, expected_series.to_frame())
+
+
+    def test_warehouse_catalogs_runs_and_prunes_by_partition(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp) / "warehouse"
+            older = Path(tmp) / "demo" / "study_20260101_000000"
+            newer = Path(tmp) / "demo" / "study_20260102_000000"
+            _write_demo_run(older, 0.1)
+            _write_demo_run(newer, 0.2)
+            publish_run(root, newer)
+            publish_run(root, older)
+            _write_demo_run(newer, 0.3)
+            publish_run(root, newer)
+
+            run, run_dir = latest_run(root, "demo", "study")
+            agg = load_run_table(root, "results_agg", "demo", run)
+            self.assertIsNone(latest_run(root, "sweep", "study"))
+            with duckdb.connect(str(root / CATALOG_NAME), read_only=True) as con:
+                per_run = con.execute(
+                    "SELECT run, COUNT(*) FROM results_raw WHERE kind = 'demo' GROUP BY run ORDER BY run"
+                ).fetchall()
+                patrol_steps = con.execute(
+                    f"SELECT COUNT(*) FROM {TIMESERIES_TABLE} WHERE strategy = 'patrol' AND run = ?", [run]
+                ).fetchone()[0]
+
+        self.assertEqual((run, run_dir), (newer.name, newer))
+        self.assertEqual(sorted(agg["final_coverage"].tolist()), [0.3, 0.8])
+        self.assertEqual(set(agg["scenario"]), {"grid"})
+        self.assertEqual(per_run, [(older.name, 2), (newer.name, 2)])
+        self.assertEqual(patrol_steps, 1)
+
+    def test_warehouse_compaction_applies_retention_and_dedupe(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp) / "warehouse"
+            runs = [Path(tmp) / "demo" / f"study_20260101_00000{second}" for second in range(4)]
+            for run_dir, coverage in zip(runs, (0.1, 0.2, 0.3, 0.3)):
+                _write_demo_run(run_dir, coverage)
+                publish_run(root, run_dir)
+            tag_run(root, runs[0].name, "baseline")
+
+            planned = compact_warehouse(root, keep_last=3, dedupe=True, dry_run=True)
+            self.assertTrue(all(run_dir.exists() for run_dir in runs))
+            report = compact_warehouse(root, keep_last=3, dedupe=True, remove_run_dirs=True)
+
+            with duckdb.connect(str(root / CATALOG_NAME), read_only=True) as con:
+                cataloged = [run for (run,) in con.execute("SELECT run FROM runs ORDER BY run").fetchall()]
+                per_run = con.execute("SELECT run, COUNT(*) FROM results_raw GROUP BY run ORDER BY run").fetchall()
+            leaf_files = sorted(path.name for path in (root / "results_raw").glob("**/*.parquet"))
+            remaining = [run_dir.exists() for run_dir in runs]
+            with self.assertRaises(ValueError):
+                publish_run(root, runs[3])
+
+        self.assertEqual(planned, CompactionReport((), (runs[2].name,), 24, 24))
+        self.assertEqual(report.removed, (runs[2].name,))
+        self.assertEqual(report.files_after, 6)
+        self.assertEqual(cataloged, [runs[0].name, runs[1].name, runs[3].name])
+        self.assertEqual(per_run, [(runs[0].name, 2), (runs[1].name, 2), (runs[3].name, 2)])
+        self.assertEqual(leaf_files, ["compacted_0.parquet", "compacted_0.parquet"])
+        self.assertEqual(remaining, [True, True, False, True])
+
+    def test_warehouse_compaction_keeps_run_directories_by_default(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp) / "warehouse"
+            runs = [Path(tmp) / "demo" / f"study_20260101_00000{second}" for second in range(2)]
+            for run_dir, coverage in zip(runs, (0.1, 0.2)):
+                _write_demo_run(run_dir, coverage)
+                publish_run(root, run_dir)
+
+            report = compact_warehouse(root, keep_last=1)
+            remaining = [run_dir.exists() for run_dir in runs]
+
+            self.assertEqual(report.removed, (runs[0].name,))
+            self.assertEqual(latest_run(root, "demo", "study"), (runs[1].name, runs[1]))
+            self.assertEqual(remaining, [True, True])
+
+    def test_live_demo_falls_back_to_run_directories_without_catalog_runs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp) / "warehouse"
+            results = Path(tmp) / "results"
+            other = Path(tmp) / "demo" / "study_20260101_000000"
+            _write_demo_run(other, 0.1)
+            publish_run(root, other)
+            demo_dir = results / "demo" / "demo_priority_trade_study_20260102_000000"
+            demo_dir.mkdir(parents=True)
+            pd.DataFrame({"strategy": ["static", "patrol"], "mission_fit_score": [0.4, 0.6]}).to_csv(
+                demo_dir / "demo_results_agg.csv", index=False
+            )
+
+            demo = _build_demo_snapshot(root, results, Path(tmp))
+            with self.assertRaisesRegex(FileNotFoundError, "warehouse.py publish"):
+                _build_policy_snapshot(root, results, Path(tmp))
+
+        self.assertEqual(demo["run_label"], demo_dir.name)
+        self.assertEqual([row["strategy"] for row in demo["top_configs"]], ["patrol", "static"])
+
+    def test_sql_summary_matches_numpy_statistics(self) -> None:
+        rng = np.random.default_rng(5)
+        raw = pd.DataFrame(
+            {
+                "run_id": range(40),
+                "strategy": np.repeat(["patrol", "static"], 20),
+                "seed": np.arange(40) + 100,
+                "coverage": rng.uniform(size=40),
+                "response": rng.exponential(size=40),
+            }
+        )
+        raw.loc[25, "response"] = np.inf
+
+        metrics = ["coverage", "response"]
+        agg = summarize_frame(raw, ["strategy"], "strategy", metric_cols=metrics, extra_aggregates={"seed": "min"})
+        again = summarize_frame(raw, ["strategy"], "strategy", metric_cols=metrics, extra_aggregates={"seed": "min"})
+        no_ci = summarize_frame(raw, ["strategy"], "strategy", metric_cols=["coverage"], bootstrap_samples=0)
+        derived = summarize_frame(raw.rename(columns={"coverage": "final_coverage"}), ["strategy"], "strategy")
+
+        patrol = raw["coverage"].to_numpy()[:20]
+        row = agg.iloc[0]
+        self.assertEqual(agg["strategy"].tolist(), ["patrol", "static"])
+        self.assertEqual(agg["seed"].tolist(), [100, 120])
+        self.assertEqual(agg["n_runs"].tolist(), [20, 20])
+        self.assertAlmostEqual(row["coverage"], patrol.mean(), places=12)
+        self.assertAlmostEqual(row["coverage_std"], patrol.std(ddof=1), places=12)
+        self.assertAlmostEqual(row["coverage_se"], patrol.std(ddof=1) / np.sqrt(20), places=12)
+        for q in (10, 50, 90):
+            self.assertAlmostEqual(row[f"coverage_p{q}"], np.percentile(patrol, q), places=12)
+        self.assertLess(row["coverage_ci_low"], row["coverage"])
+        self.assertGreater(row["coverage_ci_high"], row["coverage"])
+        self.assertTrue(np.isinf(agg["response"].iloc[1]))
+        self.assertTrue(np.isnan(agg["response_std"].iloc[1]))
+        pd.testing.assert_frame_equal(agg, again)
+        self.assertTrue(no_ci["coverage_ci_low"].isna().all())
+        self.assertEqual(list(derived.columns[:3]), ["strategy", "final_coverage", "n_runs"])
+        self.assertNotIn("seed_std", derived.columns)
+
+    def test_metric_columns_are_the_scalar_run_metrics(self) -> None:
+        self.assertEqual(
+            METRIC_COLUMNS,
+            (
+                "avg_coverage",
+                "final_coverage",
+                "avg_weighted_coverage",
+                "final_weighted_coverage",
+                "priority_cell_coverage",
+                "revisit_gap_mean",
+                "revisit_gap_p90",
+                "pct_revisits_within_threshold",
+                "priority_revisit_gap_mean",
+                "priority_revisit_gap_p90",
+                "pct_priority_revisits_within_threshold",
+                "avg_task_service_rate",
+                "task_completion_rate",
+                "mean_task_response_time",
+                "p90_task_response_time",
+                "pct_tasks_responded_within_threshold",
+                "total_cost",
+                "utilization",
+                "redundancy_ratio",
+                "coverage_efficiency",
+            ),
+        )
+
+    def test_streaming_writer_sorts_chunks_and_matches_pandas_csv(self) -> None:
+        df = pd.DataFrame({"run_id": range(7000), "value": np.linspace(0.0, 1.0, 7000), "label": "x"})
+        shuffled = df.sample(frac=1.0, random_state=3)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with StreamingTableWriter(Path(tmp) / "out.duckdb", chunk_rows=2048) as writer:
+                for lo in range(0, len(shuffled), 500):
+                    writer.append("results", shuffled.iloc[lo : lo + 500])
+                writer.finalize({"results": "run_id"})
+                writer.export_csv("results", Path(tmp) / "results.csv")
+                stored = writer.query("SELECT * FROM results")
+            df.to_csv(Path(tmp) / "expected.csv", index=False)
+            written = (Path(tmp) / "results.csv").read_bytes()
+            expected = (Path(tmp) / "expected.csv").read_bytes()
+
+        pd.testing.assert_frame_equal(stored, df)
+        self.assertEqual(written, expected)
+
+    def test_static_fast_path_matches_stepping_engine(self) -> None:
+        scenario = Scenario(
+            name="static_epochs",
+            grid=GridSpec(width=24, height=18),
+            time=TimeSpec(steps=30),
+            fleet=FleetSpec(
+                num_drones=0,
+                sensor_radius=0,
+                endurance_steps=0,
+                cost_per_step=0.0,
+                platforms=(
+                    PlatformSpec(name="scout", count=2, sensor_radius=2, endurance_steps=8, cost_per_step=1.3),
+                    PlatformSpec(name="sentinel", count=2, sensor_radius=4, endurance_steps=40, cost_per_step=0.7),
+                    PlatformSpec(name="relay", count=1, sensor_radius=3, endurance_steps=0, cost_per_step=5.0),
+                ),
+            ),
+            priority_zones=(PriorityZone(name="zone", x_min=0, x_max=6, y_min=0, y_max=5, weight=2.7),),
+            dynamic_tasks=(
+                DynamicTask(name="early", start_step=0, end_step=12, x_min=0, x_max=4, y_min=0, y_max=4, priority=1.3),
+                DynamicTask(name="late", start_step=10, end_step=40, x_min=1, x_max=3, y_min=1, y_max=3, priority=2.1),
+                DynamicTask(name="dark", start_step=3, end_step=9, x_min=20, x_max=23, y_min=14, y_max=17),
+            ),
+        )
+        strategy = StrategySpec(type="static", static_points=[(2, 2), (3, 2), (12, 9), (14, 9), (20, 15)])
+
+        fast = run_simulation(scenario, strategy, make_rng(3))
+        stepped = _simulate_lanes(scenario, strategy, [make_rng(3)])[0]
+
+        self.assertEqual(fast.to_dict(), stepped.to_dict())
+        np.testing.assert_array_equal(fast.coverage_over_time, stepped.coverage_over_time)
+        np.testing.assert_array_equal(fast.weighted_coverage_over_time, stepped.weighted_coverage_over_time)
+        np.testing.assert_array_equal(fast.task_service_over_time, stepped.task_service_over_time)
+
+    def test_fleet_arrays_move_toward_targets_and_stay_on_grid(self) -> None:
+        fleet = FleetState(
+            x=np.array([0, 5, 9]),
+            y=np.array([0, 5, 9]),
+            heading_x=np.array([1, 1, 1]),
+            heading_y=np.array([0, 0, 0]),
+            sensor_radius=np.array([1, 1, 1]),
+            step_size=np.array([2, 1, 3]),
+            endurance_steps=np.array([5, 5, 5]),
+            cost_per_step=np.array([1.0, 1.0, 1.0]),
+            platform_id=np.array([0, 0, 0]),
+            platform_names=("homogeneous",),
+            active=np.array([True, True, True]),
+            target_id=np.array([-1, -1, -1]),
+            target_lock_remaining=np.array([0, 0, 0]),
+        )
+
+        move_toward(fleet, np.array([0, 1, 2]), np.array([4, 5, 20]), np.array([1, 5, 20]), width=10, height=10)
+
+        self.assertEqual(fleet.x.tolist(), [2, 5, 9])
+        self.assertEqual(fleet.y.tolist(), [2, 5, 9])
+        self.assertEqual(fleet.heading_x.tolist(), [1, 1, 1])
+        self.assertEqual(fleet.heading_y.tolist(), [1, 0, 1])
+
+        step_patrol(fleet, np.array([0, 1, 2]), turn_prob=1.0, width=10, height=10, rng=make_rng(2))
+        self.assertTrue(np.all((fleet.x >= 0) & (fleet.x < 10) & (fleet.y >= 0) & (fleet.y < 10)))
+        self.assertTrue(np.all((fleet.heading_x != 0) | (fleet.heading_y != 0)))
+
+    def test_rect_index_matches_brute_force_statistics(self) -> None:
+        rng = make_rng(21)
+        lanes = np.arange(2)
+        bounds = [(0, 4, 0, 5), (3, 12, 6, 14), (10, 12, 0, 14), (5, 6, 5, 6)]
+        ever_seen = np.zeros((2, 12, 14), dtype=bool)
+        last_seen = np.full((2, 12, 14), -1, dtype=np.int32)
+        rects = RectIndex(bounds, num_lanes=2)
+        weights = np.ones((12, 14), dtype=float)
+        no_priority = np.zeros((12, 14), dtype=bool)
+
+        for t in range(6):
+            rects.set_live(np.array([True, t >= 2, True, t < 4]), ever_seen, last_seen)
+            rects.start_step()
+            step_seen = np.zeros_like(ever_seen)
+            for _ in range(3):
+                cx = rng.integers(-2, 16, size=2)
+                cy = rng.integers(-2, 14, size=2)
+                before = last_seen.copy()
+                stamp_footprints(t, lanes, cx, cy, 2, ever_seen, last_seen, no_priority, weights, rects)
+                step_seen |= last_seen != before
+
+            for idx in np.flatnonzero(rects.live):
+                y0, y1, x0, x1 = bounds[idx]
+                for lane in lanes:
+                    region_seen = ever_seen[lane, y0:y1, x0:x1]
+                    region_last = last_seen[lane, y0:y1, x0:x1]
+                    ages = np.where(region_last < 0, t + 1, t - region_last)
+                    self.assertEqual(rects.seen_ratio(lane)[idx], np.mean(region_seen))
+                    self.assertEqual(rects.mean_age(lane, t)[idx], np.mean(ages))
+                    self.assertEqual(rects.step_fraction()[lane, idx], np.mean(step_seen[lane, y0:y1, x0:x1]))
+
+    def test_unseen_cell_index_tracks_grid_and_frontier(self) -> None:
+        rng = make_rng(5)
+        lanes = np.arange(1)
+        ever_seen = np.zeros((1, 10, 13), dtype=bool)
+        last_seen = np.full((1, 10, 13), -1, dtype=np.int32)
+        weights = np.ones((10, 13), dtype=float)
+        no_priority = np.zeros((10, 13), dtype=bool)
+        unseen = UnseenCells(13, 10, frontier=True)
+
+        for t in range(8):
+            update = stamp_footprints(
+                t, lanes, rng.integers(0, 13, size=1), rng.integers(0, 10, size=1), 1,
+                ever_seen, last_seen, no_priority, weights,
+            )
+            unseen.mark_seen(update.fresh_cells, ever_seen[0])
+
+            grid = ever_seen[0]
+            padded = np.pad(grid, 1)
+            near_seen = padded[:-2, 1:-1] | padded[2:, 1:-1] | padded[1:-1, :-2] | padded[1:-1, 2:]
+            expected_unseen = np.flatnonzero(~grid)
+            expected_frontier = np.flatnonzero(~grid & near_seen)
+            self.assertEqual(sorted(unseen.unseen.members().tolist()), expected_unseen.tolist())
+            self.assertEqual(sorted(unseen.frontier.members().tolist()), expected_frontier.tolist())
+
+            xs, ys = unseen.sample(rng, 6, frontier_only=True)
+            self.assertEqual(len(set(zip(xs.tolist(), ys.tolist()))), min(6, expected_frontier.size))
+            self.assertTrue(np.all(np.isin(ys * 13 + xs, expected_frontier)))
+
+    def test_assignment_respects_capacity_and_distance(self) -> None:
+        fleet = FleetState(
+            x=np.array([1, 8, 2]),
+            y=np.array([1, 8, 2]),
+            heading_x=np.array([1, 1, 1]),
+            heading_y=np.array([0, 0, 0]),
+            sensor_radius=np.array([1, 1, 1]),
+            step_size=np.array([1, 1, 1]),
+            endurance_steps=np.array([5, 5, 5]),
+            cost_per_step=np.array([1.0, 1.0, 1.0]),
+            platform_id=np.array([0, 0, 0]),
+            platform_names=("homogeneous",),
+            active=np.array([True, True, True]),
+            target_id=np.array([-1, -1, -1]),
+            target_lock_remaining=np.array([0, 0, 0]),
+        )
+        candidates = [
+            CandidateTarget(key="task:a", kind="task", centroid=(0, 0), utility=3.0, capacity=1, target_id=0),
+            CandidateTarget(key="explore:0", kind="explore", centroid=(9, 9), utility=1.0, capacity=1, target_id=1),
+        ]
+
+        assignments = _assign_targets(fleet, np.array([0, 1, 2]), candidates, StrategySpec(type="greedy_patrol"), "greedy_patrol")
+
+        self.assertEqual(assignments[0].key, "task:a")
+        self.assertEqual(assignments[1].key, "explore:0")
+        self.assertNotIn(2, assignments)
+
     def test_static_point_resolution_adds_unique_positions(self) -> None:
         points = resolve_static_points(
             width=30,
@@ -72,6 +833,18 @@ class SimulationTests(unittest.TestCase):
         self.assertAlmostEqual(metrics.total_cost, 8.0)
         self.assertAlmostEqual(metrics.utilization, 1.0)
 
+    def test_gap_histogram_summary_matches_numpy_on_samples(self) -> None:
+        rng = make_rng(9)
+        for size in (1, 2, 7, 10, 11, 250):
+            gaps = np.minimum(rng.geometric(0.1, size=size), 60)
+            counts = np.bincount(gaps, minlength=61)
+            expected = (float(np.mean(gaps)), float(np.percentile(gaps, 90)), float(np.mean(gaps <= 5)))
+            with self.subTest(size=size):
+                self.assertEqual(summarize_revisit_histogram(counts, 5), expected)
+                self.assertEqual(summarize_revisit_gaps(list(gaps), 5), expected)
+        self.assertEqual(summarize_revisit_histogram(np.zeros(61, dtype=np.int64), 5), (float("inf"), float("inf"), 0.0))
+        self.assertEqual(summarize_revisit_gaps(np.zeros(0, dtype=int), 5), (float("inf"), float("inf"), 0.0))
+
     def test_dynamic_task_metrics_capture_immediate_service(self) -> None:
         scenario = Scenario(
             name="task_service_check",